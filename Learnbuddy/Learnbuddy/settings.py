@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -73,15 +74,32 @@ WSGI_APPLICATION = 'Learnbuddy.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# SQLITE_PATH points a run at another database file, such as the
+# throwaway one benchmark_async_ai.py uses
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
 
+# Caches
+# The 'shared' database cache is visible to every worker process; its table
+# is created by `python manage.py migrate` (home migration 0013).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'learnbuddy_cache',
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -131,10 +149,136 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Load environment variables
 from dotenv import load_dotenv
-import os
 load_dotenv()
 
 
 
 # Groq API Key (free alternative)
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+
+# OpenAI-compatible API base URL for chat_with_ai. Point it at
+# `manage.py run_llm_stub` (http://127.0.0.1:8765/openai/v1) for load tests.
+AI_API_BASE_URL = os.getenv('AI_API_BASE_URL', 'https://api.groq.com/openai/v1')
+
+# AI response cache: in-process LRU size, TTL in seconds, and whether
+# answers are also persisted to the database
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', 512))
+AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', 60 * 60 * 24))
+AI_CACHE_PERSISTENT = True
+
+# Main answer and follow-up questions are generated concurrently. Once the
+# main answer is ready the questions get this many extra seconds before the
+# page is returned without them.
+AI_WORKER_THREADS = int(os.getenv('AI_WORKER_THREADS', 8))
+AI_QUESTIONS_GRACE_SECONDS = float(os.getenv('AI_QUESTIONS_GRACE_SECONDS', 2))
+
+# Groq HTTP client: keep-alive pool size, per-attempt timeouts, and the
+# total time one AI request may spend across all fallback models
+AI_HTTP_POOL_SIZE = int(os.getenv('AI_HTTP_POOL_SIZE', 16))
+AI_CONNECT_TIMEOUT = float(os.getenv('AI_CONNECT_TIMEOUT', 3.05))
+AI_READ_TIMEOUT = float(os.getenv('AI_READ_TIMEOUT', 20))
+AI_REQUEST_BUDGET_SECONDS = float(os.getenv('AI_REQUEST_BUDGET_SECONDS', 30))
+
+# Circuit breaker for the AI model fallback list: consecutive errors
+# before a model is skipped, and how long it is skipped (seconds) after
+# errors or after a "model not available" answer
+AI_MODEL_FAILURE_THRESHOLD = int(os.getenv('AI_MODEL_FAILURE_THRESHOLD', 3))
+AI_MODEL_ERROR_COOLDOWN = int(os.getenv('AI_MODEL_ERROR_COOLDOWN', 30))
+AI_MODEL_UNAVAILABLE_COOLDOWN = int(os.getenv('AI_MODEL_UNAVAILABLE_COOLDOWN', 60 * 60))
+
+# Serve /generate/ and /it-profiles/ with the native async views. Turn this
+# on when running under Learnbuddy.asgi (uvicorn/daphne); the async pipeline
+# uses httpx when installed.
+AI_ASYNC_VIEWS = os.getenv('AI_ASYNC_VIEWS', 'false').lower() in ('1', 'true', 'yes')
+AI_ASYNC_MAX_CONNECTIONS = int(os.getenv('AI_ASYNC_MAX_CONNECTIONS', 500))
+
+# Default IT career overviews are precomputed (manage.py
+# refresh_it_profile_overviews) and regenerated once older than this
+IT_PROFILE_OVERVIEW_MAX_AGE_DAYS = int(os.getenv('IT_PROFILE_OVERVIEW_MAX_AGE_DAYS', 7))
+
+# Near-duplicate question cache for /generate/: answers are reused when the
+# TF-IDF cosine similarity to an earlier question reaches the threshold
+AI_SEMANTIC_CACHE_THRESHOLD = float(os.getenv('AI_SEMANTIC_CACHE_THRESHOLD', 0.8))
+AI_SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv('AI_SEMANTIC_CACHE_MAX_ENTRIES', 5000))
+AI_SEMANTIC_CACHE_PATH = BASE_DIR / 'semantic_cache.json.gz'
+
+# Identical AI requests in flight at the same time share one upstream call.
+# Across worker processes this is coordinated through the AIRequestLock table.
+AI_SINGLE_FLIGHT_CROSS_PROCESS = True
+
+# Job mode: the AI pages enqueue an AIJob and poll for the result instead of
+# generating inside the request. Jobs are processed by manage.py run_ai_worker.
+AI_JOB_MODE = os.getenv('AI_JOB_MODE', 'false').lower() in ('1', 'true', 'yes')
+AI_JOB_STALE_SECONDS = int(os.getenv('AI_JOB_STALE_SECONDS', 300))
+AI_JOB_MAX_ATTEMPTS = int(os.getenv('AI_JOB_MAX_ATTEMPTS', 3))
+
+# Ask for the answer and the follow-up questions in one completion instead
+# of two. Falls back to the two-call path if the reply can't be split.
+AI_SINGLE_CALL = os.getenv('AI_SINGLE_CALL', 'false').lower() in ('1', 'true', 'yes')
+
+# Token-bucket rate limits for AI POSTs, per client IP and per session.
+# capacity is the burst size, per_minute the sustained rate.
+AI_RATE_LIMIT_ENABLED = os.getenv('AI_RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+AI_RATE_LIMIT_CACHE = 'shared'
+AI_RATE_LIMIT_TRUST_X_FORWARDED_FOR = False
+AI_RATE_LIMITS = {
+    'generate': {'capacity': 5, 'per_minute': 10},
+    'it_profiles': {'capacity': 5, 'per_minute': 10},
+}
+
+# Bulkhead: concurrent AI generations allowed per process and per host
+# (0 disables the host-wide limit), plus a short wait queue. Requests beyond
+# that get an immediate 503 so the rest of the site keeps its workers.
+AI_BULKHEAD_MAX_CONCURRENT = int(os.getenv('AI_BULKHEAD_MAX_CONCURRENT', 4))
+AI_BULKHEAD_HOST_MAX_CONCURRENT = int(os.getenv('AI_BULKHEAD_HOST_MAX_CONCURRENT', 8))
+AI_BULKHEAD_MAX_QUEUE = int(os.getenv('AI_BULKHEAD_MAX_QUEUE', 4))
+AI_BULKHEAD_QUEUE_TIMEOUT = float(os.getenv('AI_BULKHEAD_QUEUE_TIMEOUT', 2))
+
+# Hedged requests: if the primary model is slower than its recent
+# AI_HEDGE_PERCENTILE latency, also ask the next healthy model and keep
+# whichever answers first. Each request earns AI_HEDGE_BUDGET_RATIO of a
+# hedge, capping the extra upstream load at roughly that fraction.
+AI_HEDGING_ENABLED = os.getenv('AI_HEDGING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+AI_HEDGE_PERCENTILE = 95
+AI_HEDGE_BUDGET_RATIO = float(os.getenv('AI_HEDGE_BUDGET_RATIO', 0.1))
+AI_HEDGE_DEFAULT_DELAY = 3.0
+AI_HEDGE_MIN_DELAY = 0.5
+
+# Bearer token a Prometheus scraper sends to /metrics. Without one the
+# endpoint is limited to logged-in staff.
+AI_METRICS_TOKEN = os.getenv('AI_METRICS_TOKEN', '')
+
+# Request log: one AIRequestLog row per AI answer, buffered in memory and
+# bulk-inserted off the request path. Summarize with manage.py ai_log_report.
+AI_REQUEST_LOG_ENABLED = os.getenv('AI_REQUEST_LOG_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+AI_REQUEST_LOG_BATCH_SIZE = 100
+AI_REQUEST_LOG_FLUSH_SECONDS = 2.0
+
+# USD per million (prompt, completion) tokens, for the cost in ai_log_report
+AI_MODEL_PRICING = {
+    'llama-3.1-8b-instant': (0.05, 0.08),
+    'mixtral-8x7b-32768': (0.24, 0.24),
+    'llama3-8b-8192': (0.05, 0.08),
+    'gemma2-9b-it': (0.20, 0.20),
+}
+
+# Follow-up question bank: questions are stored per topic and served from
+# the bank, a miss returns the answer alone and fills the bank in the
+# background. Up to AI_QUESTION_BANK_VARIANTS sets are rotated per topic
+# and replaced once older than AI_QUESTION_BANK_REFRESH seconds.
+AI_QUESTION_BANK_ENABLED = os.getenv('AI_QUESTION_BANK_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+AI_QUESTION_BANK_VARIANTS = 3
+AI_QUESTION_BANK_REFRESH = 7 * 86400
+
+# Cache alias for AI answers rendered to HTML, keyed by content hash
+AI_RENDER_CACHE = 'default'
+
+# Hackathon cards on the first page load and per API page
+HACKATHONS_PAGE_SIZE = 24
+
+# Rendered hackathon cards are cached per process; the version stamps that
+# invalidate them go to the shared cache so saves made by other processes
+# (admin, sync scripts) reach every worker
+HACKATHON_CARD_CACHE = 'default'
+HACKATHON_CARD_CACHE_TTL = int(os.getenv('HACKATHON_CARD_CACHE_TTL', 86400))
+HACKATHON_CARD_VERSION_CACHE = 'shared'
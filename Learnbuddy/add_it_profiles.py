@@ -13,6 +13,7 @@ ITProfile.objects.all().delete()
 profiles = [
     {
         'name': 'Software Developer',
+        'key': 'software_developer',
         'description': 'Designs, builds, and maintains software applications and systems.',
         'skills_required': 'Programming languages (Python, Java, JavaScript), algorithms, data structures, version control, testing',
         'career_path': 'Junior Developer → Mid-level Developer → Senior Developer → Tech Lead → Software Architect',
@@ -21,6 +22,7 @@ profiles = [
     },
     {
         'name': 'Data Scientist',
+        'key': 'data_scientist',
         'description': 'Analyzes and interprets complex data to help organizations make better decisions.',
         'skills_required': 'Statistics, machine learning, Python, R, SQL, data visualization, big data technologies',
         'career_path': 'Data Analyst → Junior Data Scientist → Senior Data Scientist → Lead Data Scientist → Chief Data Officer',
@@ -29,6 +31,7 @@ profiles = [
     },
     {
         'name': 'Cybersecurity Analyst',
+        'key': 'cybersecurity_analyst',
         'description': 'Protects computer systems and networks from information disclosure, theft, or damage.',
         'skills_required': 'Network security, ethical hacking, security tools, risk assessment, incident response',
         'career_path': 'Security Analyst → Security Consultant → Security Engineer → Security Architect → CISO',
@@ -37,6 +40,7 @@ profiles = [
     },
     {
         'name': 'DevOps Engineer',
+        'key': 'devops_engineer',
         'description': 'Combines software development and IT operations to shorten the development lifecycle.',
         'skills_required': 'CI/CD, cloud platforms, containerization, infrastructure as code, scripting',
         'career_path': 'System Administrator → DevOps Engineer → Senior DevOps Engineer → DevOps Architect → VP of Engineering',
@@ -45,6 +49,7 @@ profiles = [
     },
     {
         'name': 'UX/UI Designer',
+        'key': 'ui_ux_designer',
         'description': 'Creates user-friendly interfaces and optimizes user experiences for software and websites.',
         'skills_required': 'User research, wireframing, prototyping, visual design, usability testing',
         'career_path': 'Junior Designer → UX/UI Designer → Senior Designer → Design Lead → Design Director',
@@ -53,6 +58,7 @@ profiles = [
     },
     {
         'name': 'Cloud Architect',
+        'key': 'cloud_engineer',
         'description': 'Designs and oversees cloud computing strategies and infrastructure.',
         'skills_required': 'AWS/Azure/GCP, cloud security, networking, distributed systems',
         'career_path': 'Cloud Engineer → Cloud Administrator → Cloud Architect → Enterprise Architect → CTO',
@@ -61,6 +67,7 @@ profiles = [
     },
     {
         'name': 'Machine Learning Engineer',
+        'key': 'ai_engineer',
         'description': 'Builds and deploys machine learning models and AI systems.',
         'skills_required': 'Deep learning, NLP, computer vision, Python, TensorFlow/PyTorch',
         'career_path': 'ML Developer → ML Engineer → Senior ML Engineer → ML Architect → AI Research Scientist',
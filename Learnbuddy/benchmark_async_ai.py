@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Benchmark the threaded chat pipeline against the async one
+Usage: python benchmark_async_ai.py [--concurrency 50 200 500] [--latency 0.5]
+
+Both pipelines talk to the local stub upstream (home.llm_stub), which answers
+every chat completion after a fixed delay, so no Groq quota is used. For each
+concurrency level the script reports wall time, throughput, peak thread
+count and peak RSS of this process.
+
+The run uses a throwaway SQLite database (SQLITE_PATH), migrated at start
+and deleted at exit, with the question bank and request log switched off,
+so nothing is written to db.sqlite3.
+"""
+import argparse
+import asyncio
+import atexit
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+# Setup Django on a throwaway database
+handle, BENCHMARK_DB = tempfile.mkstemp(prefix='learnbuddy-benchmark-', suffix='.sqlite3')
+os.close(handle)
+os.environ['SQLITE_PATH'] = BENCHMARK_DB
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Learnbuddy.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from home import views
+from home.ai_cache import response_cache
+from home.ai_client import async_http_available
+from home.ai_log import ai_request_log
+from home.llm_stub import LatencyModel, StubConfig, make_stub_server
+from home.model_health import model_health
+from home.semantic_cache import semantic_cache
+
+
+def _serve_stub(latency, port_queue):
+    server = make_stub_server(config=StubConfig(latency=LatencyModel('fixed', latency)))
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_stub_process(latency):
+    """Run the stub in its own process so its threads don't skew our numbers"""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_stub, args=(latency, port_queue), daemon=True)
+    process.start()
+    return f'http://127.0.0.1:{port_queue.get()}/openai/v1'
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class PeakSampler:
+    """Samples thread count and RSS in the background while a run is active"""
+
+    def __enter__(self):
+        self.peak_threads = threading.active_count()
+        self.peak_rss = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(0.02):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss = max(self.peak_rss, current_rss_mb())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_threaded(concurrency, run_id):
+    prompts = [f'threaded question {run_id}-{i}' for i in range(concurrency)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(views.chat_with_ai, prompts))
+
+
+def run_async(concurrency, run_id):
+    async def main():
+        prompts = [f'async question {run_id}-{i}' for i in range(concurrency)]
+        return await asyncio.gather(*(views.achat_with_ai(p) for p in prompts))
+    return asyncio.run(main())
+
+
+def measure(label, runner, concurrency, run_id):
+    with PeakSampler() as sampler:
+        started = time.perf_counter()
+        results = runner(concurrency, run_id)
+        elapsed = time.perf_counter() - started
+    errors = sum(1 for r in results if r.startswith('Error:'))
+    print(f"{label:<9} {concurrency:>6} {elapsed:>9.2f}s {concurrency / elapsed:>9.1f}/s "
+          f"{sampler.peak_threads:>8} {sampler.peak_rss:>9.1f}MB {errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 200, 500])
+    parser.add_argument('--latency', type=float, default=0.5, help='Stub upstream latency in seconds')
+    parser.add_argument('--skip-threaded', action='store_true')
+    args = parser.parse_args()
+
+    atexit.register(os.remove, BENCHMARK_DB)
+    call_command('migrate', verbosity=0)
+    settings.AI_API_BASE_URL = start_stub_process(args.latency)
+    settings.AI_QUESTIONS_GRACE_SECONDS = 30
+    # Both pipelines ask for the questions alongside the answer, and
+    # nothing is banked, logged or snapshotted
+    settings.AI_QUESTION_BANK_ENABLED = False
+    ai_request_log.enabled = False
+    semantic_cache.snapshot_path = None
+    # Every prompt is unique, so keep the cache in memory only
+    response_cache.persistent = False
+
+    print(f"Stub upstream: {settings.AI_API_BASE_URL} ({args.latency}s per completion)")
+    if not async_http_available():
+        print("⚠️  httpx is not installed, the async pipeline will fall back to threads")
+    print(f"{'pipeline':<9} {'calls':>6} {'wall':>10} {'rate':>11} {'threads':>8} {'rss':>11} {'errors':>7}")
+
+    for run_id, concurrency in enumerate(args.concurrency):
+        model_health.reset()
+        measure('async', run_async, concurrency, run_id)
+        if not args.skip_threaded:
+            measure('threaded', run_threaded, concurrency, run_id)
+
+
+if __name__ == '__main__':
+    main()
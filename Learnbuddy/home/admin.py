@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Contact, ITProfile, CSKnowledgeArea, CSLearningPath, Hackathon, UserProgress
+from .models import Contact, ITProfile, CSKnowledgeArea, CSLearningPath, Hackathon, UserProgress, AIResponseCache, AIJob, AIRequestLog, FollowUpQuestionSet
 
 # Register your models here.
 @admin.register(Contact)
@@ -9,8 +9,35 @@ class ContactAdmin(admin.ModelAdmin):
     search_fields = ('name', 'email')
     readonly_fields = ('date',)
 
-admin.site.register(ITProfile)
+@admin.register(ITProfile)
+class ITProfileAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'overview_generated_at')
+    readonly_fields = ('overview_generated_at',)
+
 admin.site.register(CSKnowledgeArea)
 admin.site.register(CSLearningPath)
 admin.site.register(Hackathon)
 admin.site.register(UserProgress)
+
+@admin.register(AIResponseCache)
+class AIResponseCacheAdmin(admin.ModelAdmin):
+    list_display = ('prompt_type', 'prompt', 'created_at', 'expires_at')
+    list_filter = ('prompt_type',)
+    search_fields = ('prompt',)
+
+@admin.register(AIJob)
+class AIJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'worker', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+@admin.register(AIRequestLog)
+class AIRequestLogAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'endpoint', 'response_type', 'model', 'cache', 'latency_ms', 'completion_tokens')
+    list_filter = ('endpoint', 'cache', 'model')
+    search_fields = ('prompt',)
+
+@admin.register(FollowUpQuestionSet)
+class FollowUpQuestionSetAdmin(admin.ModelAdmin):
+    list_display = ('topic', 'created_at')
+    search_fields = ('topic',)
@@ -0,0 +1,169 @@
+"""
+Two-tier cache for AI responses.
+
+The first tier is a bounded in-process LRU, the second tier is the
+AIResponseCache table so cached answers survive worker restarts.
+Entries are keyed on the normalized prompt plus the prompt type
+("main" or "questions") and expire after AI_CACHE_TTL seconds.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+
+def normalize_prompt(message):
+    """Lowercase and collapse whitespace so trivially different prompts share a key"""
+    return ' '.join(message.lower().split())
+
+
+def make_cache_key(message, prompt_type):
+    normalized = normalize_prompt(message)
+    return hashlib.sha256(f"{prompt_type}:{normalized}".encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """In-process LRU in front of the persistent AIResponseCache table"""
+
+    def __init__(self, max_entries=512, ttl=86400, persistent=True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persistent = persistent
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expired': 0,
+        }
+
+    def get(self, message, prompt_type):
+        key = make_cache_key(message, prompt_type)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['expired'] += 1
+
+        value = self._get_persistent(key)
+        if value is not None:
+            with self._lock:
+                self._stats['db_hits'] += 1
+            self._set_memory(key, value, now + self.ttl)
+            return value
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def peek(self, message, prompt_type):
+        """Look for an entry written by another process, without touching the counters"""
+        key = make_cache_key(message, prompt_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                return entry[0]
+        return self._get_persistent(key)
+
+    def set(self, message, prompt_type, value):
+        key = make_cache_key(message, prompt_type)
+        self._set_memory(key, value, time.time() + self.ttl)
+        self._set_persistent(key, message, prompt_type, value)
+
+    def delete(self, message, prompt_type):
+        key = make_cache_key(message, prompt_type)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.persistent:
+            from .models import AIResponseCache
+            AIResponseCache.objects.filter(key=key).delete()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.persistent:
+            from .models import AIResponseCache
+            AIResponseCache.objects.all().delete()
+
+    def prune_expired(self):
+        """Delete expired rows from the persistent tier, returns the number removed"""
+        if not self.persistent:
+            return 0
+        from .models import AIResponseCache
+        deleted, _ = AIResponseCache.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._entries)
+        stats['hits'] = stats['memory_hits'] + stats['db_hits']
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        return stats
+
+    def _set_memory(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _get_persistent(self, key):
+        if not self.persistent:
+            return None
+        from .models import AIResponseCache
+        try:
+            row = AIResponseCache.objects.filter(key=key).values('response', 'expires_at').first()
+            if row is None:
+                return None
+            if row['expires_at'] <= timezone.now():
+                AIResponseCache.objects.filter(key=key).delete()
+                with self._lock:
+                    self._stats['expired'] += 1
+                return None
+            return row['response']
+        except DatabaseError:
+            # A broken persistent tier should degrade to a miss, not a 500
+            return None
+
+    def _set_persistent(self, key, message, prompt_type, value):
+        if not self.persistent:
+            return
+        from .models import AIResponseCache
+        try:
+            AIResponseCache.objects.update_or_create(
+                key=key,
+                defaults={
+                    'prompt_type': prompt_type,
+                    'prompt': normalize_prompt(message),
+                    'response': value,
+                    'expires_at': timezone.now() + timedelta(seconds=self.ttl),
+                },
+            )
+        except DatabaseError:
+            pass
+
+
+response_cache = ResponseCache(
+    max_entries=getattr(settings, 'AI_CACHE_MAX_ENTRIES', 512),
+    ttl=getattr(settings, 'AI_CACHE_TTL', 86400),
+    persistent=getattr(settings, 'AI_CACHE_PERSISTENT', True),
+)
@@ -0,0 +1,159 @@
+"""
+Shared HTTP client for the Groq chat completions API.
+
+A single process-wide requests.Session keeps connections to api.groq.com
+alive between calls, so only the first request in a worker pays for the
+TLS handshake. Every call is sent with connect/read timeouts, and callers
+can cap how long a fallback loop may spend in total with a RequestBudget.
+
+The async views use an httpx.AsyncClient per event loop instead. httpx is
+optional; without it the async pipeline falls back to the threaded client.
+"""
+import asyncio
+import json
+import threading
+import time
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+GROQ_API_BASE_URL = 'https://api.groq.com/openai/v1'
+
+_session = None
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+_async_slots = weakref.WeakKeyDictionary()
+
+
+def get_chat_url():
+    """Chat completions endpoint; AI_API_BASE_URL can point at any OpenAI-compatible server"""
+    base_url = getattr(settings, 'AI_API_BASE_URL', None) or GROQ_API_BASE_URL
+    return f"{base_url.rstrip('/')}/chat/completions"
+
+
+def get_session():
+    """Return the shared, connection-pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = getattr(settings, 'AI_HTTP_POOL_SIZE', 16)
+                # Retries are handled by the model fallback loop, not urllib3
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+class RequestBudget:
+    """Total wall-clock allowance shared by every attempt of one AI request"""
+
+    def __init__(self, seconds=None):
+        if seconds is None:
+            seconds = getattr(settings, 'AI_REQUEST_BUDGET_SECONDS', 30)
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self):
+        """(connect, read) timeout for the next attempt, clipped to what is left"""
+        remaining = self.remaining()
+        connect = min(getattr(settings, 'AI_CONNECT_TIMEOUT', 3.05), remaining)
+        read = min(getattr(settings, 'AI_READ_TIMEOUT', 20), remaining)
+        return (connect, read)
+
+
+def post_chat_completion(data, headers, budget=None):
+    """POST a chat completion payload using the shared session"""
+    budget = budget or RequestBudget()
+    return get_session().post(
+        get_chat_url(),
+        headers=headers,
+        json=data,
+        timeout=budget.timeout()
+    )
+
+
+def stream_chat_completion(data, headers, budget=None):
+    """POST a chat completion with stream=True, the caller must close the response"""
+    budget = budget or RequestBudget()
+    return get_session().post(
+        get_chat_url(),
+        headers=headers,
+        json=dict(data, stream=True),
+        timeout=budget.timeout(),
+        stream=True
+    )
+
+
+def iter_completion_deltas(response, budget=None):
+    """
+    Yield the content deltas of an OpenAI-style server-sent event stream.
+    The read timeout only bounds each socket read, so a stream that keeps
+    trickling in is cut off here with requests.Timeout once budget runs out.
+    """
+    for line in response.iter_lines():
+        if budget is not None and budget.expired():
+            raise requests.Timeout('AI request budget used up while streaming')
+        if not line:
+            continue
+        line = line.decode('utf-8') if isinstance(line, bytes) else line
+        if not line.startswith('data:'):
+            continue
+        chunk = line[len('data:'):].strip()
+        if chunk == '[DONE]':
+            break
+        try:
+            delta = json.loads(chunk)['choices'][0].get('delta', {}).get('content')
+        except (ValueError, KeyError, IndexError):
+            continue
+        if delta:
+            yield delta
+
+
+def async_http_available():
+    return httpx is not None
+
+
+def get_async_client():
+    """Return the pooled httpx.AsyncClient for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        max_connections = getattr(settings, 'AI_ASYNC_MAX_CONNECTIONS', 500)
+        client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=getattr(settings, 'AI_HTTP_POOL_SIZE', 16)
+        ))
+        _async_clients[loop] = client
+        # httpx slows to a crawl once requests queue inside its pool, so
+        # callers wait here for a connection instead
+        _async_slots[loop] = asyncio.Semaphore(max_connections)
+    return client
+
+
+async def _apost(data, headers, timeout):
+    client = get_async_client()
+    async with _async_slots[asyncio.get_running_loop()]:
+        return await client.post(get_chat_url(), headers=headers, json=data, timeout=timeout)
+
+
+async def apost_chat_completion(data, headers, budget=None):
+    """Async twin of post_chat_completion, hard-capped by the remaining budget"""
+    budget = budget or RequestBudget()
+    connect, read = budget.timeout()
+    request = _apost(data, headers, httpx.Timeout(read, connect=connect))
+    return await asyncio.wait_for(request, timeout=budget.remaining())
@@ -0,0 +1,102 @@
+"""
+Database-backed queue for AI generations.
+
+Views enqueue an AIJob and return straight away; `manage.py run_ai_worker`
+processes claim pending jobs one at a time with a conditional UPDATE, so
+several workers can drain the same table safely. Jobs whose worker died
+mid-run are handed out again once they have been running longer than
+AI_JOB_STALE_SECONDS, up to AI_JOB_MAX_ATTEMPTS times.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .ai_log import current_endpoint
+from .ai_markdown import render_ai_result
+from .models import AIJob
+
+
+def enqueue_job(kind, **payload):
+    return AIJob.objects.create(kind=kind, payload=payload)
+
+
+def claim_next_job(worker_name):
+    """Mark the oldest pending job as running for this worker and return it, or None"""
+    requeue_stale_jobs()
+    while True:
+        job_id = (
+            AIJob.objects.filter(status='pending')
+            .order_by('created_at')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        # Another worker may claim the same row first; the status check makes this atomic
+        claimed = AIJob.objects.filter(id=job_id, status='pending').update(
+            status='running',
+            worker=worker_name,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return AIJob.objects.get(id=job_id)
+
+
+def requeue_stale_jobs():
+    """Give jobs abandoned by a crashed worker back to the queue"""
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'AI_JOB_STALE_SECONDS', 300))
+    max_attempts = getattr(settings, 'AI_JOB_MAX_ATTEMPTS', 3)
+    stale = AIJob.objects.filter(status='running', started_at__lt=stale_before)
+    with transaction.atomic():
+        stale.filter(attempts__gte=max_attempts).update(
+            status='failed',
+            error='Worker stopped responding',
+            finished_at=timezone.now(),
+        )
+        stale.filter(attempts__lt=max_attempts).update(status='pending', worker='')
+
+
+def run_job(job):
+    """Run one claimed job through the chat pipeline and store the outcome"""
+    from . import views
+    
+    token = current_endpoint.set(f'{job.kind}_job')
+    try:
+        if job.kind == 'generate':
+            result = views.chat_with_ai(job.payload['message'], use_semantic_cache=True)
+        else:
+            result = views.it_profile_result(job.payload['profile'], job.payload.get('question', ''))
+    except Exception as e:
+        result = f"Error: {e}"
+    finally:
+        current_endpoint.reset(token)
+    
+    job.finished_at = timezone.now()
+    if result.startswith("Error:"):
+        job.status = 'failed'
+        job.error = result
+    else:
+        job.status = 'done'
+        job.result = result
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job
+
+
+def job_status(job):
+    data = {
+        'id': str(job.id),
+        'status': job.status,
+        'created_at': job.created_at.isoformat(),
+    }
+    if job.status == 'done':
+        data['result'] = job.result
+        data['html'] = render_ai_result(job.result)
+    elif job.status == 'failed':
+        data['error'] = job.error
+    if job.finished_at:
+        data['finished_at'] = job.finished_at.isoformat()
+    return data
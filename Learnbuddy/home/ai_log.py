@@ -0,0 +1,150 @@
+"""
+Append-only log of AI requests.
+
+Every answer the pipeline hands out, whether it came from the model, one
+of the caches or a precomputed overview, is recorded as an AIRequestLog
+row: prompt hash, endpoint, model, latency, tokens, cache outcome and
+response size. The request path only appends a dict to an in-memory
+buffer; a background thread bulk-inserts the buffer every
+AI_REQUEST_LOG_FLUSH_SECONDS or once AI_REQUEST_LOG_BATCH_SIZE rows are
+waiting. If the database can't keep up the buffer is capped and the
+oldest rows are dropped rather than slowing requests down.
+
+The endpoint is carried in a context variable set by the log_endpoint
+view decorator, so it follows the request into pool threads and tasks.
+"""
+import asyncio
+import atexit
+import contextvars
+import functools
+import hashlib
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from .ai_cache import normalize_prompt
+
+current_endpoint = contextvars.ContextVar('ai_log_endpoint', default='')
+
+
+def log_endpoint(endpoint):
+    """View decorator that tags the AI requests made while handling it"""
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @functools.wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                token = current_endpoint.set(endpoint)
+                try:
+                    return await view_func(request, *args, **kwargs)
+                finally:
+                    current_endpoint.reset(token)
+            return async_wrapper
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            token = current_endpoint.set(endpoint)
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                current_endpoint.reset(token)
+        return wrapper
+    return decorator
+
+
+def iter_in_context(context, stream):
+    """Iterate a generator inside context, for streaming bodies consumed after the view returned"""
+    while True:
+        try:
+            chunk = context.run(next, stream)
+        except StopIteration:
+            return
+        yield chunk
+
+
+class AIRequestLogger:
+    def __init__(self, enabled=True, batch_size=100, flush_interval=2.0, max_buffer=10000):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        # Appending to a full deque drops its oldest entry in O(1)
+        self._buffer = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.dropped = 0
+
+    def record(self, message, response_type, cache, model='', latency=0.0, usage=None, response=''):
+        if not self.enabled:
+            return
+        normalized = normalize_prompt(message)
+        entry = {
+            'created_at': timezone.now(),
+            'endpoint': current_endpoint.get(),
+            'response_type': response_type,
+            'prompt_hash': hashlib.sha256(normalized.encode('utf-8')).hexdigest(),
+            'prompt': normalized[:300],
+            'model': model,
+            'cache': cache,
+            'latency_ms': int(latency * 1000),
+            'prompt_tokens': (usage or {}).get('prompt_tokens') or 0,
+            'completion_tokens': (usage or {}).get('completion_tokens') or 0,
+            'response_chars': len(response or ''),
+        }
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.batch_size
+            self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything buffered so far, returns the number of rows written"""
+        from .models import AIRequestLog
+        with self._flush_lock:
+            with self._lock:
+                entries = list(self._buffer)
+                self._buffer.clear()
+            if not entries:
+                return 0
+            try:
+                AIRequestLog.objects.bulk_create([AIRequestLog(**entry) for entry in entries])
+            except DatabaseError:
+                with self._lock:
+                    self.dropped += len(entries)
+                return 0
+            return len(entries)
+
+    def _ensure_thread(self):
+        # Forked workers don't inherit the parent's thread, so check the pid
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='ai-request-log', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+ai_request_log = AIRequestLogger(
+    enabled=getattr(settings, 'AI_REQUEST_LOG_ENABLED', True),
+    batch_size=getattr(settings, 'AI_REQUEST_LOG_BATCH_SIZE', 100),
+    flush_interval=getattr(settings, 'AI_REQUEST_LOG_FLUSH_SECONDS', 2.0),
+)
+
+atexit.register(ai_request_log.flush)
@@ -0,0 +1,176 @@
+"""
+Server-side rendering of AI answers.
+
+The models answer in Markdown. render_ai_result() turns an answer into
+HTML once, splits off the "Test Your Understanding" section into its own
+block, and caches the result by content hash, so pages, streams and job
+results all reuse the same markup instead of formatting it in the
+browser on every view.
+
+The renderer covers what the models actually produce (headings, lists,
+fenced code, quotes, rules, emphasis, inline code and links). Every
+piece of text is HTML-escaped before any tags are added and links are
+limited to http(s) and mailto, so the output is safe without a separate
+sanitizer.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+QUESTIONS_SPLIT_RE = re.compile(r'\n\s*-{3,}\s*\n+\s*#{1,6}\s*(?:🤔\s*)?Test Your Understanding\s*\n')
+
+FENCE_RE = re.compile(r'^\s*(```|~~~)\s*([\w+#-]*)\s*$')
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+RULE_RE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+BULLET_RE = re.compile(r'^\s*[-*+]\s+(.*)$')
+NUMBERED_RE = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+QUOTE_RE = re.compile(r'^\s*>\s?(.*)$')
+
+CODE_SPAN_RE = re.compile(r'`([^`\n]+)`')
+LINK_RE = re.compile(r'\[([^\]\n]+)\]\(((?:https?://|mailto:)[^\s)]+)\)')
+BOLD_RE = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+ITALIC_RE = re.compile(r'(?<![\w*])\*(?=\S)([^*\n]+?)(?<=\S)\*(?![\w*])')
+
+QUESTIONS_TITLE = '<h3><i class="bi bi-question-circle me-2"></i>Test Your Understanding</h3>'
+
+
+def render_emphasis(text):
+    text = BOLD_RE.sub(r'<strong>\2</strong>', text)
+    return ITALIC_RE.sub(r'<em>\1</em>', text)
+
+
+def render_inline(text):
+    # Code spans and links are set aside before emphasis, so neither code
+    # nor a URL with * or __ in it gets <strong>/<em> tags put inside it
+    spans = []
+    links = []
+
+    def keep_code(match):
+        spans.append(f'<code>{escape(match.group(1))}</code>')
+        return f'\x00{len(spans) - 1}\x00'
+
+    def keep_link(match):
+        links.append(f'<a href="{match.group(2)}" target="_blank" rel="noopener nofollow">{render_emphasis(match.group(1))}</a>')
+        return f'\x01{len(links) - 1}\x01'
+
+    text = escape(CODE_SPAN_RE.sub(keep_code, text))
+    text = render_emphasis(LINK_RE.sub(keep_link, text))
+    text = re.sub('\x01(\\d+)\x01', lambda match: links[int(match.group(1))], text)
+    return re.sub('\x00(\\d+)\x00', lambda match: spans[int(match.group(1))], text)
+
+
+def markdown_to_html(text):
+    html = []
+    paragraph = []
+    list_tag = None
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+
+    def close_paragraph():
+        if paragraph:
+            html.append('<p>' + '<br>'.join(render_inline(line) for line in paragraph) + '</p>')
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            html.append(f'</{list_tag}>')
+            list_tag = None
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+
+        fence = FENCE_RE.match(line)
+        if fence:
+            close_paragraph()
+            close_list()
+            code = []
+            while i < len(lines) and not lines[i].strip().startswith(fence.group(1)):
+                code.append(lines[i])
+                i += 1
+            i += 1
+            language = f' class="language-{escape(fence.group(2))}"' if fence.group(2) else ''
+            html.append(f'<pre class="code-block"><code{language}>{escape(chr(10).join(code))}</code></pre>')
+            continue
+
+        if not line.strip():
+            close_paragraph()
+            close_list()
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            close_paragraph()
+            close_list()
+            # Answers sit inside a chat bubble, so # starts at h4
+            level = min(len(heading.group(1)) + 3, 6)
+            html.append(f'<h{level}>{render_inline(heading.group(2))}</h{level}>')
+            continue
+
+        if RULE_RE.match(line):
+            close_paragraph()
+            close_list()
+            html.append('<hr>')
+            continue
+
+        item = BULLET_RE.match(line)
+        tag = 'ul'
+        if item is None:
+            item = NUMBERED_RE.match(line)
+            tag = 'ol'
+        if item:
+            close_paragraph()
+            if list_tag != tag:
+                close_list()
+                html.append(f'<{tag}>')
+                list_tag = tag
+            html.append(f'<li>{render_inline(item.group(1))}</li>')
+            continue
+
+        quote = QUOTE_RE.match(line)
+        if quote:
+            close_paragraph()
+            close_list()
+            html.append(f'<blockquote>{render_inline(quote.group(1))}</blockquote>')
+            continue
+
+        if list_tag and line.startswith((' ', '\t')):
+            # Continuation of the previous list item
+            html[-1] = html[-1][:-len('</li>')] + '<br>' + render_inline(line.strip()) + '</li>'
+            continue
+
+        close_list()
+        paragraph.append(line.strip())
+
+    close_paragraph()
+    close_list()
+    return '\n'.join(html)
+
+
+def split_questions(text):
+    """(answer, questions) where questions is '' when there is no questions section"""
+    parts = QUESTIONS_SPLIT_RE.split(text, maxsplit=1)
+    if len(parts) == 1:
+        return text, ''
+    return parts[0].rstrip(), parts[1].strip()
+
+
+def render_ai_result(text):
+    """Sanitized HTML for an AI answer, with the questions in their own section"""
+    if not text:
+        return mark_safe('')
+    cache = caches[getattr(settings, 'AI_RENDER_CACHE', 'default')]
+    key = 'ai_html:' + hashlib.sha256(text.encode('utf-8')).hexdigest()
+    html = cache.get(key)
+    if html is None:
+        answer, questions = split_questions(text)
+        html = markdown_to_html(answer)
+        if questions:
+            html += f'\n<div class="questions-section">{QUESTIONS_TITLE}\n{markdown_to_html(questions)}</div>'
+        cache.set(key, html, getattr(settings, 'AI_CACHE_TTL', 86400))
+    return mark_safe(html)
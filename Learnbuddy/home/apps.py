@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+def ensure_search_index(sender, using='default', **kwargs):
+    from django.db import connections
+    from .search import ensure_index
+    ensure_index(connections[using])
 
 
 class HomeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'home'
+    
+    def ready(self):
+        from .hackathon_cards import hackathon_changed
+        from .models import Hackathon
+        
+        post_migrate.connect(ensure_search_index, sender=self)
+        post_save.connect(hackathon_changed, sender=Hackathon, dispatch_uid='hackathon_card_saved')
+        post_delete.connect(hackathon_changed, sender=Hackathon, dispatch_uid='hackathon_card_deleted')
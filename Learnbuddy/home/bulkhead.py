@@ -0,0 +1,242 @@
+"""
+Bulkhead for the AI views.
+
+At most AI_BULKHEAD_MAX_CONCURRENT generations run at once in a process,
+and at most AI_BULKHEAD_HOST_MAX_CONCURRENT across all processes on the
+host. The host-wide limit is enforced with flock()ed slot files and is
+skipped where fcntl is unavailable. Up to AI_BULKHEAD_MAX_QUEUE further
+requests may wait AI_BULKHEAD_QUEUE_TIMEOUT seconds for a slot; anything
+beyond that is shed straight away with a 503. A slow upstream therefore
+ties up a bounded number of workers and the rest of the site stays
+responsive.
+"""
+import asyncio
+import functools
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class HostSlots:
+    """Cross-process counting semaphore built from flock()ed files"""
+
+    def __init__(self, size, lock_dir):
+        self.size = size
+        self.lock_dir = lock_dir
+
+    @property
+    def enabled(self):
+        """False where fcntl is unavailable or the host-wide limit is off (size 0)"""
+        return fcntl is not None and self.size > 0
+
+    def try_acquire(self):
+        """Return an open file holding a slot, or None if every slot is taken; only call when enabled"""
+        os.makedirs(self.lock_dir, exist_ok=True)
+        for slot in range(self.size):
+            handle = open(os.path.join(self.lock_dir, f'slot-{slot}.lock'), 'a')
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return handle
+            except OSError:
+                handle.close()
+        return None
+
+    def release(self, handle):
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+
+class Bulkhead:
+    def __init__(self, max_concurrent, max_queue, queue_timeout, host_slots=None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.host_slots = host_slots
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+
+    def acquire(self):
+        """Block up to queue_timeout for a slot; returns a token for release(), or None when shed"""
+        deadline = time.monotonic() + self.queue_timeout
+        with self._condition:
+            if self.active >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    return None
+                self.waiting += 1
+                try:
+                    while self.active >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected += 1
+                            return None
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+        return self._acquire_host_slot(deadline, time.sleep)
+
+    async def aacquire(self):
+        """Async twin of acquire(); polls instead of blocking the event loop"""
+        deadline = time.monotonic() + self.queue_timeout
+        with self._lock:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                queued = False
+            elif self.waiting >= self.max_queue:
+                self.rejected += 1
+                return None
+            else:
+                self.waiting += 1
+                queued = True
+        while queued:
+            await asyncio.sleep(0.02)
+            with self._lock:
+                if self.active < self.max_concurrent:
+                    self.active += 1
+                    self.waiting -= 1
+                    queued = False
+                elif time.monotonic() >= deadline:
+                    self.waiting -= 1
+                    self.rejected += 1
+                    return None
+        if not self._host_limited():
+            return _Token(None)
+        slot = self.host_slots.try_acquire()
+        while slot is None:
+            if time.monotonic() >= deadline:
+                self._release_local()
+                with self._lock:
+                    self.rejected += 1
+                return None
+            await asyncio.sleep(0.05)
+            slot = self.host_slots.try_acquire()
+        return _Token(slot)
+
+    def release(self, token):
+        if token.slot is not None:
+            self.host_slots.release(token.slot)
+        self._release_local()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active': self.active,
+                'waiting': self.waiting,
+                'rejected': self.rejected,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+            }
+
+    def _acquire_host_slot(self, deadline, sleep):
+        if not self._host_limited():
+            return _Token(None)
+        slot = self.host_slots.try_acquire()
+        while slot is None:
+            if time.monotonic() >= deadline:
+                self._release_local()
+                with self._lock:
+                    self.rejected += 1
+                return None
+            sleep(0.05)
+            slot = self.host_slots.try_acquire()
+        return _Token(slot)
+
+    def _host_limited(self):
+        return self.host_slots is not None and self.host_slots.enabled
+
+    def _release_local(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class _Token:
+    def __init__(self, slot):
+        self.slot = slot
+
+
+ai_bulkhead = Bulkhead(
+    max_concurrent=getattr(settings, 'AI_BULKHEAD_MAX_CONCURRENT', 4),
+    max_queue=getattr(settings, 'AI_BULKHEAD_MAX_QUEUE', 4),
+    queue_timeout=getattr(settings, 'AI_BULKHEAD_QUEUE_TIMEOUT', 2.0),
+    host_slots=HostSlots(
+        getattr(settings, 'AI_BULKHEAD_HOST_MAX_CONCURRENT', 0),
+        getattr(settings, 'AI_BULKHEAD_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'learnbuddy-ai-slots')),
+    ),
+)
+
+
+def service_unavailable(request):
+    message = 'The AI assistant is busy right now. Please try again in a few seconds.'
+    wants_json = (
+        request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        or 'application/json' in request.headers.get('Accept', '')
+    )
+    if wants_json:
+        response = JsonResponse({'error': message}, status=503)
+    else:
+        response = HttpResponse(message, status=503, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(getattr(settings, 'AI_BULKHEAD_RETRY_AFTER', 5))
+    return response
+
+
+def _hold_while_streaming(response, token):
+    """Keep the slot until a streaming response has been fully sent"""
+    content = response.streaming_content
+
+    def stream():
+        try:
+            yield from content
+        finally:
+            ai_bulkhead.release(token)
+
+    response.streaming_content = stream()
+    return response
+
+
+def bulkhead(view):
+    """Run POSTs to an AI view (sync or async) inside the shared bulkhead"""
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method != 'POST':
+                return await view(request, *args, **kwargs)
+            token = await ai_bulkhead.aacquire()
+            if token is None:
+                return service_unavailable(request)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                ai_bulkhead.release(token)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'POST':
+            return view(request, *args, **kwargs)
+        token = ai_bulkhead.acquire()
+        if token is None:
+            return service_unavailable(request)
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            ai_bulkhead.release(token)
+            raise
+        if isinstance(response, StreamingHttpResponse):
+            return _hold_while_streaming(response, token)
+        ai_bulkhead.release(token)
+        return response
+    return wrapper
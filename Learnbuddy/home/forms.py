@@ -15,7 +15,7 @@ class UserRegisterForm(UserCreationForm):
         fields = ['username', 'email', 'password1', 'password2']
 
 class MessageForm(forms.Form):
-    message = forms.CharField(widget=forms.Textarea, label="Ask your question")
+    message = forms.CharField(widget=forms.Textarea, max_length=4000, label="Ask your question")
     
 class ITProfileForm(forms.Form):
     PROFILE_CHOICES = [
@@ -33,4 +33,4 @@ class ITProfileForm(forms.Form):
     ]
     
     profile = forms.ChoiceField(choices=PROFILE_CHOICES, label="Select an IT Profile")
-    question = forms.CharField(widget=forms.Textarea, label="Ask about this IT career", required=False)
\ No newline at end of file
+    question = forms.CharField(widget=forms.Textarea, max_length=2000, label="Ask about this IT career", required=False)
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Fragment caching for hackathon cards.
+
+Cards on the hackathons page and the home page strip are cached per
+hackathon with {% cache %}, keyed on the hackathon id and a version stamp.
+The stamps live in HACKATHON_CARD_VERSION_CACHE, the 'shared' database
+cache in settings, so every process sees the same stamps, while the
+rendered fragments stay in the fast per-process HACKATHON_CARD_CACHE. A
+post_save or post_delete on Hackathon writes a new stamp, so the old
+fragment is never looked up again in any process. That includes the
+image sync command and update_hackathon_images.py, which save row by row.
+
+Changes that skip the model signals (QuerySet.update(), bulk_create(),
+raw SQL) need invalidate_hackathon_cards() called afterwards.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'hackathon_card_version:{}'
+
+
+def version_cache():
+    return caches[getattr(settings, 'HACKATHON_CARD_VERSION_CACHE', 'default')]
+
+
+def new_stamp():
+    return f'{time.time_ns():x}'
+
+
+def attach_card_versions(hackathons):
+    """
+    Set card_version on each hackathon and return the template context the
+    cards need. A hackathon without a stamp gets a new one, so a stamp
+    evicted from the cache can't bring back an older fragment.
+    """
+    hackathons = list(hackathons)
+    keys = {VERSION_KEY.format(hackathon.id): hackathon for hackathon in hackathons}
+    try:
+        versions = version_cache().get_many(keys)
+        missing = {key: new_stamp() for key in keys if key not in versions}
+        if missing:
+            version_cache().set_many(missing, None)
+            versions.update(missing)
+    except Exception:
+        # Without the shared stamps a cached card could be stale, render afresh
+        versions = {key: uuid.uuid4().hex for key in keys}
+    for key, hackathon in keys.items():
+        hackathon.card_version = versions[key]
+    return {
+        'card_cache': getattr(settings, 'HACKATHON_CARD_CACHE', 'default'),
+        'card_cache_ttl': getattr(settings, 'HACKATHON_CARD_CACHE_TTL', 86400),
+    }
+
+
+def invalidate_hackathon_cards(*hackathon_ids):
+    version_cache().set_many({VERSION_KEY.format(hackathon_id): new_stamp() for hackathon_id in hackathon_ids}, None)
+
+
+def hackathon_changed(sender, instance, **kwargs):
+    invalidate_hackathon_cards(instance.pk)
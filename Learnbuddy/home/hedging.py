@@ -0,0 +1,102 @@
+"""
+Hedged requests across the fallback models.
+
+When hedging is enabled and the primary model has not answered within
+its recent AI_HEDGE_PERCENTILE latency, the same prompt is also sent to
+the next healthy model and whichever succeeds first wins. Hedges are
+paid for from a budget: every request earns AI_HEDGE_BUDGET_RATIO of a
+hedge (10% by default), so extra upstream load stays bounded even when
+the whole upstream is slow.
+
+The two attempts of a hedged request claim models as they go and never
+try one the other has claimed. Sync callers run both attempts on one
+shared event loop, so a hedged request holds no extra threads and the
+losing attempt is cancelled rather than left to finish.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+
+from .model_health import model_health
+
+
+class HedgeBudget:
+    def __init__(self, ratio=0.1, max_tokens=10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = 1.0
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'hedges': 0, 'hedge_wins': 0, 'denied': 0}
+
+    def record_request(self):
+        with self._lock:
+            self._stats['requests'] += 1
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self._stats['hedges'] += 1
+                return True
+            self._stats['denied'] += 1
+            return False
+
+    def record_hedge_win(self):
+        with self._lock:
+            self._stats['hedge_wins'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tokens'] = round(self.tokens, 2)
+        return stats
+
+
+class ModelClaims:
+    """Models taken by one attempt of a hedged request, which the other attempt skips"""
+
+    def __init__(self):
+        self._claimed = set()
+        self._lock = threading.Lock()
+
+    def claim(self, model):
+        with self._lock:
+            if model in self._claimed:
+                return False
+            self._claimed.add(model)
+            return True
+
+    def unclaimed(self, models):
+        with self._lock:
+            return [model for model in models if model not in self._claimed]
+
+
+def hedging_enabled():
+    return getattr(settings, 'AI_HEDGING_ENABLED', False)
+
+
+def hedge_delay(model):
+    """Seconds to wait for model before hedging"""
+    observed = model_health.latency_percentile(model, getattr(settings, 'AI_HEDGE_PERCENTILE', 95))
+    if observed is None:
+        return getattr(settings, 'AI_HEDGE_DEFAULT_DELAY', 3.0)
+    return max(observed, getattr(settings, 'AI_HEDGE_MIN_DELAY', 0.5))
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def hedge_loop():
+    """Event loop on a daemon thread that runs the sync views' hedged requests"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='ai-hedge-loop', daemon=True).start()
+    return _loop
+
+
+hedge_budget = HedgeBudget(ratio=getattr(settings, 'AI_HEDGE_BUDGET_RATIO', 0.1))
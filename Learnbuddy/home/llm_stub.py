@@ -0,0 +1,221 @@
+"""
+Local OpenAI-compatible chat completions server for load tests.
+
+Answers POST .../chat/completions like Groq does, after a latency drawn
+from a configurable distribution. It can also inject 500/429 errors,
+reply "model not found" 400s for chosen models or context length 400s
+for long prompts, and stream the answer as server-sent event chunks
+when the request asks for stream=true. Point
+AI_API_BASE_URL at it (e.g. http://127.0.0.1:8765/openai/v1) to exercise
+the chat pipeline without using Groq quota.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_ANSWER = (
+    "Here is a short explanation from the local stub model. "
+    "A linked list stores elements in nodes, each pointing to the next one. "
+    "Insertion at the head is O(1) while random access is O(n).\n\n"
+    "```python\nclass Node:\n    def __init__(self, value):\n        self.value = value\n        self.next = None\n```"
+)
+
+STUB_QUESTIONS = "\n".join(f"{i}. Stub follow-up question number {i}?" for i in range(1, 7))
+
+
+class LatencyModel:
+    """Samples upstream latency in seconds"""
+
+    DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, distribution='fixed', mean=0.5, jitter=0.0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean = mean
+        self.jitter = jitter
+
+    def sample(self):
+        if self.distribution == 'uniform':
+            value = random.uniform(self.mean - self.jitter, self.mean + self.jitter)
+        elif self.distribution == 'normal':
+            value = random.gauss(self.mean, self.jitter)
+        elif self.distribution == 'lognormal':
+            # jitter is the sigma of the underlying normal; the median stays at mean
+            value = self.mean * random.lognormvariate(0, self.jitter)
+        else:
+            value = self.mean
+        return max(0.0, value)
+
+
+class StubConfig:
+    def __init__(self, latency=None, error_rate=0.0, rate_limit_rate=0.0,
+                 unavailable_models=(), stream_chunks=20, latency_by_kind=None, latency_by_model=None,
+                 max_prompt_chars=None, omit_marker=False):
+        self.latency = latency or LatencyModel()
+        # Overrides latency for some kinds of completion, e.g. slow questions
+        self.latency_by_kind = dict(latency_by_kind or {})
+        # ... or for some models, e.g. a slow primary; per-kind wins
+        self.latency_by_model = dict(latency_by_model or {})
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.unavailable_models = set(unavailable_models)
+        self.stream_chunks = stream_chunks
+        # Longer prompts get the 400 context_length_exceeded answer
+        self.max_prompt_chars = max_prompt_chars
+        # Answer single-call prompts without the questions, like a model ignoring the format
+        self.omit_marker = omit_marker
+        self.requests = 0
+        # Completions asked for, by kind (main, questions, combined) and by model
+        self.calls = Counter()
+        self.model_calls = Counter()
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'LearnbuddyLLMStub/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        config = self.server.config
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': {'message': 'Invalid JSON body'}})
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._send_json(404, {'error': {'message': f'Unknown path {self.path}'}})
+
+        model = body.get('model', '')
+        system_prompt = next((m['content'] for m in body.get('messages', []) if m.get('role') == 'system'), '')
+        if 'question generator' in system_prompt:
+            kind, content = 'questions', STUB_QUESTIONS
+        elif '<<<QUESTIONS>>>' in system_prompt:
+            kind = 'combined'
+            content = STUB_ANSWER if config.omit_marker else f"{STUB_ANSWER}\n\n---\n\n<<<QUESTIONS>>>\n{STUB_QUESTIONS}"
+        else:
+            kind, content = 'main', STUB_ANSWER
+
+        with config.lock:
+            config.requests += 1
+            config.calls[kind] += 1
+            config.model_calls[model] += 1
+
+        if model in config.unavailable_models:
+            return self._send_json(400, {'error': {
+                'message': f'The model `{model}` has been decommissioned and is no longer supported.',
+                'type': 'invalid_request_error',
+                'code': 'model_decommissioned',
+            }})
+
+        prompt_chars = sum(len(m.get('content', '')) for m in body.get('messages', []))
+        if config.max_prompt_chars is not None and prompt_chars > config.max_prompt_chars:
+            return self._send_json(400, {'error': {
+                'message': 'Please reduce the length of the messages or completion.',
+                'type': 'invalid_request_error',
+                'param': 'messages',
+                'code': 'context_length_exceeded',
+            }})
+
+        roll = random.random()
+        if roll < config.error_rate:
+            time.sleep(config.latency.sample() / 4)
+            return self._send_json(500, {'error': {'message': 'Stub internal server error'}})
+        if roll < config.error_rate + config.rate_limit_rate:
+            return self._send_json(429, {'error': {'message': 'Stub rate limit reached'}}, {'Retry-After': '1'})
+
+        latency = config.latency_by_kind.get(kind, config.latency_by_model.get(model, config.latency)).sample()
+
+        if body.get('stream'):
+            return self._send_stream(model, content, latency, config.stream_chunks)
+
+        time.sleep(latency)
+        prompt_tokens = sum(len(m.get('content', '').split()) for m in body.get('messages', []))
+        completion_tokens = len(content.split())
+        self._send_json(200, {
+            'id': f'chatcmpl-{uuid.uuid4().hex}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _send_json(self, status, payload, extra_headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _send_stream(self, model, content, latency, chunks):
+        words = content.split(' ')
+        per_chunk = max(1, len(words) // max(1, chunks))
+        pieces = [' '.join(words[i:i + per_chunk]) + ' ' for i in range(0, len(words), per_chunk)]
+        delay = latency / max(1, len(pieces))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        # Chunked like the real API, so the client sees each event as it is sent
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for piece in pieces:
+                time.sleep(delay)
+                chunk = {'model': model, 'choices': [{'index': 0, 'delta': {'content': piece}}]}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up, e.g. its time budget ran out
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 refuses and retries connects once a
+    # few hundred clients arrive together, so benchmarks would time the
+    # stub's accept queue instead of the app
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def make_stub_server(host='127.0.0.1', port=0, config=None):
+    """Create (but don't start) a stub server; port 0 picks a free port"""
+    server = StubServer((host, port), StubHandler)
+    server.config = config or StubConfig()
+    return server
+
+
+def start_stub_server(host='127.0.0.1', port=0, config=None):
+    """Serve in a background thread and return (server, base_url)"""
+    server = make_stub_server(host, port, config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f'http://{host}:{port}/openai/v1'
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from home.ai_log import ai_request_log
+from home.models import AIRequestLog
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def token_cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = getattr(settings, 'AI_MODEL_PRICING', {}).get(model, (0, 0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class Command(BaseCommand):
+    help = 'Summarize the AI request log: top questions, latency per model and cost per day'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='How many days back to look')
+        parser.add_argument('--top', type=int, default=10, help='Number of top questions to show')
+        parser.add_argument('--endpoint', help='Only include requests from this endpoint')
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete log rows older than --days after reporting',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=== AI Request Log Report ===\n'))
+
+        # Rows buffered by this process would otherwise be missing
+        ai_request_log.flush()
+
+        since = timezone.now() - timedelta(days=options['days'])
+        logs = AIRequestLog.objects.filter(created_at__gte=since)
+        if options['endpoint']:
+            logs = logs.filter(endpoint=options['endpoint'])
+
+        total = logs.count()
+        self.stdout.write(f"{total} request(s) in the last {options['days']} day(s)")
+        if not total:
+            return
+
+        self.stdout.write(self.style.SUCCESS('\nCache outcomes'))
+        for row in logs.values('cache').annotate(count=Count('id')).order_by('-count'):
+            self.stdout.write(f"  {row['cache']:<12} {row['count']:>7}  {row['count'] / total:6.1%}")
+
+        # Questions are counted once per chat, by their main answer
+        self.stdout.write(self.style.SUCCESS(f"\nTop {options['top']} questions"))
+        top = (
+            logs.filter(response_type__in=['main', 'combined'])
+            .values('prompt_hash')
+            .annotate(count=Count('id'), sample_prompt=Max('prompt'), misses=Count('id', filter=Q(cache='miss')))
+            .order_by('-count')[:options['top']]
+        )
+        for row in top:
+            self.stdout.write(f"  {row['count']:>5} ({row['misses']} uncached)  {row['sample_prompt'][:70]}")
+
+        self.stdout.write(self.style.SUCCESS('\nUpstream latency per model (ms)'))
+        latencies = defaultdict(list)
+        for model, latency_ms in logs.filter(cache='miss').values_list('model', 'latency_ms'):
+            latencies[model].append(latency_ms)
+        self.stdout.write(f"  {'model':<24} {'calls':>6} {'p50':>7} {'p95':>7} {'p99':>7}")
+        for model, values in sorted(latencies.items()):
+            values.sort()
+            self.stdout.write(
+                f'  {model:<24} {len(values):>6} {percentile(values, 50):>7} '
+                f'{percentile(values, 95):>7} {percentile(values, 99):>7}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('\nCost per day (USD)'))
+        per_day = defaultdict(lambda: [0, 0, 0.0])
+        usage = (
+            logs.filter(cache='miss')
+            .annotate(day=TruncDate('created_at'))
+            .values('day', 'model')
+            .annotate(prompt_tokens=Sum('prompt_tokens'), completion_tokens=Sum('completion_tokens'))
+        )
+        for row in usage:
+            day = per_day[row['day']]
+            day[0] += row['prompt_tokens']
+            day[1] += row['completion_tokens']
+            day[2] += token_cost(row['model'], row['prompt_tokens'], row['completion_tokens'])
+        for day, (prompt_tokens, completion_tokens, cost) in sorted(per_day.items()):
+            self.stdout.write(f'  {day}  {prompt_tokens:>9} in  {completion_tokens:>9} out  ${cost:.4f}')
+
+        if options['prune']:
+            deleted, _ = AIRequestLog.objects.filter(created_at__lt=since).delete()
+            self.stdout.write(f'\nPruned {deleted} old row(s)')
+
+        self.stdout.write(self.style.SUCCESS('\n=== Report Complete ==='))
@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from home.forms import ITProfileForm
+
+ENDPOINTS = {
+    'generate': '/generate/',
+    'generate-stream': '/generate/stream/',
+    'it-profiles': '/it-profiles/',
+    'it-profiles-stream': '/it-profiles/stream/',
+}
+
+SAMPLE_QUESTIONS = [
+    'What is a linked list?',
+    'Explain Big-O notation with examples',
+    'How does a hash table handle collisions?',
+    'What is the difference between a process and a thread?',
+    'Explain recursion',
+    'How does binary search work?',
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Load test the AI endpoints of a running Learnbuddy server'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the running site')
+        parser.add_argument('--endpoint', choices=list(ENDPOINTS), default='generate')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=100, help='Total number of requests to send')
+        parser.add_argument(
+            '--unique',
+            action='store_true',
+            help='Make every prompt unique so caches are bypassed',
+        )
+        parser.add_argument('--timeout', type=float, default=60.0)
+    
+    def handle(self, *args, **options):
+        base_url = options['url'].rstrip('/')
+        path = ENDPOINTS[options['endpoint']]
+        page_url = base_url + path.replace('stream/', '')
+        post_url = base_url + path
+        local = threading.local()
+        profiles = [value for value, _ in ITProfileForm.PROFILE_CHOICES if value]
+        
+        def session():
+            # Each thread gets its own session and CSRF token from the form page
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+                local.session.get(page_url, timeout=options['timeout'])
+                local.csrf = local.session.cookies.get('csrftoken', '')
+            return local.session
+        
+        def payload(i):
+            suffix = f' ({uuid.uuid4().hex[:8]})' if options['unique'] else ''
+            if options['endpoint'].startswith('generate'):
+                return {'message': random.choice(SAMPLE_QUESTIONS) + suffix}
+            question = f'What should I learn first?{suffix}' if options['unique'] else ''
+            return {'profile': profiles[i % len(profiles)], 'question': question}
+        
+        def one_request(i):
+            s = session()
+            data = payload(i)
+            data['csrfmiddlewaretoken'] = local.csrf
+            started = time.perf_counter()
+            try:
+                response = s.post(post_url, data=data, headers={'Referer': page_url}, timeout=options['timeout'])
+                # Read the whole body so streamed responses are timed to the last byte
+                response.content
+                status = response.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            return status, time.perf_counter() - started
+        
+        try:
+            requests.get(page_url, timeout=options['timeout'])
+        except requests.RequestException as e:
+            raise CommandError(f'Cannot reach {page_url}: {e}')
+        
+        self.stdout.write(self.style.SUCCESS('=== AI Endpoint Load Test ===\n'))
+        self.stdout.write(f"POST {post_url}: {options['requests']} requests, concurrency {options['concurrency']}\n")
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(one_request, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        
+        latencies = sorted(latency for status, latency in results if status == 200)
+        status_counts = {}
+        for status, _ in results:
+            status_counts[status] = status_counts.get(status, 0) + 1
+        
+        self.stdout.write(f'Wall time:   {elapsed:.2f}s')
+        self.stdout.write(f'Throughput:  {len(results) / elapsed:.1f} req/s')
+        self.stdout.write(f"Status:      {', '.join(f'{k}: {v}' for k, v in sorted(status_counts.items(), key=str))}")
+        if latencies:
+            self.stdout.write(f'Latency p50: {percentile(latencies, 50) * 1000:.0f} ms')
+            self.stdout.write(f'Latency p95: {percentile(latencies, 95) * 1000:.0f} ms')
+            self.stdout.write(f'Latency p99: {percentile(latencies, 99) * 1000:.0f} ms')
+            self.stdout.write(f'Latency max: {latencies[-1] * 1000:.0f} ms')
+        
+        self.stdout.write(self.style.SUCCESS('\n=== Load Test Complete ==='))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from home.search import install_index, rebuild_index, search_backend
+
+
+class Command(BaseCommand):
+    help = 'Create the full-text search index if needed and refill it from the database'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=== Search Index Rebuild ===\n'))
+
+        # install_index also repopulates, and recreates any missing triggers
+        if not install_index():
+            raise CommandError('Full-text search needs SQLite with FTS5, searches use basic matching instead')
+        self.stdout.write(f'Indexed {rebuild_index()} row(s), search backend: {search_backend()}')
+
+        self.stdout.write(self.style.SUCCESS('\n=== Rebuild Complete ==='))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from home.views import IT_PROFILE_NAMES, find_it_profile_record, get_overview_max_age, refresh_it_profile_overview
+
+class Command(BaseCommand):
+    help = 'Pre-generate the default AI career overview for each IT profile'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile',
+            action='append',
+            choices=list(IT_PROFILE_NAMES),
+            help='Only refresh this profile (can be repeated)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate overviews even if they are still fresh',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show which overviews would be regenerated without calling the AI',
+        )
+    
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=== IT Profile Overview Refresh ===\n'))
+        
+        profiles = options['profile'] or list(IT_PROFILE_NAMES)
+        max_age = get_overview_max_age()
+        refreshed = 0
+        failed = []
+        
+        for profile in profiles:
+            # Read-only lookup; a row is only created once an overview was generated
+            record = find_it_profile_record(profile)
+            name = record.name if record is not None else IT_PROFILE_NAMES[profile]
+            
+            if record is not None and not options['force'] and not record.overview_is_stale(max_age):
+                self.stdout.write(f"✓ '{name}' is fresh (generated {record.overview_generated_at:%Y-%m-%d %H:%M})")
+                continue
+            
+            if options['dry_run']:
+                note = '' if record is not None else ' (no ITProfile row yet, one would be created)'
+                self.stdout.write(f"[DRY RUN] Would regenerate '{name}'{note}")
+                continue
+            
+            self.stdout.write(f"Generating '{name}'...")
+            if not refresh_it_profile_overview(profile, create=True):
+                self.stdout.write(self.style.WARNING(f"  Failed to generate '{name}'"))
+                failed.append(profile)
+            else:
+                refreshed += 1
+        
+        self.stdout.write(f'\nRefreshed {refreshed} overview(s)')
+        if failed:
+            raise CommandError(f"Could not generate overviews for: {', '.join(failed)}")
+        
+        self.stdout.write(self.style.SUCCESS('\n=== Refresh Complete ==='))
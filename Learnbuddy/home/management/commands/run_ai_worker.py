@@ -0,0 +1,65 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from home.ai_jobs import claim_next_job, run_job
+
+class Command(BaseCommand):
+    help = 'Process queued AI generation jobs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Maximum number of jobs processed at the same time',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait before checking an empty queue again',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for new jobs',
+        )
+    
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        worker_name = f'{socket.gethostname()}:{os.getpid()}'
+        slots = threading.BoundedSemaphore(concurrency)
+        processed = 0
+        
+        self.stdout.write(self.style.SUCCESS(f'=== AI worker {worker_name} (concurrency {concurrency}) ===\n'))
+        
+        def process(job):
+            try:
+                job = run_job(job)
+                self.stdout.write(f"{'✓' if job.status == 'done' else '✗'} {job.kind} job {job.id}: {job.status}")
+            finally:
+                connection.close()
+                slots.release()
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ai-job') as pool:
+            try:
+                while True:
+                    slots.acquire()
+                    job = claim_next_job(worker_name)
+                    if job is None:
+                        slots.release()
+                        if options['burst']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    processed += 1
+                    pool.submit(process, job)
+            except KeyboardInterrupt:
+                self.stdout.write('\nStopping, waiting for running jobs to finish...')
+        
+        self.stdout.write(self.style.SUCCESS(f'\n=== Processed {processed} job(s) ==='))
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from home.llm_stub import LatencyModel, StubConfig, make_stub_server
+
+class Command(BaseCommand):
+    help = 'Run a local OpenAI-compatible stub of the Groq chat completions API for load testing'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.8,
+            help='Mean (or median for lognormal) completion latency in seconds',
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.2,
+            help='Spread of the latency distribution (half-width, stddev or lognormal sigma)',
+        )
+        parser.add_argument(
+            '--distribution',
+            choices=LatencyModel.DISTRIBUTIONS,
+            default='lognormal',
+        )
+        parser.add_argument(
+            '--error-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of requests answered with a 500',
+        )
+        parser.add_argument(
+            '--rate-limit-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of requests answered with a 429',
+        )
+        parser.add_argument(
+            '--unavailable-model',
+            action='append',
+            default=[],
+            help='Model answered with a "model decommissioned" 400 (can be repeated)',
+        )
+        parser.add_argument(
+            '--stream-chunks',
+            type=int,
+            default=20,
+            help='Number of chunks a streamed answer is split into',
+        )
+    
+    def handle(self, *args, **options):
+        config = StubConfig(
+            latency=LatencyModel(options['distribution'], options['latency'], options['jitter']),
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            unavailable_models=options['unavailable_model'],
+            stream_chunks=options['stream_chunks'],
+        )
+        server = make_stub_server(options['host'], options['port'], config)
+        host, port = server.server_address[:2]
+        
+        self.stdout.write(self.style.SUCCESS('=== LLM Stub Server ==='))
+        self.stdout.write(f"Listening on http://{host}:{port}/openai/v1/chat/completions")
+        self.stdout.write(f"Latency: {options['distribution']} {options['latency']}s ± {options['jitter']}")
+        if options['unavailable_model']:
+            self.stdout.write(f"Unavailable models: {', '.join(options['unavailable_model'])}")
+        self.stdout.write(f"\nStart the site with AI_API_BASE_URL=http://{host}:{port}/openai/v1 to use it")
+        
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'\nServed {config.requests} request(s)')
@@ -0,0 +1,174 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from home.ai_cache import normalize_prompt, response_cache
+from home.ai_log import ai_request_log, current_endpoint
+from home.question_bank import question_bank
+from home.views import ai_executor, chat_with_ai
+
+
+def read_prompts(path, file_format='auto'):
+    """Prompts from a text file (one per line, # for comments) or JSONL, without duplicates"""
+    if file_format == 'auto':
+        file_format = 'jsonl' if path.suffix.lower() in ('.jsonl', '.ndjson') else 'text'
+
+    prompts = []
+    seen = set()
+    with path.open(encoding='utf-8') as handle:
+        for line_number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or (file_format == 'text' and line.startswith('#')):
+                continue
+            if file_format == 'jsonl':
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise CommandError(f'{path}:{line_number}: invalid JSON ({e})')
+                if isinstance(record, dict):
+                    record = record.get('message') or record.get('prompt')
+                if not isinstance(record, str) or not record.strip():
+                    raise CommandError(f'{path}:{line_number}: expected a string or an object with a "message" field')
+                line = record.strip()
+            # Prompts that normalize the same share a cache entry
+            if normalize_prompt(line) not in seen:
+                seen.add(normalize_prompt(line))
+                prompts.append(line)
+    return prompts
+
+
+def is_warm(prompt):
+    if response_cache.peek(prompt, 'main') is None:
+        return False
+    if getattr(settings, 'AI_QUESTION_BANK_ENABLED', True):
+        return question_bank.has_topic(prompt)
+    return response_cache.peek(prompt, 'questions') is not None
+
+
+class RateBudget:
+    """Spaces calls evenly so no more than per_minute start in any minute"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            slot = max(self.next_slot, time.monotonic())
+            self.next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - time.monotonic()))
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate AI answers for a list of prompts so they are served from the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('prompt_file', help='Text file with one prompt per line, or JSONL')
+        parser.add_argument(
+            '--format',
+            choices=['auto', 'text', 'jsonl'],
+            default='auto',
+            help='File format, guessed from the extension by default',
+        )
+        parser.add_argument('--concurrency', type=int, default=4, help='Prompts generated at the same time')
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=30,
+            help='Maximum prompts sent to the AI per minute (0 for no limit)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate prompts that are already cached',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show which prompts would be generated without calling the AI',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=== AI Cache Warming ===\n'))
+
+        if not getattr(settings, 'AI_CACHE_PERSISTENT', True):
+            raise CommandError('AI_CACHE_PERSISTENT is off, answers warmed here would not reach the web workers')
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1')
+
+        path = Path(options['prompt_file'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        prompts = read_prompts(path, options['format'])
+
+        # Anything already in the cache was done by an earlier run, so an
+        # interrupted warm-up picks up where it stopped
+        if options['force']:
+            pending = prompts
+        else:
+            pending = [prompt for prompt in prompts if not is_warm(prompt)]
+        self.stdout.write(f'{len(prompts)} prompt(s), {len(prompts) - len(pending)} already cached, {len(pending)} to generate')
+
+        if options['dry_run']:
+            for prompt in pending:
+                self.stdout.write(f'[DRY RUN] Would generate: {prompt[:80]}')
+            return
+        if options['force']:
+            for prompt in pending:
+                response_cache.delete(prompt, 'main')
+                response_cache.delete(prompt, 'questions')
+
+        rate = RateBudget(options['rate'])
+
+        def warm(prompt):
+            rate.wait()
+            current_endpoint.set('warm_cache')
+            started = time.monotonic()
+            try:
+                return chat_with_ai(prompt), time.monotonic() - started
+            finally:
+                connection.close()
+
+        warmed = 0
+        failed = []
+        started = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=options['concurrency'], thread_name_prefix='warm-cache')
+        futures = {pool.submit(warm, prompt): prompt for prompt in pending}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                prompt = futures[future]
+                result, elapsed = future.result()
+                if result.startswith('Error:'):
+                    failed.append(prompt)
+                    self.stdout.write(self.style.WARNING(f'[{done}/{len(pending)}] ✗ {prompt[:60]} - {result[:80]}'))
+                else:
+                    warmed += 1
+                    self.stdout.write(f'[{done}/{len(pending)}] ✓ {prompt[:60]} ({elapsed:.1f}s)')
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.stdout.write(self.style.WARNING(
+                f'\nInterrupted after {warmed} prompt(s). Run the command again to continue.'
+            ))
+            return
+        pool.shutdown()
+
+        # Follow-up questions are still being generated in the background
+        # (question bank fills, or calls that missed the grace period);
+        # let them land before exiting
+        ai_executor.shutdown(wait=True)
+        question_bank.shutdown()
+        ai_request_log.flush()
+
+        self.stdout.write(f'\nWarmed {warmed} prompt(s) in {time.monotonic() - started:.1f}s')
+        if failed:
+            raise CommandError(f'{len(failed)} prompt(s) failed, run the command again to retry them')
+
+        self.stdout.write(self.style.SUCCESS('\n=== Warming Complete ==='))
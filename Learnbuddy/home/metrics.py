@@ -0,0 +1,133 @@
+"""
+In-process metrics for the AI chat pipeline.
+
+Counters and latency histograms are kept in plain dicts under one lock,
+so recording a call on the hot path costs a dict update or two. The
+/metrics view renders them, together with the cache and bulkhead stats
+gathered at scrape time, in the Prometheus text exposition format.
+Every worker process keeps its own numbers, like the other stats
+endpoints.
+"""
+import bisect
+import threading
+from collections import defaultdict
+
+# Upper bounds in seconds for the upstream latency histogram
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+
+# Exported from startup at 0, so rate() and alerts see every outcome before it first happens
+QUESTION_OUTCOMES = ('ok', 'error', 'timeout', 'skipped', 'bank_hit', 'bank_miss')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+class AIMetrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._calls = defaultdict(int)
+        self._tokens = defaultdict(int)
+        self._fallbacks = defaultdict(int)
+        self._questions = defaultdict(int)
+        # (model, response_type) -> [bucket counts..., +Inf count, sum]
+        self._latency = {}
+
+    def record_call(self, model, response_type, status, latency, usage=None):
+        """One upstream attempt; status is the HTTP code or 'exception'"""
+        index = bisect.bisect_left(self.buckets, latency)
+        with self._lock:
+            self._calls[(model, response_type, str(status))] += 1
+            histogram = self._latency.get((model, response_type))
+            if histogram is None:
+                histogram = self._latency[(model, response_type)] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += latency
+            if usage:
+                for kind in ('prompt_tokens', 'completion_tokens'):
+                    self._tokens[(model, kind[:-len('_tokens')])] += usage.get(kind) or 0
+
+    def record_fallback(self, model, response_type):
+        """model could not answer and the next one in line is tried"""
+        with self._lock:
+            self._fallbacks[(model, response_type)] += 1
+
+    def record_questions(self, outcome):
+        """
+        How the follow-up questions ended up: ok, error, timeout or skipped
+        when generated alongside the answer, bank_hit or bank_miss when
+        served from the question bank
+        """
+        with self._lock:
+            self._questions[outcome] += 1
+
+    def reset(self):
+        with self._lock:
+            for series in (self._calls, self._tokens, self._fallbacks, self._questions, self._latency):
+                series.clear()
+
+    def render(self, gauges=()):
+        """
+        Prometheus text format. gauges is an iterable of
+        (name, help, label_names, {label_values: value}) collected by the caller.
+        """
+        with self._lock:
+            calls = dict(self._calls)
+            tokens = dict(self._tokens)
+            fallbacks = dict(self._fallbacks)
+            questions = dict.fromkeys(QUESTION_OUTCOMES, 0)
+            questions.update(self._questions)
+            latency = {key: list(value) for key, value in self._latency.items()}
+
+        lines = []
+
+        def family(name, kind, help_text, label_names, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for values, value in sorted(samples.items()):
+                lines.append(f'{name}{_labels(label_names, values)} {_number(value)}')
+
+        family('learnbuddy_ai_requests_total', 'counter', 'Upstream chat completion attempts by outcome.',
+               ('model', 'response_type', 'status'), calls)
+
+        name = 'learnbuddy_ai_request_duration_seconds'
+        lines.append(f'# HELP {name} Upstream chat completion latency.')
+        lines.append(f'# TYPE {name} histogram')
+        for (model, response_type), histogram in sorted(latency.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), histogram):
+                cumulative += count
+                labels = _labels(('model', 'response_type', 'le'), (model, response_type, bound))
+                lines.append(f'{name}_bucket{labels} {cumulative}')
+            labels = _labels(('model', 'response_type'), (model, response_type))
+            lines.append(f'{name}_sum{labels} {_number(histogram[-1])}')
+            lines.append(f'{name}_count{labels} {cumulative}')
+
+        family('learnbuddy_ai_tokens_total', 'counter', 'Tokens reported in the usage field of completions.',
+               ('model', 'kind'), tokens)
+        family('learnbuddy_ai_fallbacks_total', 'counter', 'Times a model failed and the next one was tried.',
+               ('model', 'response_type'), fallbacks)
+        family('learnbuddy_ai_questions_total', 'counter', 'Follow-up question outcomes per chat.',
+               ('outcome',), {(outcome,): count for outcome, count in questions.items()})
+
+        for name, help_text, label_names, samples in gauges:
+            family(name, 'gauge', help_text, label_names, samples)
+
+        return '\n'.join(lines) + '\n'
+
+
+ai_metrics = AIMetrics()
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_airesponsecache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itprofile',
+            name='default_overview',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='itprofile',
+            name='key',
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='itprofile',
+            name='overview_generated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_itprofile_default_overview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIRequestLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+    ]
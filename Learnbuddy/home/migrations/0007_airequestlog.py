@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0006_aijob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIRequestLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('endpoint', models.CharField(blank=True, max_length=30)),
+                ('response_type', models.CharField(max_length=10)),
+                ('prompt_hash', models.CharField(db_index=True, max_length=64)),
+                ('prompt', models.CharField(max_length=300)),
+                ('model', models.CharField(blank=True, max_length=100)),
+                ('cache', models.CharField(choices=[('miss', 'Miss'), ('hit', 'Hit'), ('shared', 'Shared'), ('semantic', 'Semantic'), ('precomputed', 'Precomputed'), ('error', 'Error')], max_length=12)),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('response_chars', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
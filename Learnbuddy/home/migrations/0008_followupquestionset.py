@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0007_airequestlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowUpQuestionSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic_key', models.CharField(db_index=True, max_length=64)),
+                ('topic', models.CharField(max_length=300)),
+                ('questions', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
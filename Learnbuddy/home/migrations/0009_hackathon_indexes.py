@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0008_followupquestionset'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hackathon',
+            index=models.Index(fields=['start_date', 'id'], name='home_hackat_start_d_ff9e8e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hackathon',
+            index=models.Index(fields=['organizer', 'start_date'], name='home_hackat_organiz_30c16d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hackathon',
+            index=models.Index(fields=['title'], name='home_hackat_title_08740a_idx'),
+        ),
+    ]
@@ -0,0 +1,161 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:45
+
+from django.db import DatabaseError, migrations
+
+# The index as it stood at this migration, written out here so later
+# changes to home.search can't change what this migration does. Newer
+# shapes are installed by home.search.ensure_index after migrate.
+CREATE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS home_search_index USING fts5(
+        kind UNINDEXED, object_id UNINDEXED, title, body, tokenize = 'porter unicode61'
+    )
+"""
+
+# rowid is object id * 8 + the kind's number
+CREATE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS home_hackathon_search_insert AFTER INSERT ON home_hackathon BEGIN
+        INSERT INTO home_search_index(rowid, kind, object_id, title, body) VALUES (
+            new.id * 8 + 1, 'hackathon', new.id, coalesce(new.title, ''),
+            coalesce(new.organizer, '') || ' ' || coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_hackathon_search_update AFTER UPDATE ON home_hackathon BEGIN
+        DELETE FROM home_search_index WHERE rowid = old.id * 8 + 1;
+        INSERT INTO home_search_index(rowid, kind, object_id, title, body) VALUES (
+            new.id * 8 + 1, 'hackathon', new.id, coalesce(new.title, ''),
+            coalesce(new.organizer, '') || ' ' || coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_hackathon_search_delete AFTER DELETE ON home_hackathon BEGIN
+        DELETE FROM home_search_index WHERE rowid = old.id * 8 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_cslearningpath_search_insert AFTER INSERT ON home_cslearningpath BEGIN
+        INSERT INTO home_search_index(rowid, kind, object_id, title, body) VALUES (
+            new.id * 8 + 2, 'learning_path', new.id, coalesce(new.title, ''),
+            coalesce(new.description, '') || ' ' || coalesce(new.difficulty_level, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_cslearningpath_search_update AFTER UPDATE ON home_cslearningpath BEGIN
+        DELETE FROM home_search_index WHERE rowid = old.id * 8 + 2;
+        INSERT INTO home_search_index(rowid, kind, object_id, title, body) VALUES (
+            new.id * 8 + 2, 'learning_path', new.id, coalesce(new.title, ''),
+            coalesce(new.description, '') || ' ' || coalesce(new.difficulty_level, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_cslearningpath_search_delete AFTER DELETE ON home_cslearningpath BEGIN
+        DELETE FROM home_search_index WHERE rowid = old.id * 8 + 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_csknowledgearea_search_insert AFTER INSERT ON home_csknowledgearea BEGIN
+        INSERT INTO home_search_index(rowid, kind, object_id, title, body) VALUES (
+            new.id * 8 + 3, 'knowledge_area', new.id, coalesce(new.name, ''),
+            coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_csknowledgearea_search_update AFTER UPDATE ON home_csknowledgearea BEGIN
+        DELETE FROM home_search_index WHERE rowid = old.id * 8 + 3;
+        INSERT INTO home_search_index(rowid, kind, object_id, title, body) VALUES (
+            new.id * 8 + 3, 'knowledge_area', new.id, coalesce(new.name, ''),
+            coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_csknowledgearea_search_delete AFTER DELETE ON home_csknowledgearea BEGIN
+        DELETE FROM home_search_index WHERE rowid = old.id * 8 + 3;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_itprofile_search_insert AFTER INSERT ON home_itprofile BEGIN
+        INSERT INTO home_search_index(rowid, kind, object_id, title, body) VALUES (
+            new.id * 8 + 4, 'it_profile', new.id, coalesce(new.name, ''),
+            coalesce(new.description, '') || ' ' || coalesce(new.skills_required, '') || ' '
+            || coalesce(new.career_path, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_itprofile_search_update AFTER UPDATE ON home_itprofile BEGIN
+        DELETE FROM home_search_index WHERE rowid = old.id * 8 + 4;
+        INSERT INTO home_search_index(rowid, kind, object_id, title, body) VALUES (
+            new.id * 8 + 4, 'it_profile', new.id, coalesce(new.name, ''),
+            coalesce(new.description, '') || ' ' || coalesce(new.skills_required, '') || ' '
+            || coalesce(new.career_path, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS home_itprofile_search_delete AFTER DELETE ON home_itprofile BEGIN
+        DELETE FROM home_search_index WHERE rowid = old.id * 8 + 4;
+    END
+    """,
+]
+
+FILL_INDEX = [
+    """
+    INSERT INTO home_search_index(rowid, kind, object_id, title, body)
+    SELECT id * 8 + 1, 'hackathon', id, coalesce(title, ''),
+        coalesce(organizer, '') || ' ' || coalesce(description, '')
+    FROM home_hackathon
+    """,
+    """
+    INSERT INTO home_search_index(rowid, kind, object_id, title, body)
+    SELECT id * 8 + 2, 'learning_path', id, coalesce(title, ''),
+        coalesce(description, '') || ' ' || coalesce(difficulty_level, '')
+    FROM home_cslearningpath
+    """,
+    """
+    INSERT INTO home_search_index(rowid, kind, object_id, title, body)
+    SELECT id * 8 + 3, 'knowledge_area', id, coalesce(name, ''), coalesce(description, '')
+    FROM home_csknowledgearea
+    """,
+    """
+    INSERT INTO home_search_index(rowid, kind, object_id, title, body)
+    SELECT id * 8 + 4, 'it_profile', id, coalesce(name, ''),
+        coalesce(description, '') || ' ' || coalesce(skills_required, '') || ' ' || coalesce(career_path, '')
+    FROM home_itprofile
+    """,
+]
+
+DROP_INDEX = [
+    f'DROP TRIGGER IF EXISTS home_{model}_search_{action}'
+    for model in ('hackathon', 'cslearningpath', 'csknowledgearea', 'itprofile')
+    for action in ('insert', 'update', 'delete')
+] + ['DROP TABLE IF EXISTS home_search_index']
+
+
+def install_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(CREATE_TABLE)
+    except DatabaseError:
+        # SQLite built without FTS5, search falls back to icontains
+        return
+    schema_editor.execute('DELETE FROM home_search_index')
+    for statement in CREATE_TRIGGERS + FILL_INDEX:
+        schema_editor.execute(statement)
+
+
+def uninstall_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_hackathon_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
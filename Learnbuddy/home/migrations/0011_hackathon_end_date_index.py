@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hackathon',
+            index=models.Index(fields=['end_date'], name='home_hackat_end_dat_5005f3_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# Seeded profile names (add_it_profiles.py) and the ITProfileForm choice
+# each one answers for
+SEEDED_KEYS = {
+    'Software Developer': 'software_developer',
+    'Data Scientist': 'data_scientist',
+    'Cybersecurity Analyst': 'cybersecurity_analyst',
+    'DevOps Engineer': 'devops_engineer',
+    'UX/UI Designer': 'ui_ux_designer',
+    'Cloud Architect': 'cloud_engineer',
+    'Machine Learning Engineer': 'ai_engineer',
+}
+
+
+def link_seeded_profiles(apps, schema_editor):
+    ITProfile = apps.get_model('home', 'ITProfile')
+    for name, key in SEEDED_KEYS.items():
+        seeded = ITProfile.objects.filter(key__isnull=True, name=name).order_by('id').first()
+        if seeded is None:
+            continue
+        # Empty rows the request path created when the names didn't match
+        # only hold an overview, move it to the seeded row
+        blank = ITProfile.objects.filter(key=key, description='').first()
+        if blank is not None:
+            seeded.default_overview = blank.default_overview
+            seeded.overview_generated_at = blank.overview_generated_at
+            blank.delete()
+        elif ITProfile.objects.filter(key=key).exists():
+            continue
+        seeded.key = key
+        seeded.save(update_fields=['key', 'default_overview', 'overview_generated_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0011_hackathon_end_date_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_seeded_profiles, migrations.RunPython.noop),
+    ]
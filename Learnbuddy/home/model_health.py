@@ -0,0 +1,151 @@
+"""
+Circuit breaker registry for the AI models in the fallback list.
+
+Each model starts closed. A "model not available" answer opens its
+circuit for AI_MODEL_UNAVAILABLE_COOLDOWN seconds, and
+AI_MODEL_FAILURE_THRESHOLD consecutive errors open it for
+AI_MODEL_ERROR_COOLDOWN seconds. Once the cool-down has passed the
+circuit is half-open: a single request is let through as a probe and
+its outcome closes or re-opens the circuit. The registry is shared by
+every request in the process and also keeps per-model latency and
+error statistics.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ModelState:
+    def __init__(self, name):
+        self.name = name
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.successes = 0
+        self.failures = 0
+        self.unavailable = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_error = ''
+        # Recent successful latencies, used for percentile-based hedging
+        self.recent_latencies = deque(maxlen=200)
+
+    def as_dict(self):
+        calls = self.successes + self.failures
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'successes': self.successes,
+            'failures': self.failures,
+            'unavailable': self.unavailable,
+            'error_rate': round(self.failures / calls, 4) if calls else 0.0,
+            'avg_latency_ms': round(self.total_latency / calls * 1000, 1) if calls else 0.0,
+            'max_latency_ms': round(self.max_latency * 1000, 1),
+            'retry_in_seconds': round(max(0.0, self.open_until - time.monotonic()), 1) if self.state == OPEN else 0,
+            'last_error': self.last_error,
+        }
+
+
+class ModelHealthRegistry:
+    def __init__(self, failure_threshold=3, error_cooldown=30, unavailable_cooldown=3600):
+        self.failure_threshold = failure_threshold
+        self.error_cooldown = error_cooldown
+        self.unavailable_cooldown = unavailable_cooldown
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _get(self, model):
+        if model not in self._models:
+            self._models[model] = ModelState(model)
+        return self._models[model]
+
+    def candidates(self, models_to_try):
+        """Models whose circuit is not open, in the preferred order"""
+        now = time.monotonic()
+        candidates = []
+        with self._lock:
+            for model in models_to_try:
+                state = self._get(model)
+                if state.state == OPEN and now >= state.open_until:
+                    state.state = HALF_OPEN
+                    state.probe_in_flight = False
+                if state.state != OPEN:
+                    candidates.append(model)
+        return candidates
+
+    def acquire(self, model):
+        """Whether a request may call model now; claims the probe slot when half-open"""
+        with self._lock:
+            state = self._get(model)
+            if state.state == CLOSED:
+                return True
+            if state.state == HALF_OPEN and not state.probe_in_flight:
+                state.probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, model, latency):
+        with self._lock:
+            state = self._get(model)
+            state.successes += 1
+            state.total_latency += latency
+            state.max_latency = max(state.max_latency, latency)
+            state.recent_latencies.append(latency)
+            state.consecutive_failures = 0
+            state.state = CLOSED
+            state.probe_in_flight = False
+
+    def record_failure(self, model, latency, error='', unavailable=False):
+        with self._lock:
+            state = self._get(model)
+            state.failures += 1
+            state.total_latency += latency
+            state.max_latency = max(state.max_latency, latency)
+            state.consecutive_failures += 1
+            state.last_error = error[:200]
+            state.probe_in_flight = False
+            if unavailable:
+                state.unavailable += 1
+                self._open(state, self.unavailable_cooldown)
+            elif state.state == HALF_OPEN or state.consecutive_failures >= self.failure_threshold:
+                self._open(state, self.error_cooldown)
+
+    def latency_percentile(self, model, percentile, min_samples=20):
+        """Recent successful latency at the given percentile, or None without enough samples"""
+        with self._lock:
+            samples = sorted(self._get(model).recent_latencies)
+        if len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+    def release(self, model):
+        """Give back a half-open probe slot that ended without a verdict"""
+        with self._lock:
+            self._get(model).probe_in_flight = False
+
+    def _open(self, state, cooldown):
+        state.state = OPEN
+        state.open_until = time.monotonic() + cooldown
+
+    def reset(self):
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        with self._lock:
+            return {name: state.as_dict() for name, state in self._models.items()}
+
+
+model_health = ModelHealthRegistry(
+    failure_threshold=getattr(settings, 'AI_MODEL_FAILURE_THRESHOLD', 3),
+    error_cooldown=getattr(settings, 'AI_MODEL_ERROR_COOLDOWN', 30),
+    unavailable_cooldown=getattr(settings, 'AI_MODEL_UNAVAILABLE_COOLDOWN', 3600),
+)
@@ -1,5 +1,8 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class ITProfile(models.Model):
     name = models.CharField(max_length=100)
@@ -8,9 +11,20 @@ class ITProfile(models.Model):
     career_path = models.TextField()
     average_salary = models.CharField(max_length=100)
     job_outlook = models.TextField()
+    # Matches the ITProfileForm choice value, e.g. 'data_scientist'
+    key = models.CharField(max_length=50, unique=True, null=True, blank=True)
+    # AI career overview served when no specific question is asked
+    default_overview = models.TextField(blank=True)
+    overview_generated_at = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
         return self.name
+    
+    def overview_is_stale(self, max_age):
+        """Whether the stored overview is missing or older than max_age (a timedelta)"""
+        if not self.default_overview or self.overview_generated_at is None:
+            return True
+        return timezone.now() - self.overview_generated_at > max_age
 
 class Contact(models.Model):
     name = models.CharField(max_length=100)
@@ -48,6 +62,31 @@ class PathAreaRelationship(models.Model):
     class Meta:
         ordering = ['order']
 
+class HackathonQuerySet(models.QuerySet):
+    def with_status(self, today=None):
+        """Annotate each hackathon with status: upcoming, ongoing or past"""
+        today = today or timezone.localdate()
+        return self.annotate(status=models.Case(
+            models.When(start_date__gt=today, then=models.Value('upcoming')),
+            models.When(end_date__lt=today, then=models.Value('past')),
+            default=models.Value('ongoing'),
+            output_field=models.CharField(),
+        ))
+
+    def with_status_of(self, status, today=None):
+        """
+        Only hackathons with the given status. Each one is a range on the
+        start_date or end_date index, not a filter on the annotation.
+        """
+        today = today or timezone.localdate()
+        if status == 'upcoming':
+            return self.filter(start_date__gt=today)
+        if status == 'ongoing':
+            return self.filter(start_date__lte=today, end_date__gte=today)
+        if status == 'past':
+            return self.filter(end_date__lt=today)
+        raise ValueError(f'Unknown hackathon status: {status}')
+
 class Hackathon(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -57,6 +96,18 @@ class Hackathon(models.Model):
     registration_url = models.URLField()
     image = models.CharField(max_length=200, blank=True, null=True)
     
+    STATUSES = ('upcoming', 'ongoing', 'past')
+    
+    objects = HackathonQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date', 'id']),
+            models.Index(fields=['organizer', 'start_date']),
+            models.Index(fields=['end_date']),
+            models.Index(fields=['title']),
+        ]
+    
     def __str__(self):
         return self.title
 
@@ -69,3 +120,88 @@ class UserProgress(models.Model):
     
     class Meta:
         unique_together = ['user', 'learning_path', 'knowledge_area']
+
+class AIResponseCache(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    prompt_type = models.CharField(max_length=20)
+    prompt = models.TextField()
+    response = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.prompt_type}: {self.prompt[:50]}"
+
+class AIRequestLock(models.Model):
+    # Held by the worker process currently fetching this cache key upstream
+    key = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.key
+
+class AIJob(models.Model):
+    KIND_CHOICES = [
+        ('generate', 'Generate'),
+        ('it_profile', 'IT Profile'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    result = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} job {self.id} ({self.status})"
+
+class AIRequestLog(models.Model):
+    CACHE_CHOICES = [
+        ('miss', 'Miss'),
+        ('hit', 'Hit'),
+        ('shared', 'Shared'),
+        ('semantic', 'Semantic'),
+        ('precomputed', 'Precomputed'),
+        ('error', 'Error'),
+    ]
+    
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    endpoint = models.CharField(max_length=30, blank=True)
+    response_type = models.CharField(max_length=10)
+    prompt_hash = models.CharField(max_length=64, db_index=True)
+    prompt = models.CharField(max_length=300)
+    model = models.CharField(max_length=100, blank=True)
+    cache = models.CharField(max_length=12, choices=CACHE_CHOICES)
+    latency_ms = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    response_chars = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.endpoint or '-'} {self.response_type} {self.cache} ({self.model or 'no model'})"
+
+class FollowUpQuestionSet(models.Model):
+    topic_key = models.CharField(max_length=64, db_index=True)
+    topic = models.CharField(max_length=300)
+    questions = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Questions for '{self.topic[:50]}'"
@@ -0,0 +1,169 @@
+"""
+Follow-up question bank keyed by topic.
+
+The "Test Your Understanding" questions depend only on the topic, so they
+are stored per normalized topic (the stemmed keywords of the prompt, the
+same tokens the semantic cache uses) instead of being generated for
+every request. A hit is served straight from the bank, rotating through
+up to AI_QUESTION_BANK_VARIANTS stored variants. A miss returns nothing
+and fills the bank in a background thread, so the questions call never
+sits on the request path; variants older than AI_QUESTION_BANK_REFRESH
+seconds are replaced the same way.
+"""
+import contextvars
+import hashlib
+import itertools
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from .ai_cache import normalize_prompt
+from .semantic_cache import tokenize
+
+QUESTION_LINE_RE = re.compile(r'\s*\d+[.)]\s+\S')
+
+
+def topic_key(message):
+    terms = sorted(set(tokenize(message))) or [normalize_prompt(message)]
+    return hashlib.sha256(' '.join(terms).encode('utf-8')).hexdigest()
+
+
+def looks_like_questions(text):
+    return sum(1 for line in text.splitlines() if QUESTION_LINE_RE.match(line)) >= 3
+
+
+class QuestionBank:
+    def __init__(self, variants=3, refresh_after=7 * 86400, memory_ttl=300, max_topics=1024, workers=2):
+        self.variants = variants
+        self.refresh_after = refresh_after
+        self.memory_ttl = memory_ttl
+        self.max_topics = max_topics
+        self._topics = OrderedDict()  # key -> (questions list, newest created_at, loaded at)
+        self._rotation = {}
+        self._filling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='question-bank')
+        self._stats = {'hits': 0, 'misses': 0, 'fills': 0, 'failed_fills': 0}
+
+    def get(self, message, fetch):
+        """
+        Questions for the topic of message, or None. fetch() generates a
+        fresh set and is run in the background on a miss or when the
+        stored variants are due for a refresh.
+        """
+        key = topic_key(message)
+        variants, newest = self._load(key)
+        if not variants or len(variants) < self.variants or self._is_stale(newest):
+            self._schedule_fill(key, message, fetch)
+        with self._lock:
+            if not variants:
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            rotation = self._rotation.setdefault(key, itertools.count())
+            return variants[next(rotation) % len(variants)]
+
+    def add(self, message, questions):
+        """Store a variant for the topic, dropping the oldest beyond the limit"""
+        from .models import FollowUpQuestionSet
+        if not looks_like_questions(questions):
+            return False
+        key = topic_key(message)
+        try:
+            FollowUpQuestionSet.objects.create(topic_key=key, topic=normalize_prompt(message)[:300], questions=questions)
+            stale_ids = list(
+                FollowUpQuestionSet.objects.filter(topic_key=key)
+                .order_by('-created_at', '-id')
+                .values_list('id', flat=True)[self.variants:]
+            )
+            if stale_ids:
+                FollowUpQuestionSet.objects.filter(id__in=stale_ids).delete()
+        except DatabaseError:
+            return False
+        with self._lock:
+            self._topics.pop(key, None)
+        return True
+
+    def has_topic(self, message):
+        return bool(self._load(topic_key(message))[0])
+
+    def clear(self):
+        """Forget the in-memory topics and rotation; the stored variants stay"""
+        with self._lock:
+            self._topics.clear()
+            self._rotation.clear()
+
+    def shutdown(self):
+        """Wait for background fills to finish, for management commands about to exit"""
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['topics_in_memory'] = len(self._topics)
+            stats['filling'] = len(self._filling)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _is_stale(self, newest):
+        return newest is not None and timezone.now() - newest > timedelta(seconds=self.refresh_after)
+
+    def _load(self, key):
+        from .models import FollowUpQuestionSet
+        now = time.monotonic()
+        with self._lock:
+            entry = self._topics.get(key)
+            if entry is not None and now - entry[2] < self.memory_ttl:
+                self._topics.move_to_end(key)
+                return entry[0], entry[1]
+        try:
+            rows = list(
+                FollowUpQuestionSet.objects.filter(topic_key=key)
+                .order_by('-created_at', '-id')
+                .values_list('questions', 'created_at')[:self.variants]
+            )
+        except DatabaseError:
+            return [], None
+        variants = [questions for questions, _ in rows]
+        newest = rows[0][1] if rows else None
+        # Misses aren't remembered, another process may be filling the topic
+        if not variants:
+            return variants, newest
+        with self._lock:
+            self._topics[key] = (variants, newest, now)
+            self._topics.move_to_end(key)
+            while len(self._topics) > self.max_topics:
+                self._topics.popitem(last=False)
+        return variants, newest
+
+    def _schedule_fill(self, key, message, fetch):
+        with self._lock:
+            if key in self._filling:
+                return
+            self._filling.add(key)
+        self._executor.submit(contextvars.copy_context().run, self._fill, key, message, fetch)
+
+    def _fill(self, key, message, fetch):
+        try:
+            questions = fetch()
+            stored = not questions.startswith("Error:") and self.add(message, questions)
+            with self._lock:
+                self._stats['fills' if stored else 'failed_fills'] += 1
+        finally:
+            with self._lock:
+                self._filling.discard(key)
+            connection.close()
+
+
+question_bank = QuestionBank(
+    variants=getattr(settings, 'AI_QUESTION_BANK_VARIANTS', 3),
+    refresh_after=getattr(settings, 'AI_QUESTION_BANK_REFRESH', 7 * 86400),
+)
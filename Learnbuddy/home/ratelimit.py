@@ -0,0 +1,121 @@
+"""
+Per-client token-bucket rate limiting for the AI endpoints.
+
+Each client gets one bucket per endpoint for its IP address and one for
+its session. A request has to take a token from both. Buckets refill
+continuously at `per_minute` tokens a minute up to `capacity`, and are
+kept in the AI_RATE_LIMIT_CACHE cache alias so every worker process
+sees the same state. Updates are read-modify-write, so two processes
+racing on the same bucket can occasionally let an extra request
+through; that is acceptable for abuse protection. When the cache is
+unreachable the limiter fails open and logs a warning.
+"""
+import asyncio
+import functools
+import logging
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+DEFAULT_LIMIT = {'capacity': 5, 'per_minute': 10}
+
+logger = logging.getLogger(__name__)
+
+
+def get_limit(endpoint):
+    limits = getattr(settings, 'AI_RATE_LIMITS', {})
+    return limits.get(endpoint, DEFAULT_LIMIT)
+
+
+def get_client_ip(request):
+    if getattr(settings, 'AI_RATE_LIMIT_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+def take_token(key, capacity, per_minute):
+    """Take one token from the bucket; returns (allowed, seconds until a token is available)"""
+    cache = caches[getattr(settings, 'AI_RATE_LIMIT_CACHE', 'default')]
+    rate = per_minute / 60.0
+    now = time.time()
+    
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    
+    if tokens >= 1:
+        allowed, retry_after = True, 0
+        tokens -= 1
+    else:
+        allowed, retry_after = False, math.ceil((1 - tokens) / rate)
+    
+    # Keep the bucket around only as long as it takes to refill completely
+    cache.set(key, (tokens, now), timeout=math.ceil(capacity / rate) + 1)
+    return allowed, retry_after
+
+
+def check_rate_limit(request, endpoint):
+    """Seconds the client has to wait before calling endpoint again, or 0"""
+    if not getattr(settings, 'AI_RATE_LIMIT_ENABLED', True):
+        return 0
+    limit = get_limit(endpoint)
+    
+    keys = [f'ratelimit:{endpoint}:ip:{get_client_ip(request)}']
+    session = getattr(request, 'session', None)
+    if session is not None and session.session_key:
+        keys.append(f'ratelimit:{endpoint}:session:{session.session_key}')
+    
+    retry_after = 0
+    try:
+        for key in keys:
+            allowed, wait = take_token(key, limit['capacity'], limit['per_minute'])
+            if not allowed:
+                retry_after = max(retry_after, wait)
+    except Exception as e:
+        logger.warning("Rate limiting for %s is failing open, the %r cache is unavailable: %s",
+                       endpoint, getattr(settings, 'AI_RATE_LIMIT_CACHE', 'default'), e)
+        return 0
+    return retry_after
+
+
+def too_many_requests(request, retry_after):
+    message = f'Too many requests. Please wait {retry_after} seconds and try again.'
+    wants_json = (
+        request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        or 'application/json' in request.headers.get('Accept', '')
+    )
+    if wants_json:
+        response = JsonResponse({'error': message, 'retry_after': retry_after}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(endpoint):
+    """Limit POSTs to a view (sync or async) with the endpoint's token bucket"""
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method == 'POST':
+                    retry_after = await sync_to_async(check_rate_limit)(request, endpoint)
+                    if retry_after:
+                        return too_many_requests(request, retry_after)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method == 'POST':
+                retry_after = check_rate_limit(request, endpoint)
+                if retry_after:
+                    return too_many_requests(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
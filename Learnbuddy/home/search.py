@@ -0,0 +1,277 @@
+"""
+Site-wide search over hackathons, learning paths, knowledge areas and
+IT profiles.
+
+On SQLite the searchable text lives in one FTS5 table, home_search_index,
+ranked with BM25 (title matches weigh more than body matches) and
+returned with highlighted snippets. Triggers on the source tables keep
+it in sync, so saves, bulk updates, deletes and the hackathon sync
+scripts are all picked up without any application code. Each row's
+rowid encodes (object id, kind), so updates and deletes touch exactly
+one index row.
+
+Other database backends, or SQLite builds without FTS5, fall back to
+icontains matching with a simple title-first ranking and snippets cut
+in Python. Both paths return the same result dicts.
+"""
+import re
+
+from django.db import DatabaseError, connection
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.http import urlencode
+
+from .models import CSKnowledgeArea, CSLearningPath, Hackathon, ITProfile
+
+INDEX_TABLE = 'home_search_index'
+
+# kind -> (number used in the rowid, model, title field, body fields)
+SOURCES = {
+    'hackathon': (1, Hackathon, 'title', ['organizer', 'description']),
+    'learning_path': (2, CSLearningPath, 'title', ['description', 'difficulty_level']),
+    'knowledge_area': (3, CSKnowledgeArea, 'name', ['description']),
+    'it_profile': (4, ITProfile, 'name', ['description', 'skills_required', 'career_path']),
+}
+ROWID_FACTOR = 8
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+# Placeholders for highlight boundaries, swapped for <mark> after escaping
+MARK_START, MARK_END = '\x02', '\x03'
+
+_fts_available = None
+
+
+def search_terms(query):
+    return [term.lower() for term in TERM_RE.findall(query or '')][:10]
+
+
+def fts_query(query):
+    """FTS5 MATCH expression: every term must match, each as a prefix"""
+    return ' '.join(f'"{term}"*' for term in search_terms(query))
+
+
+def fts_available():
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = False
+        if connection.vendor == 'sqlite':
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [INDEX_TABLE])
+                    _fts_available = cursor.fetchone() is not None
+            except DatabaseError:
+                pass
+    return _fts_available
+
+
+def _body_sql(fields, row):
+    return " || ' ' || ".join(f"coalesce({row}.{field}, '')" for field in fields)
+
+
+def index_statements():
+    """SQL creating the FTS5 table and the triggers that keep it in sync"""
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, title, body, tokenize = 'porter unicode61')"
+    ]
+    for kind, (number, model, title_field, body_fields) in SOURCES.items():
+        table = model._meta.db_table
+
+        def insert(row):
+            return (
+                f"INSERT INTO {INDEX_TABLE}(rowid, kind, object_id, title, body) VALUES ("
+                f"{row}.id * {ROWID_FACTOR} + {number}, '{kind}', {row}.id, "
+                f"coalesce({row}.{title_field}, ''), {_body_sql(body_fields, row)});"
+            )
+
+        delete = f"DELETE FROM {INDEX_TABLE} WHERE rowid = old.id * {ROWID_FACTOR} + {number};"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert('new')} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table} BEGIN {delete} {insert('new')} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        ]
+    return statements
+
+
+def drop_statements():
+    statements = []
+    for _, model, _, _ in SOURCES.values():
+        table = model._meta.db_table
+        for action in ('insert', 'update', 'delete'):
+            statements.append(f"DROP TRIGGER IF EXISTS {table}_search_{action}")
+    statements.append(f"DROP TABLE IF EXISTS {INDEX_TABLE}")
+    return statements
+
+
+def install_index(schema_connection=None):
+    """Create the index and triggers and fill the index; a no-op where FTS5 isn't available"""
+    global _fts_available
+    schema_connection = schema_connection or connection
+    if schema_connection.vendor != 'sqlite':
+        return False
+    try:
+        with schema_connection.cursor() as cursor:
+            for statement in index_statements():
+                cursor.execute(statement)
+    except DatabaseError:
+        # SQLite built without FTS5
+        return False
+    rebuild_index(schema_connection)
+    _fts_available = True
+    return True
+
+
+def uninstall_index(schema_connection=None):
+    global _fts_available
+    schema_connection = schema_connection or connection
+    if schema_connection.vendor != 'sqlite':
+        return
+    with schema_connection.cursor() as cursor:
+        for statement in drop_statements():
+            cursor.execute(statement)
+    _fts_available = False
+
+
+def rebuild_index(schema_connection=None):
+    """Repopulate the index from the source tables, returns the number of rows indexed"""
+    schema_connection = schema_connection or connection
+    with schema_connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+        for kind, (number, model, title_field, body_fields) in SOURCES.items():
+            table = model._meta.db_table
+            cursor.execute(
+                f"INSERT INTO {INDEX_TABLE}(rowid, kind, object_id, title, body) "
+                f"SELECT id * {ROWID_FACTOR} + {number}, '{kind}', id, coalesce({title_field}, ''), "
+                f"{_body_sql(body_fields, table)} FROM {table}"
+            )
+        cursor.execute(f"SELECT count(*) FROM {INDEX_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def matching_ids_sql(kind):
+    """SQL selecting the ids of kind that match the FTS expression passed as its only parameter"""
+    number = SOURCES[kind][0]
+    return (
+        f"SELECT rowid / {ROWID_FACTOR} FROM {INDEX_TABLE} "
+        f"WHERE {INDEX_TABLE} MATCH %s AND rowid %% {ROWID_FACTOR} = {number}"
+    )
+
+
+def ensure_index(schema_connection=None):
+    """
+    Reinstall the index if its table or triggers are missing. Rebuilding a
+    table during a migration on SQLite drops that table's triggers, so this
+    runs after every migrate.
+    """
+    schema_connection = schema_connection or connection
+    if schema_connection.vendor != 'sqlite':
+        return False
+    names = [INDEX_TABLE] + [
+        f'{model._meta.db_table}_search_{action}'
+        for _, model, _, _ in SOURCES.values()
+        for action in ('insert', 'update', 'delete')
+    ]
+    with schema_connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT count(*) FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})",
+            names
+        )
+        if cursor.fetchone()[0] == len(names):
+            global _fts_available
+            _fts_available = True
+            return True
+    return install_index(schema_connection)
+
+
+def _highlighted(text):
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def _result(kind, object_id, title, snippet):
+    if kind == 'hackathon':
+        url = reverse('hackathons') + '?' + urlencode({'search': title.replace(MARK_START, '').replace(MARK_END, '')})
+    elif kind == 'learning_path':
+        url = reverse('learning_path_detail', args=[object_id])
+    elif kind == 'knowledge_area':
+        url = reverse('learning_advisor')
+    else:
+        url = reverse('it_profiles')
+    return {
+        'kind': kind,
+        'id': object_id,
+        'title': _highlighted(title),
+        'snippet': _highlighted(snippet),
+        'url': url,
+    }
+
+
+def _fts_search(query, kinds, limit):
+    match = fts_query(query)
+    numbers = [SOURCES[kind][0] for kind in kinds]
+    sql = (
+        f"SELECT kind, object_id, "
+        f"highlight({INDEX_TABLE}, 2, %s, %s), "
+        f"snippet({INDEX_TABLE}, 3, %s, %s, '…', 16) "
+        f"FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s "
+        f"AND rowid %% {ROWID_FACTOR} IN ({', '.join(['%s'] * len(numbers))}) "
+        f"ORDER BY bm25({INDEX_TABLE}, 0, 0, 10.0, 1.0) LIMIT %s"
+    )
+    params = [MARK_START, MARK_END, MARK_START, MARK_END, match, *numbers, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [_result(kind, object_id, title, snippet) for kind, object_id, title, snippet in cursor.fetchall()]
+
+
+def _mark_terms(text, terms):
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    return pattern.sub(lambda match: f'{MARK_START}{match.group(0)}{MARK_END}', text)
+
+
+def _cut_snippet(text, terms, width=120):
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    start = max(0, min(positions) - width // 3) if positions else 0
+    snippet = text[start:start + width]
+    if start > 0:
+        snippet = '…' + snippet
+    if start + width < len(text):
+        snippet += '…'
+    return _mark_terms(snippet, terms)
+
+
+def _basic_search(query, kinds, limit):
+    from django.db.models import Q
+
+    terms = search_terms(query)
+    scored = []
+    for kind in kinds:
+        _, model, title_field, body_fields = SOURCES[kind]
+        condition = Q()
+        for term in terms:
+            term_condition = Q(**{f'{title_field}__icontains': term})
+            for field in body_fields:
+                term_condition |= Q(**{f'{field}__icontains': term})
+            condition &= term_condition
+        rows = model.objects.filter(condition).values_list('id', title_field, *body_fields)[:limit]
+        for object_id, title, *body in rows:
+            body = ' '.join(value or '' for value in body)
+            # Title matches first, then by how often the terms occur
+            score = sum(10 * title.lower().count(term) + body.lower().count(term) for term in terms)
+            scored.append((-score, kind, object_id, _mark_terms(title, terms), _cut_snippet(body, terms)))
+    scored.sort(key=lambda row: row[:3])
+    return [_result(kind, object_id, title, snippet) for _, kind, object_id, title, snippet in scored[:limit]]
+
+
+def search(query, kinds=None, limit=20):
+    """Ranked results for query, each a dict with kind, id, title and snippet (HTML) and url"""
+    kinds = [kind for kind in (kinds or SOURCES) if kind in SOURCES]
+    if not search_terms(query) or not kinds:
+        return []
+    if fts_available():
+        return _fts_search(query, kinds, limit)
+    return _basic_search(query, kinds, limit)
+
+
+def search_backend():
+    return 'fts5' if fts_available() else 'basic'
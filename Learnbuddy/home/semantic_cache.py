@@ -0,0 +1,237 @@
+"""
+Near-duplicate question cache for the generate endpoint.
+
+Previously answered questions are kept in an in-memory TF-IDF index with
+an inverted index for candidate lookup. A new question reuses a stored
+answer when its cosine similarity to an earlier one reaches
+AI_SEMANTIC_CACHE_THRESHOLD, so "what is a linked list" and "explain
+linked lists" share one answer. The index is snapshotted to a gzipped
+JSON file so it survives restarts. Every worker process writes to the
+same file, so a snapshot is merged with what is already on disk, under
+an flock() where available, rather than overwriting other processes'
+answers. Lookups record the best similarity seen in a histogram, which
+is what the threshold should be tuned on.
+"""
+import contextlib
+import gzip
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STOPWORDS = {
+    'a', 'about', 'an', 'and', 'are', 'be', 'can', 'could', 'define', 'describe',
+    'do', 'does', 'example', 'examples', 'explain', 'for', 'give', 'how', 'i',
+    'in', 'is', 'it', 'its', 'me', 'meant', 'mean', 'of', 'on', 'or', 'please',
+    'some', 'tell', 'that', 'the', 'them', 'they', 'this', 'to', 'understand',
+    'vs', 'what', 'whats', 'when', 'where', 'which', 'why', 'with', 'you',
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Exclusive lock shared with other processes; a no-op where fcntl is unavailable"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _stem(word):
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith(('ses', 'xes', 'ches', 'shes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    return [_stem(word) for word in TOKEN_RE.findall(text.lower()) if word not in STOPWORDS]
+
+
+class SemanticCache:
+    def __init__(self, threshold=0.8, max_entries=5000, ttl=86400, snapshot_path=None, snapshot_every=20):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self._entries = OrderedDict()  # id -> (question, answer, created, term counts)
+        self._postings = {}            # term -> set of ids
+        self._next_id = 0
+        self._dirty = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        self._stats = {'lookups': 0, 'hits': 0, 'misses': 0, 'additions': 0}
+        # Best similarity per lookup in 0.1-wide buckets, for threshold tuning
+        self._similarity_histogram = [0] * 10
+
+    def lookup(self, question):
+        """Stored answer for the most similar earlier question, or None"""
+        self._ensure_loaded()
+        terms = Counter(tokenize(question))
+        with self._lock:
+            self._stats['lookups'] += 1
+            best_id, best_score = self._best_match(terms)
+            bucket = min(int(best_score * 10), 9)
+            self._similarity_histogram[bucket] += 1
+            if best_id is not None and best_score >= self.threshold:
+                self._stats['hits'] += 1
+                self._entries.move_to_end(best_id)
+                return self._entries[best_id][1]
+            self._stats['misses'] += 1
+            return None
+
+    def add(self, question, answer):
+        self._ensure_loaded()
+        terms = Counter(tokenize(question))
+        if not terms:
+            return
+        with self._lock:
+            self._add(question, answer, time.time(), terms)
+            self._stats['additions'] += 1
+            self._dirty += 1
+            snapshot_due = self.snapshot_path and self._dirty >= self.snapshot_every
+            if snapshot_due:
+                self._dirty = 0
+        if snapshot_due:
+            threading.Thread(target=self.save_snapshot, daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['hit_rate'] = round(stats['hits'] / stats['lookups'], 4) if stats['lookups'] else 0.0
+            stats['threshold'] = self.threshold
+            stats['best_similarity_histogram'] = {
+                f"{i / 10:.1f}-{(i + 1) / 10:.1f}": count
+                for i, count in enumerate(self._similarity_histogram)
+            }
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self._loaded = True
+
+    def save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            rows = [[question, answer, created] for question, answer, created, _ in self._entries.values()]
+        with self._snapshot_lock, _file_lock(f"{self.snapshot_path}.lock"):
+            # Keep what other processes wrote since; the newest answer per question wins
+            merged = {}
+            cutoff = time.time() - self.ttl
+            for question, answer, created in self._read_snapshot() + rows:
+                if created > cutoff and (question not in merged or merged[question][1] < created):
+                    merged[question] = (answer, created)
+            newest = sorted(merged.items(), key=lambda item: item[1][1])[-self.max_entries:]
+            # Write to a temporary file first so a crash never leaves a truncated snapshot
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as snapshot:
+                json.dump([[question, answer, created] for question, (answer, created) in newest], snapshot)
+            os.replace(tmp_path, self.snapshot_path)
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return []
+        try:
+            with gzip.open(self.snapshot_path, 'rt', encoding='utf-8') as snapshot:
+                return json.load(snapshot)
+        except (OSError, ValueError):
+            return []
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.snapshot_path:
+                return
+            cutoff = time.time() - self.ttl
+            for question, answer, created in self._read_snapshot():
+                if created > cutoff:
+                    self._add(question, answer, created, Counter(tokenize(question)))
+
+    def _add(self, question, answer, created, terms):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (question, answer, created, terms)
+        for term in terms:
+            self._postings.setdefault(term, set()).add(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id):
+        _, _, _, terms = self._entries.pop(entry_id)
+        for term in terms:
+            ids = self._postings.get(term)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._postings[term]
+
+    def _idf(self, term):
+        return math.log((len(self._entries) + 1) / (len(self._postings.get(term, ())) + 1)) + 1
+
+    def _weights(self, terms):
+        weights = {term: count * self._idf(term) for term, count in terms.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return weights, norm
+
+    def _best_match(self, terms):
+        if not terms:
+            return None, 0.0
+        candidates = set()
+        for term in terms:
+            candidates.update(self._postings.get(term, ()))
+        if not candidates:
+            return None, 0.0
+
+        query, query_norm = self._weights(terms)
+        cutoff = time.time() - self.ttl
+        best_id, best_score = None, 0.0
+        for entry_id in candidates:
+            _, _, created, doc_terms = self._entries[entry_id]
+            if created <= cutoff:
+                continue
+            doc, doc_norm = self._weights(doc_terms)
+            dot = sum(weight * doc.get(term, 0.0) for term, weight in query.items())
+            score = dot / (query_norm * doc_norm) if query_norm and doc_norm else 0.0
+            if score > best_score:
+                best_id, best_score = entry_id, score
+        return best_id, best_score
+
+
+semantic_cache = SemanticCache(
+    threshold=getattr(settings, 'AI_SEMANTIC_CACHE_THRESHOLD', 0.8),
+    max_entries=getattr(settings, 'AI_SEMANTIC_CACHE_MAX_ENTRIES', 5000),
+    ttl=getattr(settings, 'AI_CACHE_TTL', 86400),
+    snapshot_path=getattr(settings, 'AI_SEMANTIC_CACHE_PATH', None),
+)
@@ -0,0 +1,278 @@
+"""
+Single-flight coalescing of identical in-flight AI requests.
+
+Within a process, concurrent callers with the same key wait on the
+first caller (the leader) and all receive its result. Across worker
+processes the leader also holds an AIRequestLock row; leaders in other
+processes that find the row taken poll the shared response cache for
+the result instead of calling upstream themselves. If the lock holder
+fails or its lock expires, the next waiter takes over.
+
+Streamed answers are coalesced the same way by stream(): the leader's
+chunks are read by a background thread into a shared buffer, and every
+caller, the leader's own included, is replayed the chunks so far and then
+the rest as they arrive. A client that disconnects therefore never cuts
+the answer short for the others.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.utils import timezone
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _StreamCall:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.chunks = []
+        self.outcome = {}
+        self.done = False
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, cross_process=True, lock_ttl=60, poll_interval=0.1):
+        self.cross_process = cross_process
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._async_calls = {}
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'shared': 0, 'remote_waits': 0, 'remote_results': 0}
+
+    def do(self, key, func, lookup):
+        """
+        Return func() for key, running it at most once across concurrent callers.
+        lookup() returns the result published by another process, or None.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['leaders'] += 1
+            else:
+                self._stats['shared'] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._lead(key, func, lookup)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def ado(self, key, coro_func, lookup):
+        """Async twin of do(); coro_func() returns a coroutine, lookup is sync"""
+        with self._lock:
+            task = self._async_calls.get(key)
+            leader = task is None or task.get_loop() is not asyncio.get_running_loop()
+            if leader:
+                task = asyncio.ensure_future(self._alead(key, coro_func, lookup))
+                self._async_calls[key] = task
+                self._stats['leaders'] += 1
+            else:
+                self._stats['shared'] += 1
+
+        if leader:
+            def forget(finished):
+                with self._lock:
+                    if self._async_calls.get(key) is finished:
+                        del self._async_calls[key]
+            task.add_done_callback(forget)
+        return await asyncio.shield(task)
+
+    def stream(self, key, func, lookup, outcome=None):
+        """
+        Yield the chunks of func(outcome) for key, running it at most once
+        across concurrent callers. func may record how the stream ended in
+        the outcome dict it is given; each caller's outcome gets a copy. A
+        result published by another process (lookup()) is yielded whole.
+        """
+        with self._lock:
+            call = self._streams.get(key)
+            if call is None:
+                call = self._streams[key] = _StreamCall()
+                self._stats['leaders'] += 1
+                pump = contextvars.copy_context().run
+                threading.Thread(
+                    target=pump, args=(self._pump_stream, key, call, func, lookup),
+                    name='ai-stream', daemon=True
+                ).start()
+            else:
+                self._stats['shared'] += 1
+
+        sent = 0
+        while True:
+            with call.condition:
+                while sent == len(call.chunks) and not call.done:
+                    call.condition.wait()
+                chunks = call.chunks[sent:]
+                done = call.done
+            sent += len(chunks)
+            yield from chunks
+            if done:
+                break
+        if call.error is not None:
+            raise call.error
+        if outcome is not None:
+            outcome.update(call.outcome)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls) + len(self._async_calls) + len(self._streams)
+        return stats
+
+    def _lead(self, key, func, lookup):
+        if not self.cross_process:
+            return func()
+        while True:
+            if self._acquire(key):
+                try:
+                    # Another process may have finished just before we got the lock
+                    result = lookup()
+                    return result if result is not None else func()
+                finally:
+                    self._release(key)
+            result = self._wait_for_remote(key, lookup)
+            if result is not None:
+                return result
+
+    def _pump_stream(self, key, call, func, lookup):
+        def publish(chunk):
+            with call.condition:
+                call.chunks.append(chunk)
+                call.condition.notify_all()
+
+        def run():
+            for chunk in func(call.outcome):
+                publish(chunk)
+
+        def published():
+            result = lookup()
+            if result is None:
+                return False
+            publish(result)
+            call.outcome['complete'] = True
+            return True
+
+        try:
+            if not self.cross_process:
+                run()
+                return
+            while True:
+                if self._acquire(key):
+                    try:
+                        if not published():
+                            run()
+                        return
+                    finally:
+                        self._release(key)
+                with self._lock:
+                    self._stats['remote_waits'] += 1
+                while self._is_locked(key):
+                    time.sleep(self.poll_interval)
+                    if published():
+                        with self._lock:
+                            self._stats['remote_results'] += 1
+                        return
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del self._streams[key]
+            with call.condition:
+                call.done = True
+                call.condition.notify_all()
+            connection.close()
+
+    async def _alead(self, key, coro_func, lookup):
+        if not self.cross_process:
+            return await coro_func()
+        while True:
+            if await sync_to_async(self._acquire)(key):
+                try:
+                    result = await sync_to_async(lookup)()
+                    return result if result is not None else await coro_func()
+                finally:
+                    await sync_to_async(self._release)(key)
+            with self._lock:
+                self._stats['remote_waits'] += 1
+            while await sync_to_async(self._is_locked)(key):
+                await asyncio.sleep(self.poll_interval)
+                result = await sync_to_async(lookup)()
+                if result is not None:
+                    with self._lock:
+                        self._stats['remote_results'] += 1
+                    return result
+
+    def _wait_for_remote(self, key, lookup):
+        """Poll until another process publishes a result or gives up its lock"""
+        with self._lock:
+            self._stats['remote_waits'] += 1
+        while self._is_locked(key):
+            time.sleep(self.poll_interval)
+            result = lookup()
+            if result is not None:
+                with self._lock:
+                    self._stats['remote_results'] += 1
+                return result
+        return None
+
+    def _acquire(self, key):
+        from .models import AIRequestLock
+        now = timezone.now()
+        try:
+            AIRequestLock.objects.filter(key=key, expires_at__lte=now).delete()
+            with transaction.atomic():
+                AIRequestLock.objects.create(key=key, expires_at=now + timedelta(seconds=self.lock_ttl))
+            return True
+        except IntegrityError:
+            return False
+        except DatabaseError:
+            # Without a working lock table we simply don't coordinate
+            return True
+
+    def _release(self, key):
+        from .models import AIRequestLock
+        try:
+            AIRequestLock.objects.filter(key=key).delete()
+        except DatabaseError:
+            pass
+
+    def _is_locked(self, key):
+        from .models import AIRequestLock
+        try:
+            return AIRequestLock.objects.filter(key=key, expires_at__gt=timezone.now()).exists()
+        except DatabaseError:
+            return False
+
+
+single_flight = SingleFlight(
+    cross_process=getattr(settings, 'AI_SINGLE_FLIGHT_CROSS_PROCESS', True),
+    # A lock outlives the longest possible upstream attempt by a small margin
+    lock_ttl=getattr(settings, 'AI_REQUEST_BUDGET_SECONDS', 30) + 5,
+)
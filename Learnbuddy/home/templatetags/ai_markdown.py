@@ -0,0 +1,11 @@
+from django import template
+
+from home.ai_markdown import render_ai_result
+
+register = template.Library()
+
+
+@register.filter
+def ai_markdown(text):
+    """Render an AI answer to cached, sanitized HTML: {{ result|ai_markdown }}"""
+    return render_ai_result(text)
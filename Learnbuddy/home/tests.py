@@ -1,3 +1,1593 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.db.models.query import QuerySet
+from django.core.cache import caches
+from django.test import AsyncRequestFactory, Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import views
+from .ai_markdown import markdown_to_html, render_ai_result, render_inline, split_questions
+from .ai_cache import ResponseCache, make_cache_key, response_cache
+from .ai_jobs import claim_next_job, enqueue_job, requeue_stale_jobs, run_job
+from .ai_log import AIRequestLogger, ai_request_log
+from .bulkhead import Bulkhead, HostSlots, ai_bulkhead
+from .hedging import hedge_budget
+from .llm_stub import STUB_ANSWER, STUB_QUESTIONS, LatencyModel, StubConfig, start_stub_server
+from .metrics import ai_metrics
+from .model_health import CLOSED, HALF_OPEN, OPEN, ModelHealthRegistry, model_health
+from .models import AIJob, AIRequestLog, AIResponseCache, CSLearningPath, FollowUpQuestionSet, Hackathon, ITProfile
+from .question_bank import QuestionBank, question_bank
+from .search import search, search_backend
+from .semantic_cache import SemanticCache, semantic_cache
+from .single_flight import single_flight
+
+
+def make_hackathons(count, start=0):
+    Hackathon.objects.bulk_create([
+        Hackathon(
+            title=f'Hackathon {i}',
+            description='Build something great',
+            organizer=f'Organizer {i % 5}',
+            start_date=date(2025, 1, 1) + timedelta(days=i),
+            end_date=date(2025, 1, 3) + timedelta(days=i),
+            registration_url='https://example.com/register',
+        )
+        for i in range(start, start + count)
+    ])
+
+
+class HackathonsViewTests(TestCase):
+    # Organizer list + catalog size, the page of cards, then the cards'
+    # version stamps (written once per hackathon, on its first view)
+    QUERY_BUDGET = 3
+
+    def test_query_count_stays_flat(self):
+        make_hackathons(10)
+        url = reverse('hackathons')
+        for params in ({}, {'organizer': 'Organizer 1'}, {'search': 'Hackathon 1'}):
+            self.client.get(url, params)
+            with self.subTest(params=params, rows=10), self.assertNumQueries(self.QUERY_BUDGET):
+                self.client.get(url, params)
+
+        make_hackathons(300, start=10)
+        for params in ({}, {'organizer': 'Organizer 1'}, {'search': 'Hackathon 1'}):
+            self.client.get(url, params)
+            with self.subTest(params=params, rows=310), self.assertNumQueries(self.QUERY_BUDGET):
+                self.client.get(url, params)
+
+    def test_counts_and_filters(self):
+        make_hackathons(12)
+        response = self.client.get(reverse('hackathons'), {'organizer': 'Organizer 2'})
+        self.assertEqual(response.context['total_hackathons'], 12)
+        self.assertEqual(response.context['organizers'], [f'Organizer {i}' for i in range(5)])
+        self.assertEqual(response.context['filtered_count'], 2)
+        self.assertEqual([h.title for h in response.context['hackathons']], ['Hackathon 2', 'Hackathon 7'])
+
+    def test_page_is_capped(self):
+        make_hackathons(30)
+        with self.settings(HACKATHONS_PAGE_SIZE=10):
+            response = self.client.get(reverse('hackathons'))
+        self.assertEqual(len(response.context['hackathons']), 10)
+        self.assertEqual(response.context['filtered_count'], 30)
+
+    def test_next_cursor_for_more_pages(self):
+        make_hackathons(30)
+        with self.settings(HACKATHONS_PAGE_SIZE=10):
+            response = self.client.get(reverse('hackathons'))
+            self.assertEqual(response.context['next_cursor'], '2025-01-10_10')
+            self.assertContains(response, 'data-cursor="2025-01-10_10"')
+            response = self.client.get(reverse('hackathons'), {'organizer': 'Organizer 1'})
+            self.assertNotIn('next_cursor', response.context)
+
+    def test_showing_notice_and_next_link(self):
+        make_hackathons(25)
+        url = reverse('hackathons')
+        with self.settings(HACKATHONS_PAGE_SIZE=10):
+            response = self.client.get(url, {'organizer': '', 'status': 'soon'})
+            self.assertContains(response, 'Showing <span id="hackathonsShown" data-first="1">10</span>')
+            self.assertContains(response, 'of <span id="hackathonsTotal">25</span> hackathons')
+            # Unknown statuses are dropped from the link as well
+            self.assertEqual(response.context['next_page_url'], '?organizer=&cursor=2025-01-10_10')
+            self.assertContains(response, 'href="?organizer=&amp;cursor=2025-01-10_10"')
+
+            response = self.client.get(url, {'organizer': '', 'cursor': '2025-01-10_10'})
+            self.assertEqual([h.title for h in response.context['hackathons']], [f'Hackathon {i}' for i in range(10, 20)])
+            self.assertContains(response, 'data-first="11">11–20</span>')
+            self.assertEqual(response.context['first_page_url'], '?organizer=')
+
+            response = self.client.get(url, {'cursor': '2025-01-20_20'})
+            self.assertContains(response, '21–25</span>')
+            self.assertContains(response, 'of <span id="hackathonsTotal">25</span> hackathons')
+            self.assertNotIn('next_page_url', response.context)
+
+    def test_bad_cursor_starts_over(self):
+        make_hackathons(3)
+        response = self.client.get(reverse('hackathons'), {'cursor': 'nope'})
+        self.assertEqual(len(response.context['hackathons']), 3)
+        self.assertNotIn('first_page_url', response.context)
+
+    def test_empty_catalog(self):
+        response = self.client.get(reverse('hackathons'), {'search': 'nothing'})
+        self.assertEqual(response.context['filtered_count'], 0)
+        self.assertContains(response, 'No Hackathons Available')
+
+
+class HackathonStatusTests(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        for title, start, end in [
+            ('Past', -10, -5), ('Ends today', -3, 0), ('Starts today', 0, 2), ('Upcoming', 1, 3),
+        ]:
+            Hackathon.objects.create(
+                title=title, description='', organizer='Org',
+                start_date=today + timedelta(days=start), end_date=today + timedelta(days=end),
+                registration_url='https://example.com',
+            )
+
+    def test_status_annotation_and_filter_agree(self):
+        statuses = dict(Hackathon.objects.with_status().values_list('title', 'status'))
+        self.assertEqual(statuses, {
+            'Past': 'past', 'Ends today': 'ongoing', 'Starts today': 'ongoing', 'Upcoming': 'upcoming',
+        })
+        for status in Hackathon.STATUSES:
+            with self.subTest(status=status):
+                self.assertEqual(
+                    sorted(Hackathon.objects.with_status_of(status).values_list('title', flat=True)),
+                    sorted(title for title, value in statuses.items() if value == status),
+                )
+
+    def test_view_filter(self):
+        url = reverse('hackathons')
+        self.client.get(url, {'status': 'ongoing'})
+        with self.assertNumQueries(HackathonsViewTests.QUERY_BUDGET):
+            response = self.client.get(url, {'status': 'ongoing'})
+        self.assertEqual([h.title for h in response.context['hackathons']], ['Ends today', 'Starts today'])
+        self.assertContains(response, 'Live Now', count=2)
+        self.assertEqual(response.context['filtered_count'], 2)
+        # Unknown statuses are ignored
+        self.assertEqual(self.client.get(url, {'status': 'soon'}).context['filtered_count'], 4)
+
+    def test_api_filter(self):
+        url = reverse('hackathons_api')
+        data = self.client.get(url, {'status': 'upcoming', 'fields': 'title,status'}).json()
+        self.assertEqual(data['results'], [{'title': 'Upcoming', 'status': 'upcoming'}])
+        self.assertEqual(self.client.get(url, {'status': 'soon'}).status_code, 400)
+
+    def test_upcoming_is_an_index_range(self):
+        plan = Hackathon.objects.with_status_of('upcoming').order_by('start_date', 'id').explain()
+        self.assertIn('USING INDEX', plan)
+        self.assertNotIn('SCAN home_hackathon', plan)
+
+
+class HackathonCardCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        make_hackathons(3)
+        self.hackathon = Hackathon.objects.get(title='Hackathon 1')
+
+    def test_cards_are_served_from_cache_until_saved(self):
+        for url in (reverse('hackathons'), reverse('home')):
+            with self.subTest(url=url):
+                self.client.get(url)
+                # update() sends no signal, so the cached card is still served
+                Hackathon.objects.filter(id=self.hackathon.id).update(title='Renamed quietly')
+                self.assertNotContains(self.client.get(url), 'Renamed quietly')
+
+                self.hackathon.title = 'Renamed'
+                self.hackathon.save()
+                self.assertContains(self.client.get(url), 'Renamed')
+
+    def test_api_cards_share_the_cache(self):
+        self.client.get(reverse('hackathons'))
+        Hackathon.objects.filter(id=self.hackathon.id).update(title='Renamed quietly')
+        html = self.client.get(reverse('hackathons_api'), {'format': 'html'}).json()['html']
+        self.assertIn('Hackathon 1', html)
+
+    def test_delete_and_recreate_do_not_reuse_cards(self):
+        self.client.get(reverse('hackathons'))
+        hackathon_id = self.hackathon.id
+        self.hackathon.delete()
+        Hackathon.objects.create(
+            id=hackathon_id, title='Replacement', description='', organizer='Org',
+            start_date=date(2025, 1, 2), end_date=date(2025, 1, 3), registration_url='https://example.com',
+        )
+        self.assertContains(self.client.get(reverse('hackathons')), 'Replacement')
+
+
+class HackathonsApiTests(TestCase):
+    def walk(self, params):
+        """Follow next_cursor to the end, returning the ids seen"""
+        ids = []
+        params = dict(params)
+        while True:
+            data = self.client.get(reverse('hackathons_api'), params).json()
+            ids += [row['id'] for row in data['results']]
+            if not data['has_more']:
+                return ids
+            params['cursor'] = data['next_cursor']
+
+    def test_pages_cover_everything_once(self):
+        make_hackathons(25)
+        # Rows sharing a start date must not be skipped or repeated
+        Hackathon.objects.filter(id__lte=12).update(start_date=date(2025, 6, 1))
+        expected = list(Hackathon.objects.order_by('start_date', 'id').values_list('id', flat=True))
+        self.assertEqual(self.walk({'limit': 4}), expected)
+        self.assertEqual(
+            self.walk({'limit': 2, 'organizer': 'Organizer 3'}),
+            [i for i in expected if Hackathon.objects.get(id=i).organizer == 'Organizer 3'],
+        )
+
+    def test_one_query_per_page_at_any_depth(self):
+        make_hackathons(300)
+        url = reverse('hackathons_api')
+        for cursor in (None, '2025-01-05_5', '2025-10-01_274'):
+            params = {'limit': 20, 'search': 'hackathon'}
+            if cursor:
+                params['cursor'] = cursor
+            with self.subTest(cursor=cursor), self.assertNumQueries(1):
+                self.client.get(url, params)
+
+    def test_field_projection(self):
+        make_hackathons(2)
+        data = self.client.get(reverse('hackathons_api'), {'fields': 'id,title'}).json()
+        self.assertEqual(data['results'], [{'id': 1, 'title': 'Hackathon 0'}, {'id': 2, 'title': 'Hackathon 1'}])
+        self.assertNotIn('description', self.client.get(reverse('hackathons_api')).json()['results'][0])
+
+    def test_bad_parameters(self):
+        url = reverse('hackathons_api')
+        self.assertEqual(self.client.get(url, {'cursor': 'nope'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'fields': 'id,password'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 'x'}).status_code, 400)
+
+    def test_html_cards(self):
+        make_hackathons(3)
+        data = self.client.get(reverse('hackathons_api'), {'format': 'html', 'limit': 2}).json()
+        self.assertEqual(data['html'].count('class="col-md-6 col-lg-4 hackathon-card"'), 2)
+        self.assertEqual(data['next_cursor'], '2025-01-02_2')
+        # The first page carries the total for the live search's "Showing N of M"
+        self.assertEqual(data['count'], 3)
+        data = self.client.get(reverse('hackathons_api'), {'format': 'html', 'search': 'hackathon 1'}).json()
+        self.assertEqual(data['count'], 1)
+        data = self.client.get(reverse('hackathons_api'), {'format': 'html', 'cursor': '2025-01-02_2'}).json()
+        self.assertNotIn('count', data)
+
+    def test_html_count_needs_no_extra_query(self):
+        make_hackathons(30)
+        self.client.get(reverse('hackathons_api'), {'format': 'html', 'search': 'hackathon'})
+        # The cards with the count attached, then their version stamps
+        with self.assertNumQueries(2):
+            self.client.get(reverse('hackathons_api'), {'format': 'html', 'search': 'hackathon'})
+
+    def test_page_query_is_accepted_by_the_api(self):
+        make_hackathons(30)
+        with self.settings(HACKATHONS_PAGE_SIZE=10):
+            response = self.client.get(reverse('hackathons'), {'status': 'bogus', 'organizer': 'Organizer 1'})
+        # The page ignores the unknown status, so the scripts must not send it
+        self.assertEqual(response.context['page_query'], 'organizer=Organizer+1')
+        self.assertContains(response, 'data-query="organizer=Organizer+1"')
+        data = self.client.get(f"{reverse('hackathons_api')}?{response.context['page_query']}&format=html").json()
+        self.assertEqual(data['count'], response.context['filtered_count'])
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        make_hackathons(3)
+        Hackathon.objects.filter(title='Hackathon 1').update(
+            title='Robotics Challenge', description='Program robots to navigate a maze'
+        )
+        Hackathon.objects.filter(title='Hackathon 2').update(description='Teams build robotic arms')
+        CSLearningPath.objects.create(
+            title='Machine Learning', description='Learn to train models', difficulty_level='advanced'
+        )
+        ITProfile.objects.create(
+            name='Robotics Engineer', description='Designs robots', skills_required='Python, C++',
+            career_path='Junior to lead', average_salary='$100k', job_outlook='Growing',
+        )
+
+    def test_uses_full_text_index(self):
+        self.assertEqual(search_backend(), 'fts5')
+
+    def test_ranks_title_matches_first_with_stemming(self):
+        results = search('robots', kinds=['hackathon'])
+        # "robots" matches "Robotics" and "robotic" through the stemmer
+        self.assertEqual([r['title'] for r in results][:1], ['<mark>Robotics</mark> Challenge'])
+        self.assertEqual({r['id'] for r in results}, set(
+            Hackathon.objects.filter(title__in=['Robotics Challenge', 'Hackathon 2']).values_list('id', flat=True)
+        ))
+        self.assertIn('<mark>', results[1]['snippet'])
+
+    def test_searches_every_kind_and_escapes(self):
+        kinds = {r['kind'] for r in search('robot')}
+        self.assertEqual(kinds, {'hackathon', 'it_profile'})
+        self.assertEqual(search('learn')[0]['kind'], 'learning_path')
+        Hackathon.objects.filter(title='Robotics Challenge').update(description='Robots <script>')
+        snippet = search('robotics challenge', kinds=['hackathon'])[0]['snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertEqual(search('"*'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        hackathon = Hackathon.objects.get(title='Robotics Challenge')
+        hackathon.title = 'Drone Race'
+        hackathon.save()
+        self.assertEqual([r['id'] for r in search('drone')], [hackathon.id])
+        hackathon.delete()
+        self.assertEqual(search('drone'), [])
+
+    def test_json_endpoint(self):
+        response = self.client.get(reverse('site_search'), {'q': 'robot', 'kind': 'it_profile'})
+        data = response.json()
+        self.assertEqual(data['backend'], 'fts5')
+        self.assertEqual([r['kind'] for r in data['results']], ['it_profile'])
+        self.assertEqual(data['results'][0]['url'], reverse('it_profiles'))
+
+    def test_hackathons_page_search(self):
+        self.client.get(reverse('hackathons'), {'search': 'maze'})
+        with self.assertNumQueries(HackathonsViewTests.QUERY_BUDGET):
+            response = self.client.get(reverse('hackathons'), {'search': 'maze'})
+        self.assertEqual([h.title for h in response.context['hackathons']], ['Robotics Challenge'])
+
+
+class BasicSearchTests(TestCase):
+    """The icontains fallback for databases without FTS5"""
+
+    def setUp(self):
+        SearchTests.setUp(self)
+        self.enterContext(mock.patch('home.search.fts_available', return_value=False))
+        self.enterContext(mock.patch.object(views, 'fts_available', return_value=False))
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(search_backend(), 'basic')
+        results = search('robot', kinds=['hackathon'])
+        self.assertEqual([r['title'] for r in results], ['<mark>Robot</mark>ics Challenge', 'Hackathon 2'])
+        self.assertEqual(results[1]['snippet'], 'Organizer 2 Teams build <mark>robot</mark>ic arms')
+
+    def test_every_term_must_match(self):
+        self.assertEqual([r['title'] for r in search('robot maze')], ['<mark>Robot</mark>ics Challenge'])
+        self.assertEqual({r['kind'] for r in search('robot')}, {'hackathon', 'it_profile'})
+        self.assertEqual(len(search('hackathon', limit=1)), 1)
+
+    def test_snippets_are_escaped(self):
+        Hackathon.objects.filter(title='Robotics Challenge').update(description='Robots <script>')
+        snippet = search('robotics', kinds=['hackathon'])[0]['snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+
+    def test_endpoints_use_the_fallback(self):
+        data = self.client.get(reverse('site_search'), {'q': 'maze'}).json()
+        self.assertEqual(data['backend'], 'basic')
+        self.assertEqual([r['kind'] for r in data['results']], ['hackathon'])
+        response = self.client.get(reverse('hackathons'), {'search': 'maze'})
+        self.assertEqual([h.title for h in response.context['hackathons']], ['Robotics Challenge'])
+
+
+class ResponseCacheTests(TestCase):
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2, persistent=False)
+        cache.set('one', 'main', '1')
+        cache.set('two', 'main', '2')
+        # Reading "one" makes "two" the least recently used
+        self.assertEqual(cache.get('one', 'main'), '1')
+        cache.set('three', 'main', '3')
+        self.assertIsNone(cache.get('two', 'main'))
+        self.assertEqual(cache.get('one', 'main'), '1')
+        self.assertEqual(cache.get('three', 'main'), '3')
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['memory_entries'], 2)
+
+    def test_ttl_expiry(self):
+        cache = ResponseCache(ttl=60, persistent=False)
+        with mock.patch('home.ai_cache.time.time', return_value=1000.0):
+            cache.set('question', 'main', 'answer')
+        with mock.patch('home.ai_cache.time.time', return_value=1059.0):
+            self.assertEqual(cache.get('question', 'main'), 'answer')
+        with mock.patch('home.ai_cache.time.time', return_value=1061.0):
+            self.assertIsNone(cache.get('question', 'main'))
+        self.assertEqual(cache.stats()['expired'], 1)
+
+    def test_falls_back_to_persistent_tier(self):
+        ResponseCache().set('What is  Python?', 'main', 'A language')
+        # A new process starts with an empty memory tier
+        cache = ResponseCache()
+        self.assertEqual(cache.get('what is python?', 'main'), 'A language')
+        self.assertEqual(cache.get('what is python?', 'main'), 'A language')
+        stats = cache.stats()
+        self.assertEqual((stats['db_hits'], stats['memory_hits']), (1, 1))
+
+    def test_expired_persistent_rows_are_misses(self):
+        ResponseCache().set('question', 'main', 'answer')
+        AIResponseCache.objects.filter(key=make_cache_key('question', 'main')).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        cache = ResponseCache()
+        self.assertIsNone(cache.get('question', 'main'))
+        self.assertFalse(AIResponseCache.objects.exists())
+        self.assertEqual(cache.stats()['expired'], 1)
+
+    def test_counters(self):
+        cache = ResponseCache(persistent=False)
+        self.assertIsNone(cache.get('question', 'main'))
+        cache.set('question', 'main', 'answer')
+        cache.get('question', 'main')
+        cache.get('question', 'questions')
+        # peek() leaves the counters alone
+        cache.peek('question', 'main')
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertEqual(stats['hit_rate'], round(1 / 3, 4))
+
+
+class AIMarkdownTests(TestCase):
+    def test_emphasis(self):
+        self.assertEqual(render_inline('**bold**, __also bold__ and *italic*'), '<strong>bold</strong>, <strong>also bold</strong> and <em>italic</em>')
+        self.assertEqual(render_inline('2 * 3 * 4 and snake_case__name'), '2 * 3 * 4 and snake_case__name')
+
+    def test_links(self):
+        self.assertEqual(
+            render_inline('See [the **docs**](https://example.com/a?x=1&y=2)'),
+            'See <a href="https://example.com/a?x=1&amp;y=2" target="_blank" rel="noopener nofollow">the <strong>docs</strong></a>',
+        )
+
+    def test_link_urls_are_not_formatted(self):
+        html = render_inline('[one](https://example.com/__init__.py) and [two](https://example.com/*a*)')
+        self.assertIn('href="https://example.com/__init__.py"', html)
+        self.assertIn('href="https://example.com/*a*"', html)
+        self.assertNotIn('<strong>', html)
+        self.assertNotIn('<em>', html)
+
+    def test_only_safe_link_schemes(self):
+        self.assertEqual(render_inline('[x](javascript:alert(1))'), '[x](javascript:alert(1))')
+        self.assertIn('href="mailto:help@example.com"', render_inline('[mail](mailto:help@example.com)'))
+
+    def test_code_spans_are_not_formatted(self):
+        self.assertEqual(render_inline('Use `a **b** <c>` here'), 'Use <code>a **b** &lt;c&gt;</code> here')
+        self.assertEqual(render_inline('[`x`](https://example.com)'), '<a href="https://example.com" target="_blank" rel="noopener nofollow"><code>x</code></a>')
+
+    def test_escaping(self):
+        self.assertEqual(render_inline('<script>alert("x")</script>'), '&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;')
+        self.assertNotIn('"onmouseover', render_inline('[x](https://example.com/"onmouseover=alert(1))'))
+
+    def test_blocks(self):
+        html = markdown_to_html('# Title\n\nSome text\n\n- one\n- two\n\n1. first\n\n```python\nif a < b:\n    pass\n```\n\n> quoted\n\n---')
+        self.assertEqual(html.split('\n'), [
+            '<h4>Title</h4>',
+            '<p>Some text</p>',
+            '<ul>', '<li>one</li>', '<li>two</li>', '</ul>',
+            '<ol>', '<li>first</li>', '</ol>',
+            '<pre class="code-block"><code class="language-python">if a &lt; b:',
+            '    pass</code></pre>',
+            '<blockquote>quoted</blockquote>',
+            '<hr>',
+        ])
+
+    def test_questions_are_split_into_their_own_section(self):
+        text = 'An answer.' + views.format_questions_section('1. First?\n2. Second?\n3. Third?')
+        answer, questions = split_questions(text)
+        self.assertEqual(answer, 'An answer.')
+        self.assertEqual(questions, '1. First?\n2. Second?\n3. Third?')
+        html = render_ai_result(text)
+        self.assertTrue(html.startswith('<p>An answer.</p>\n<div class="questions-section">'))
+        self.assertEqual(html.count('Test Your Understanding'), 1)
+        self.assertIn('<li>Second?</li>', html)
+
+    def test_without_questions(self):
+        self.assertEqual(split_questions('An answer.\n\n---\n\nMore'), ('An answer.\n\n---\n\nMore', ''))
+        self.assertNotIn('questions-section', render_ai_result('An answer.'))
+
+
+class LLMStubTestCase(TransactionTestCase):
+    """
+    Runs the AI pipeline against home.llm_stub on a free local port.
+    Transactional because pool threads write cache and log rows; the
+    process-wide caches and registries are emptied before every test.
+    """
+    stub_latency = 0.02
+
+    def setUp(self):
+        self.stub = StubConfig(latency=LatencyModel('fixed', self.stub_latency), stream_chunks=4)
+        server, base_url = start_stub_server(config=self.stub)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.enterContext(self.settings(
+            AI_API_BASE_URL=base_url,
+            GROQ_API_KEY='test',
+            AI_RATE_LIMIT_ENABLED=False,
+            AI_HEDGING_ENABLED=False,
+            AI_SINGLE_CALL=False,
+            AI_QUESTION_BANK_ENABLED=False,
+        ))
+        self.enterContext(mock.patch.object(semantic_cache, 'snapshot_path', None))
+        self.enterContext(mock.patch.object(ai_request_log, 'enabled', False))
+        response_cache.clear()
+        semantic_cache.clear()
+        question_bank.clear()
+        model_health.reset()
+        ai_metrics.reset()
+
+    def ask(self, message='What is a linked list?'):
+        return views.chat_with_ai(message)
+
+    def wait_for(self, condition, timeout=5):
+        """Poll until condition() is true, for work finishing in a background thread"""
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail('Timed out waiting for background work')
+            time.sleep(0.01)
+
+    def run_concurrently(self, func, count):
+        """Results of count concurrent calls to func, each in its own thread"""
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            return list(executor.map(lambda _: views._run_ai_task(func), range(count)))
+
+    def stream_events(self, message='What is a linked list?'):
+        """(event, payload) pairs from chat_event_stream"""
+        return self.parse_events(views.chat_event_stream(message))
+
+    def parse_events(self, stream):
+        events = []
+        for raw in ''.join(stream).strip().split('\n\n'):
+            event, data = raw.split('\n', 1)
+            events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+        return events
+
+
+class LLMStubTests(LLMStubTestCase):
+    def test_answer_and_questions(self):
+        self.assertEqual(self.ask(), STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS))
+        self.assertEqual(self.stub.calls, {'main': 1, 'questions': 1})
+
+    def test_answers_are_cached(self):
+        self.ask()
+        self.ask()
+        self.assertEqual(self.stub.requests, 2)
+
+    def test_streamed_answer_arrives_in_chunks(self):
+        events = self.stream_events()
+        tokens = [payload['text'] for event, payload in events if event == 'token']
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual(''.join(tokens).strip(), STUB_ANSWER.strip())
+
+    def test_falls_back_past_an_unavailable_model(self):
+        self.stub.unavailable_models = {views.AI_MODELS[0]}
+        self.assertTrue(self.ask().startswith(STUB_ANSWER))
+        self.assertEqual(model_health.stats()[views.AI_MODELS[0]]['state'], 'open')
+        # With its circuit open the model is skipped without a round trip
+        calls = self.stub.model_calls[views.AI_MODELS[0]]
+        self.ask('What is a hash table?')
+        self.assertEqual(self.stub.model_calls[views.AI_MODELS[0]], calls)
+
+    def test_upstream_error_is_reported(self):
+        self.stub.error_rate = 1.0
+        self.assertTrue(self.ask().startswith('Error: 500'))
+
+
+class QuestionsGracePeriodTests(LLMStubTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stub.latency_by_kind = {'questions': LatencyModel('fixed', 0.5)}
+        self.enterContext(self.settings(AI_QUESTIONS_GRACE_SECONDS=0.05))
+
+    def test_slow_questions_are_left_out(self):
+        self.assertEqual(self.ask(), STUB_ANSWER)
+
+    def test_late_questions_are_cached_for_next_time(self):
+        self.ask()
+        self.wait_for(lambda: response_cache.peek('What is a linked list?', 'questions') is not None)
+        self.assertEqual(self.ask(), STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS))
+        self.assertEqual(self.stub.requests, 2)
+
+    def test_questions_within_the_grace_period_are_kept(self):
+        self.stub.latency_by_kind = {}
+        self.assertTrue(self.ask().endswith(STUB_QUESTIONS))
+
+    def test_answer_without_questions_is_not_reused_for_similar_prompts(self):
+        self.assertEqual(views.chat_with_ai('What is a linked list?', use_semantic_cache=True), STUB_ANSWER)
+        self.assertIsNone(semantic_cache.lookup('Explain linked lists'))
+        self.wait_for(lambda: response_cache.peek('What is a linked list?', 'questions') is not None)
+        # Complete once the late questions are cached
+        views.chat_with_ai('What is a linked list?', use_semantic_cache=True)
+        self.assertTrue(semantic_cache.lookup('Explain linked lists').endswith(STUB_QUESTIONS))
+
+    def test_streamed_answer_without_questions_is_not_added(self):
+        list(views.chat_event_stream('What is a linked list?', use_semantic_cache=True))
+        self.assertIsNone(semantic_cache.lookup('Explain linked lists'))
+
+    def test_async_answer_without_questions_is_not_added(self):
+        response = async_to_sync(views.achat_with_ai)('What is a linked list?', use_semantic_cache=True)
+        self.assertEqual(response, STUB_ANSWER)
+        self.assertIsNone(semantic_cache.lookup('Explain linked lists'))
+
+
+class RequestBudgetTests(LLMStubTestCase):
+    stub_latency = 1.0
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(self.settings(AI_REQUEST_BUDGET_SECONDS=0.4))
+
+    def test_blocking_call_gives_up_when_the_budget_runs_out(self):
+        started = time.monotonic()
+        response = views.get_ai_response('What is a linked list?', views.get_ai_headers(), views.AI_MODELS)
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertTrue(response.startswith('Error:'))
+
+    def test_stream_is_cut_off_at_the_deadline(self):
+        # Four chunks, 0.25s apart: the stream is still flowing when the budget ends
+        started = time.monotonic()
+        answer = ''.join(views.stream_ai_response('What is a linked list?', views.get_ai_headers(), views.AI_MODELS))
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertTrue(answer)
+        self.assertTrue(STUB_ANSWER.startswith(answer.strip()))
+        self.assertNotEqual(answer.strip(), STUB_ANSWER.strip())
+        # A truncated answer is never cached
+        self.assertIsNone(response_cache.peek('What is a linked list?', 'main'))
+
+
+class ChatEventStreamTests(LLMStubTestCase):
+    def test_event_order(self):
+        events = self.stream_events()
+        names = [event for event, _ in events]
+        self.assertEqual(names[-2:], ['questions', 'done'])
+        self.assertEqual(set(names[:-2]), {'token'})
+        self.assertEqual(events[-2][1]['text'], views.format_questions_section(STUB_QUESTIONS))
+        self.assertIn('Test Your Understanding', events[-1][1]['html'])
+
+    def test_upstream_error_is_a_single_error_event(self):
+        self.stub.error_rate = 1.0
+        events = self.stream_events()
+        self.assertEqual([event for event, _ in events], ['error'])
+        self.assertTrue(events[0][1]['message'].startswith('Error: 500'))
+
+    def test_generate_stream_view(self):
+        response = self.client.post(reverse('generate_stream'), {'message': 'What is a linked list?'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['X-Accel-Buffering'], 'no')
+        events = self.parse_events(chunk.decode('utf-8') for chunk in response.streaming_content)
+        self.assertEqual(events[-1][0], 'done')
+
+    def test_generate_stream_rejects_an_empty_message(self):
+        response = self.client.post(reverse('generate_stream'), {'message': ''})
+        self.assertEqual(response.status_code, 400)
+
+
+class ModelHealthTests(TestCase):
+    def setUp(self):
+        self.registry = ModelHealthRegistry(failure_threshold=2, error_cooldown=30, unavailable_cooldown=3600)
+        self.now = 1000.0
+        self.enterContext(mock.patch('home.model_health.time.monotonic', side_effect=lambda: self.now))
+
+    def state(self, model='m'):
+        return self.registry.stats()[model]['state']
+
+    def test_consecutive_failures_open_the_circuit(self):
+        self.registry.record_failure('m', 0.1, '500')
+        self.assertEqual(self.state(), CLOSED)
+        self.registry.record_failure('m', 0.1, '500')
+        self.assertEqual(self.state(), OPEN)
+        self.assertEqual(self.registry.candidates(['m', 'n']), ['n'])
+
+    def test_half_open_lets_one_probe_through(self):
+        self.registry.record_failure('m', 0.1, unavailable=True)
+        self.now += 3601
+        self.assertEqual(self.registry.candidates(['m']), ['m'])
+        self.assertEqual(self.state(), HALF_OPEN)
+        self.assertTrue(self.registry.acquire('m'))
+        self.assertFalse(self.registry.acquire('m'))
+
+    def test_successful_probe_closes_the_circuit(self):
+        self.registry.record_failure('m', 0.1, unavailable=True)
+        self.now += 3601
+        self.registry.candidates(['m'])
+        self.registry.acquire('m')
+        self.registry.record_success('m', 0.1)
+        self.assertEqual(self.state(), CLOSED)
+        self.assertTrue(self.registry.acquire('m'))
+
+    def test_failed_probe_reopens_the_circuit(self):
+        self.registry.record_failure('m', 0.1, unavailable=True)
+        self.now += 3601
+        self.registry.candidates(['m'])
+        self.registry.acquire('m')
+        self.registry.record_failure('m', 0.1, '500')
+        self.assertEqual(self.state(), OPEN)
+        self.assertEqual(self.registry.stats()['m']['retry_in_seconds'], 30)
+
+    def test_released_probe_can_be_retried(self):
+        self.registry.record_failure('m', 0.1, unavailable=True)
+        self.now += 3601
+        self.registry.candidates(['m'])
+        self.registry.acquire('m')
+        self.registry.release('m')
+        self.assertEqual(self.state(), HALF_OPEN)
+        self.assertTrue(self.registry.acquire('m'))
+
+
+class ModelFallbackTests(LLMStubTestCase):
+    def test_oversized_prompt_does_not_open_any_circuit(self):
+        self.stub.max_prompt_chars = 1000
+        response = self.ask('x' * 2000)
+        self.assertTrue(response.startswith('Error: 400'))
+        self.assertIn('context_length_exceeded', response)
+        self.assertEqual(self.stub.model_calls[views.AI_MODELS[1]], 0)
+        self.assertTrue(all(state['state'] == CLOSED for state in model_health.stats().values()))
+        # Other prompts still reach the primary model
+        self.assertTrue(self.ask().startswith(STUB_ANSWER))
+
+    def test_client_error_releases_the_half_open_probe(self):
+        model = views.AI_MODELS[0]
+        with mock.patch.object(model_health, 'unavailable_cooldown', 0):
+            model_health.record_failure(model, 0.1, unavailable=True)
+        self.stub.max_prompt_chars = 1000
+        response = views.get_ai_response('x' * 2000, views.get_ai_headers(), [model])
+        self.assertTrue(response.startswith('Error: 400'))
+        self.assertEqual(model_health.stats()[model]['state'], HALF_OPEN)
+        self.assertTrue(model_health.acquire(model))
+
+    def test_long_message_is_rejected_by_the_form(self):
+        response = self.client.post(reverse('generate_stream'), {'message': 'x' * 4001})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stub.requests, 0)
+
+
+class AsyncPipelineTests(LLMStubTestCase):
+    def test_answer_and_questions(self):
+        response = async_to_sync(views.achat_with_ai)('What is a linked list?')
+        self.assertEqual(response, STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS))
+        self.assertEqual(self.stub.calls, {'main': 1, 'questions': 1})
+
+    def test_falls_back_past_an_unavailable_model(self):
+        self.stub.unavailable_models = {views.AI_MODELS[0]}
+        response = async_to_sync(views.achat_with_ai)('What is a linked list?')
+        self.assertTrue(response.startswith(STUB_ANSWER))
+        self.assertEqual(model_health.stats()[views.AI_MODELS[0]]['state'], OPEN)
+
+    def test_concurrent_identical_prompts_share_one_call(self):
+        async def burst():
+            return await asyncio.gather(*(views.achat_with_ai('What is a linked list?') for _ in range(5)))
+        responses = async_to_sync(burst)()
+        self.assertEqual(len(set(responses)), 1)
+        self.assertEqual(self.stub.calls, {'main': 1, 'questions': 1})
+
+    def test_generate_async_view(self):
+        request = AsyncRequestFactory().post(reverse('generate'), {'message': 'What is a linked list?'})
+        request.user = AnonymousUser()
+        response = async_to_sync(views.generate_async)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Test Your Understanding')
+
+    def test_it_profiles_async_view(self):
+        request = AsyncRequestFactory().post(reverse('it_profiles'), {'profile': 'data_scientist', 'question': 'Do I need a degree?'})
+        request.user = AnonymousUser()
+        response = async_to_sync(views.it_profiles_async)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stub.calls['main'], 1)
+
+
+def make_it_profile(name, key=None, **fields):
+    return ITProfile.objects.create(
+        name=name, key=key, description=fields.pop('description', 'Seeded'), skills_required='',
+        career_path='', average_salary='', job_outlook='', **fields
+    )
+
+
+class ITProfileOverviewTests(LLMStubTestCase):
+    def test_dry_run_does_not_write(self):
+        make_it_profile('Data Scientist', 'data_scientist')
+        out = StringIO()
+        call_command('refresh_it_profile_overviews', '--dry-run', stdout=out)
+        self.assertEqual(ITProfile.objects.count(), 1)
+        self.assertIn("Would regenerate 'Data Scientist'", out.getvalue())
+        self.assertIn("Would regenerate 'Network Administrator' (no ITProfile row yet", out.getvalue())
+        self.assertEqual(self.stub.requests, 0)
+
+    def test_refresh_stores_overviews(self):
+        make_it_profile('Data Scientist', 'data_scientist')
+        call_command('refresh_it_profile_overviews', '--profile', 'data_scientist', '--profile', 'network_administrator', stdout=StringIO())
+        self.assertEqual(ITProfile.objects.count(), 2)
+        self.assertTrue(ITProfile.objects.get(key='data_scientist').default_overview.startswith(STUB_ANSWER))
+        self.assertEqual(ITProfile.objects.get(key='network_administrator').name, 'Network Administrator')
+
+    def test_request_path_saves_on_the_seeded_row(self):
+        make_it_profile('Data Scientist', 'data_scientist')
+        views.it_profile_result('data_scientist')
+        self.assertEqual(ITProfile.objects.count(), 1)
+        self.assertTrue(ITProfile.objects.get().default_overview.startswith(STUB_ANSWER))
+        # The stored overview answers the next request without the AI
+        self.assertTrue(views.it_profile_result('data_scientist').startswith(STUB_ANSWER))
+        self.assertEqual(self.stub.calls['main'], 1)
+
+    def test_request_path_never_creates_rows(self):
+        self.assertTrue(views.it_profile_result('network_administrator').startswith(STUB_ANSWER))
+        self.assertFalse(ITProfile.objects.exists())
+
+
+class ITProfileKeyMigrationTests(TestCase):
+    def link_seeded_profiles(self):
+        migration = importlib.import_module('home.migrations.0012_itprofile_seeded_keys')
+        migration.link_seeded_profiles(apps, None)
+
+    def test_sets_keys_on_seeded_rows(self):
+        make_it_profile('UX/UI Designer')
+        make_it_profile('Cloud Architect')
+        self.link_seeded_profiles()
+        self.assertEqual(
+            set(ITProfile.objects.values_list('name', 'key')),
+            {('UX/UI Designer', 'ui_ux_designer'), ('Cloud Architect', 'cloud_engineer')}
+        )
+
+    def test_folds_blank_duplicates_into_the_seeded_row(self):
+        seeded = make_it_profile('Machine Learning Engineer')
+        make_it_profile('AI Engineer', 'ai_engineer', description='', default_overview='Overview')
+        self.link_seeded_profiles()
+        seeded.refresh_from_db()
+        self.assertEqual((seeded.key, seeded.default_overview), ('ai_engineer', 'Overview'))
+        self.assertEqual(ITProfile.objects.count(), 1)
+
+
+class SemanticCacheTests(TestCase):
+    def make_cache(self, **kwargs):
+        cache = SemanticCache(threshold=0.8, **kwargs)
+        cache.add('What is a linked list?', 'Linked lists')
+        cache.add('How does quicksort work?', 'Quicksort')
+        return cache
+
+    def test_similar_questions_share_an_answer(self):
+        cache = self.make_cache()
+        self.assertEqual(cache.lookup('Explain linked lists'), 'Linked lists')
+        self.assertEqual(cache.lookup('how does QUICKSORT work'), 'Quicksort')
+
+    def test_threshold(self):
+        cache = self.make_cache()
+        # Related, but not the same question
+        self.assertIsNone(cache.lookup('What is a doubly linked list?'))
+        cache.threshold = 0.5
+        self.assertEqual(cache.lookup('What is a doubly linked list?'), 'Linked lists')
+
+    def test_stats(self):
+        cache = self.make_cache()
+        cache.lookup('Explain linked lists')
+        cache.lookup('What is a binary tree?')
+        stats = cache.stats()
+        self.assertEqual((stats['lookups'], stats['hits'], stats['misses']), (2, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertEqual(stats['best_similarity_histogram']['0.9-1.0'], 1)
+        self.assertEqual(stats['best_similarity_histogram']['0.0-0.1'], 1)
+
+    def test_snapshot_round_trip(self):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'semantic.json.gz')
+        self.make_cache(snapshot_path=path).save_snapshot()
+        restored = SemanticCache(threshold=0.8, snapshot_path=path)
+        self.assertEqual(restored.lookup('Explain linked lists'), 'Linked lists')
+        self.assertEqual(restored.stats()['entries'], 2)
+
+    def test_snapshots_from_several_processes_are_merged(self):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'semantic.json.gz')
+        first = SemanticCache(snapshot_path=path)
+        second = SemanticCache(snapshot_path=path)
+        first.add('What is a linked list?', 'Linked lists')
+        second.add('How does quicksort work?', 'Quicksort')
+        first.save_snapshot()
+        second.save_snapshot()
+        restored = SemanticCache(snapshot_path=path)
+        self.assertEqual(restored.lookup('Explain linked lists'), 'Linked lists')
+        self.assertEqual(restored.lookup('How does quicksort work?'), 'Quicksort')
+
+    def test_expired_snapshot_rows_are_not_loaded(self):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'semantic.json.gz')
+        self.make_cache(snapshot_path=path).save_snapshot()
+        with mock.patch('home.semantic_cache.time.time', return_value=time.time() + 86401):
+            self.assertIsNone(SemanticCache(snapshot_path=path).lookup('Explain linked lists'))
+
+
+class SemanticCacheStreamTests(LLMStubTestCase):
+    def test_complete_streamed_answer_is_added(self):
+        list(views.chat_event_stream('What is a linked list?', use_semantic_cache=True))
+        self.assertIn('Test Your Understanding', semantic_cache.lookup('Explain linked lists'))
+
+    def test_truncated_streamed_answer_is_not_added(self):
+        self.stub.latency = LatencyModel('fixed', 1.0)
+        with self.settings(AI_REQUEST_BUDGET_SECONDS=0.4):
+            events = self.parse_events(views.chat_event_stream('What is a linked list?', use_semantic_cache=True))
+        self.assertEqual(events[-1][0], 'done')
+        self.assertIsNone(semantic_cache.lookup('Explain linked lists'))
+
+
+class StreamSingleFlightTests(LLMStubTestCase):
+    stub_latency = 0.4
+
+    def stream(self, outcome=None):
+        return views.stream_ai_response('What is a linked list?', views.get_ai_headers(), views.AI_MODELS, "main", outcome)
+
+    def test_concurrent_streams_share_one_upstream_call(self):
+        answers = self.run_concurrently(lambda: ''.join(self.stream()), 8)
+        self.assertEqual(self.stub.calls['main'], 1)
+        self.assertEqual(set(answers), {answers[0]})
+        self.assertEqual(answers[0].strip(), STUB_ANSWER.strip())
+
+    def test_concurrent_event_streams_share_one_upstream_call(self):
+        streams = self.run_concurrently(lambda: self.stream_events(), 5)
+        self.assertEqual(self.stub.calls['main'], 1)
+        self.assertTrue(all(events[-1][0] == 'done' for events in streams))
+
+    def test_followers_get_the_whole_answer_when_the_leader_disconnects(self):
+        leader = self.stream()
+        next(leader)
+        follower_outcome = {}
+        follower = ThreadPoolExecutor(max_workers=1).submit(
+            views._run_ai_task, lambda: ''.join(self.stream(follower_outcome))
+        )
+        time.sleep(0.05)
+        leader.close()
+        self.assertEqual(follower.result().strip(), STUB_ANSWER.strip())
+        self.assertTrue(follower_outcome['complete'])
+        self.assertEqual(self.stub.calls['main'], 1)
+        self.assertIsNotNone(response_cache.peek('What is a linked list?', 'main'))
+
+    def test_errors_are_shared(self):
+        self.stub.error_rate = 1.0
+        answers = self.run_concurrently(lambda: ''.join(self.stream()), 3)
+        self.assertTrue(all(answer.startswith('Error: 500') for answer in answers))
+        self.assertEqual(single_flight.stats()['in_flight'], 0)
+
+
+class AIJobQueueTests(TestCase):
+    def test_claims_the_oldest_pending_job(self):
+        first = enqueue_job('generate', message='first')
+        second = enqueue_job('generate', message='second')
+        job = claim_next_job('worker-1')
+        self.assertEqual(job.id, first.id)
+        self.assertEqual((job.status, job.worker, job.attempts), ('running', 'worker-1', 1))
+        self.assertEqual(claim_next_job('worker-2').id, second.id)
+        self.assertIsNone(claim_next_job('worker-1'))
+
+    def test_job_claimed_by_another_worker_is_skipped(self):
+        taken = enqueue_job('generate', message='first')
+        waiting = enqueue_job('generate', message='second')
+        AIJob.objects.filter(id=taken.id).update(status='running', worker='worker-2')
+        real_first = QuerySet.first
+        # The worker read the id just before worker-2's UPDATE landed
+        picks = iter([taken.id])
+        with mock.patch.object(QuerySet, 'first', lambda qs: next(picks, None) or real_first(qs)):
+            job = claim_next_job('worker-1')
+        self.assertEqual(job.id, waiting.id)
+        self.assertEqual(AIJob.objects.get(id=taken.id).worker, 'worker-2')
+
+    def test_requeue_stale_jobs(self):
+        long_ago = timezone.now() - timedelta(seconds=301)
+        retry = enqueue_job('generate', message='retry')
+        give_up = enqueue_job('generate', message='give up')
+        fresh = enqueue_job('generate', message='fresh')
+        AIJob.objects.filter(id=retry.id).update(status='running', worker='w', started_at=long_ago, attempts=1)
+        AIJob.objects.filter(id=give_up.id).update(status='running', worker='w', started_at=long_ago, attempts=3)
+        AIJob.objects.filter(id=fresh.id).update(status='running', worker='w', started_at=timezone.now(), attempts=1)
+        with self.settings(AI_JOB_STALE_SECONDS=300, AI_JOB_MAX_ATTEMPTS=3):
+            requeue_stale_jobs()
+        statuses = dict(AIJob.objects.values_list('payload__message', 'status'))
+        self.assertEqual(statuses, {'retry': 'pending', 'give up': 'failed', 'fresh': 'running'})
+        self.assertEqual(AIJob.objects.get(id=give_up.id).error, 'Worker stopped responding')
+
+    def test_status_endpoint(self):
+        job = enqueue_job('generate', message='question')
+        url = reverse('ai_job_status', args=[job.id])
+        self.assertEqual(self.client.get(url).json()['status'], 'pending')
+        AIJob.objects.filter(id=job.id).update(status='done', result='**Answer**', finished_at=timezone.now())
+        data = self.client.get(url).json()
+        self.assertEqual((data['status'], data['result']), ('done', '**Answer**'))
+        self.assertIn('<strong>Answer</strong>', data['html'])
+        AIJob.objects.filter(id=job.id).update(status='failed', error='Error: 500')
+        self.assertEqual(self.client.get(url).json()['error'], 'Error: 500')
+
+    def test_status_of_an_unknown_job(self):
+        response = self.client.get(reverse('ai_job_status', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, 404)
+
+
+class AIJobRunTests(LLMStubTestCase):
+    def test_enqueued_job_is_answered(self):
+        response = self.client.post(reverse('generate_job'), {'message': 'What is a linked list?'})
+        self.assertEqual(response.status_code, 202)
+        run_job(claim_next_job('worker-1'))
+        data = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(data['status'], 'done')
+        self.assertTrue(data['result'].startswith(STUB_ANSWER))
+
+    def test_failed_generation_fails_the_job(self):
+        self.stub.error_rate = 1.0
+        enqueue_job('generate', message='What is a linked list?')
+        job = run_job(claim_next_job('worker-1'))
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(job.error.startswith('Error: 500'))
+
+
+class WarmAICacheTests(LLMStubTestCase):
+    def setUp(self):
+        super().setUp()
+        # The command shuts the shared pools down before exiting
+        self.enterContext(mock.patch.object(views.ai_executor, 'shutdown'))
+        self.enterContext(mock.patch.object(question_bank, 'shutdown'))
+        handle, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(handle, 'w') as prompt_file:
+            prompt_file.write('# warm-up prompts\nWhat is a linked list?\nWhat is a hash map?\n')
+        self.addCleanup(os.remove, path)
+        self.prompt_file = path
+
+    def warm(self, *args):
+        out = StringIO()
+        call_command('warm_ai_cache', self.prompt_file, '--rate', '0', *args, stdout=out)
+        return out.getvalue()
+
+    def warm_prompt(self, prompt):
+        self.ask(prompt)
+        self.wait_for(lambda: response_cache.peek(prompt, 'questions') is not None)
+
+    def test_skips_warm_prompts(self):
+        self.warm_prompt('What is a linked list?')
+        output = self.warm()
+        self.assertIn('2 prompt(s), 1 already cached, 1 to generate', output)
+        self.assertEqual(self.stub.calls['main'], 2)
+        self.assertIsNotNone(response_cache.peek('What is a hash map?', 'main'))
+        self.assertIn('=== Warming Complete ===', output)
+
+    def test_second_run_generates_nothing(self):
+        self.warm()
+        self.wait_for(lambda: response_cache.peek('What is a hash map?', 'questions') is not None)
+        self.assertIn('2 already cached, 0 to generate', self.warm())
+        self.assertEqual(self.stub.calls['main'], 2)
+
+    def test_force_regenerates_warm_prompts(self):
+        self.warm_prompt('What is a linked list?')
+        self.warm_prompt('What is a hash map?')
+        output = self.warm('--force')
+        self.assertIn('2 to generate', output)
+        self.assertIn('Warmed 2 prompt(s)', output)
+        self.assertEqual(self.stub.calls['main'], 4)
+
+    def test_dry_run_calls_nothing(self):
+        output = self.warm('--dry-run')
+        self.assertIn('[DRY RUN] Would generate: What is a hash map?', output)
+        self.assertEqual(self.stub.requests, 0)
+
+
+class AIRequestLogTests(LLMStubTestCase):
+    def logger(self, **options):
+        """
+        A logger whose background flushes set self.flushed, so the test
+        reads the table after the insert rather than racing it
+        """
+        logger = AIRequestLogger(**options)
+        self.flushed = threading.Event()
+        flush = logger.flush
+
+        def flush_and_signal():
+            written = flush()
+            if written:
+                self.flushed.set()
+            return written
+        logger.flush = flush_and_signal
+        return logger
+
+    def test_full_batch_is_flushed_in_the_background(self):
+        logger = self.logger(batch_size=3, flush_interval=60)
+        for i in range(3):
+            logger.record(f'Question {i}', 'main', 'miss', 'model-a', 0.25, {'prompt_tokens': 10, 'completion_tokens': 5}, 'answer')
+        self.assertTrue(self.flushed.wait(5))
+        self.assertEqual(AIRequestLog.objects.count(), 3)
+        row = AIRequestLog.objects.get(prompt='question 0')
+        self.assertEqual((row.model, row.latency_ms, row.prompt_tokens, row.completion_tokens, row.response_chars), ('model-a', 250, 10, 5, 6))
+
+    def test_partial_batch_is_flushed_on_the_interval(self):
+        logger = self.logger(batch_size=100, flush_interval=0.05)
+        logger.record('What is a linked list?', 'main', 'hit')
+        self.assertTrue(self.flushed.wait(5))
+        self.assertEqual(AIRequestLog.objects.count(), 1)
+
+    def test_full_buffer_drops_the_oldest_rows(self):
+        logger = AIRequestLogger(batch_size=100, flush_interval=60, max_buffer=2)
+        for i in range(3):
+            logger.record(f'Question {i}', 'main', 'hit')
+        self.assertEqual(logger.dropped, 1)
+        self.assertEqual(logger.flush(), 2)
+        self.assertEqual(sorted(AIRequestLog.objects.values_list('prompt', flat=True)), ['question 1', 'question 2'])
+
+    def test_pipeline_records_misses_and_hits(self):
+        self.enterContext(mock.patch.object(ai_request_log, 'enabled', True))
+        self.ask()
+        self.wait_for(lambda: response_cache.peek('What is a linked list?', 'questions') is not None)
+        self.ask()
+        ai_request_log.flush()
+        rows = list(AIRequestLog.objects.values_list('response_type', 'cache'))
+        self.assertEqual(sorted(rows), [('main', 'hit'), ('main', 'miss'), ('questions', 'hit'), ('questions', 'miss')])
+        miss = AIRequestLog.objects.get(response_type='main', cache='miss')
+        self.assertEqual(miss.model, views.AI_MODELS[0])
+        self.assertGreater(miss.prompt_tokens, 0)
+
+
+class AILogReportTests(TestCase):
+    def setUp(self):
+        # Rows other tests left in the shared buffer would skew the numbers
+        self.enterContext(mock.patch.object(ai_request_log, 'flush'))
+        now = timezone.now()
+        for latency_ms in (100, 200, 300, 400):
+            self.log('What is a linked list?', 'miss', latency_ms=latency_ms, prompt_tokens=1000, completion_tokens=500)
+        self.log('What is a linked list?', 'hit')
+        self.log('What is a hash map?', 'semantic', endpoint='generate_async')
+        self.log('What is a heap?', 'miss', created_at=now - timedelta(days=10), prompt_tokens=1000)
+
+    def log(self, prompt, cache, endpoint='generate', **fields):
+        AIRequestLog.objects.create(
+            endpoint=endpoint,
+            response_type='main',
+            prompt_hash=make_cache_key(prompt, 'main'),
+            prompt=prompt.lower(),
+            model='model-a' if cache == 'miss' else '',
+            cache=cache,
+            **fields,
+        )
+
+    def report(self, *args):
+        """The report as a list of whitespace-split lines"""
+        out = StringIO()
+        with self.settings(AI_MODEL_PRICING={'model-a': (1.0, 2.0)}):
+            call_command('ai_log_report', *args, stdout=out)
+        return [line.split() for line in out.getvalue().splitlines()]
+
+    def test_report_numbers(self):
+        output = self.report()
+        self.assertIn('6 request(s) in the last 7 day(s)'.split(), output)
+        self.assertIn(['miss', '4', '66.7%'], output)
+        self.assertIn(['hit', '1', '16.7%'], output)
+        self.assertIn('5 (4 uncached) what is a linked list?'.split(), output)
+        # p50, p95 and p99 of 100..400ms
+        self.assertIn(['model-a', '4', '200', '400', '400'], output)
+        self.assertIn([str(timezone.now().date()), '4000', 'in', '2000', 'out', '$0.0080'], output)
+        self.assertEqual(AIRequestLog.objects.count(), 7)
+
+    def test_endpoint_filter(self):
+        output = self.report('--endpoint', 'generate_async')
+        self.assertIn('1 request(s) in the last 7 day(s)'.split(), output)
+        self.assertIn(['semantic', '1', '100.0%'], output)
+
+    def test_prune_deletes_old_rows(self):
+        output = self.report('--prune')
+        self.assertIn('Pruned 1 old row(s)'.split(), output)
+        self.assertFalse(AIRequestLog.objects.filter(prompt='what is a heap?').exists())
+
+
+def question_set(label):
+    return "\n".join(f"{i}. {label} question {i}?" for i in range(1, 4))
+
+
+class QuestionBankTests(LLMStubTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bank = QuestionBank(variants=3)
+        self.addCleanup(self.bank.shutdown)
+
+    def wait_for_fills(self, count):
+        self.wait_for(lambda: self.bank.stats()['fills'] + self.bank.stats()['failed_fills'] == count)
+
+    def test_rotates_through_the_stored_variants(self):
+        for label in ('First', 'Second', 'Third'):
+            self.assertTrue(self.bank.add('What is a linked list?', question_set(label)))
+        fetch = mock.Mock()
+        served = [self.bank.get('What is a linked list?', fetch) for _ in range(4)]
+        self.assertEqual(served, [question_set('Third'), question_set('Second'), question_set('First'), question_set('Third')])
+        # A full, fresh set of variants needs no refill
+        fetch.assert_not_called()
+        self.assertEqual(self.bank.stats()['hits'], 4)
+
+    def test_keeps_only_the_newest_variants(self):
+        for label in ('First', 'Second', 'Third', 'Fourth'):
+            self.bank.add('What is a linked list?', question_set(label))
+        self.assertEqual(
+            sorted(FollowUpQuestionSet.objects.values_list('questions', flat=True)),
+            sorted(question_set(label) for label in ('Second', 'Third', 'Fourth')),
+        )
+
+    def test_rejects_text_that_is_not_questions(self):
+        self.assertFalse(self.bank.add('What is a linked list?', 'Error: 500 - upstream failed'))
+        self.assertFalse(FollowUpQuestionSet.objects.exists())
+
+    def test_miss_fills_in_the_background(self):
+        fetch = mock.Mock(return_value=question_set('Fresh'))
+        self.assertIsNone(self.bank.get('What is a linked list?', fetch))
+        self.wait_for_fills(1)
+        fetch.assert_called_once_with()
+        self.assertEqual(self.bank.get('What is a linked list?', fetch), question_set('Fresh'))
+        self.assertEqual(self.bank.stats()['misses'], 1)
+
+    def test_concurrent_misses_share_one_fill(self):
+        release = threading.Event()
+
+        def fetch():
+            release.wait(5)
+            return question_set('Fresh')
+        fetch = mock.Mock(side_effect=fetch)
+        for _ in range(3):
+            self.assertIsNone(self.bank.get('What is a linked list?', fetch))
+        release.set()
+        self.wait_for_fills(1)
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_failed_fill_stores_nothing(self):
+        fetch = mock.Mock(return_value='Error: 503 - unavailable')
+        self.assertIsNone(self.bank.get('What is a linked list?', fetch))
+        self.wait_for_fills(1)
+        self.assertEqual(self.bank.stats()['failed_fills'], 1)
+        self.assertFalse(self.bank.has_topic('What is a linked list?'))
+
+    def test_stale_variants_are_served_and_refreshed(self):
+        bank = QuestionBank(variants=1, refresh_after=60)
+        self.addCleanup(bank.shutdown)
+        bank.add('What is a linked list?', question_set('Old'))
+        FollowUpQuestionSet.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        fetch = mock.Mock(return_value=question_set('New'))
+        self.assertEqual(bank.get('What is a linked list?', fetch), question_set('Old'))
+        self.wait_for(lambda: bank.stats()['fills'] == 1)
+        self.assertEqual(bank.get('What is a linked list?', fetch), question_set('New'))
+
+    def test_chat_fills_the_bank_on_a_miss(self):
+        self.enterContext(self.settings(AI_QUESTION_BANK_ENABLED=True))
+        # The shared bank's counters run for the whole process
+        fills = question_bank.stats()['fills']
+        self.assertEqual(self.ask(), STUB_ANSWER)
+        self.wait_for(lambda: question_bank.stats()['fills'] == fills + 1)
+        self.assertEqual(self.ask(), STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS))
+        self.assertEqual(self.stub.calls, {'main': 1, 'questions': 1})
+
+    def bank_on_and_fill(self, first_answer):
+        """Turn the shared bank on, get the first answer and wait for the fill its miss started"""
+        self.enterContext(self.settings(AI_QUESTION_BANK_ENABLED=True))
+        fills = question_bank.stats()['fills']
+        # A streamed answer ends with the last chunk's trailing space
+        self.assertEqual(first_answer().rstrip(), STUB_ANSWER)
+        self.wait_for(lambda: question_bank.stats()['fills'] == fills + 1)
+        # Only the answer is kept, the questions come from the bank
+        self.assertEqual(semantic_cache.lookup('Explain linked lists'), STUB_ANSWER)
+
+    def test_semantic_hit_gets_the_banked_questions(self):
+        ask = lambda: views.chat_with_ai('What is a linked list?', use_semantic_cache=True)
+        self.bank_on_and_fill(ask)
+        self.assertEqual(ask(), STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS))
+        self.assertEqual(self.stub.calls, {'main': 1, 'questions': 1})
+
+    def test_async_semantic_hit_gets_the_banked_questions(self):
+        ask = lambda: async_to_sync(views.achat_with_ai)('What is a linked list?', use_semantic_cache=True)
+        self.bank_on_and_fill(ask)
+        self.assertEqual(ask(), STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS))
+        self.assertEqual(self.stub.calls, {'main': 1, 'questions': 1})
+
+    def test_streamed_semantic_hit_gets_the_banked_questions(self):
+        def ask():
+            response = self.client.post(reverse('generate_stream'), {'message': 'What is a linked list?'})
+            events = self.parse_events(chunk.decode() for chunk in response.streaming_content)
+            return ''.join(payload['text'] for event, payload in events if event in ('token', 'questions'))
+        self.bank_on_and_fill(ask)
+        self.assertEqual(ask(), STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS))
+        self.assertEqual(self.stub.calls, {'main': 1, 'questions': 1})
+
+    def test_overview_without_questions_is_not_stored(self):
+        self.enterContext(self.settings(AI_QUESTION_BANK_ENABLED=True))
+        make_it_profile('Data Scientist', 'data_scientist')
+        fills = question_bank.stats()['fills']
+        self.assertEqual(views.it_profile_result('data_scientist'), STUB_ANSWER)
+        self.assertEqual(ITProfile.objects.get().default_overview, '')
+        self.wait_for(lambda: question_bank.stats()['fills'] == fills + 1)
+        overview = STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS)
+        self.assertEqual(views.it_profile_result('data_scientist'), overview)
+        self.assertEqual(ITProfile.objects.get().default_overview, overview)
+
+
+class SingleCallTests(LLMStubTestCase):
+    full_answer = STUB_ANSWER + views.format_questions_section(STUB_QUESTIONS)
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(self.settings(AI_SINGLE_CALL=True))
+
+    def test_split_combined_response(self):
+        text = f"Answer\n\n---\n\n{views.QUESTIONS_MARKER}\n1. One?\n2. Two?\n3. Three?"
+        self.assertEqual(views.split_combined_response(text), ('Answer', '1. One?\n2. Two?\n3. Three?'))
+        self.assertIsNone(views.split_combined_response('Answer without questions'))
+        self.assertIsNone(views.split_combined_response(f"Answer\n{views.QUESTIONS_MARKER}\n1. One?\n2. Two?"))
+        self.assertIsNone(views.split_combined_response(f"{views.QUESTIONS_MARKER}\n1. One?\n2. Two?\n3. Three?"))
+
+    def test_one_completion_answers_both(self):
+        misses = response_cache.stats()['misses']
+        self.assertEqual(self.ask(), self.full_answer)
+        self.assertEqual(self.stub.calls, {'combined': 1})
+        self.assertEqual(response_cache.peek('What is a linked list?', 'questions'), STUB_QUESTIONS)
+        # Checking for cached halves doesn't count as cache misses
+        self.assertEqual(response_cache.stats()['misses'], misses)
+
+    def test_falls_back_to_two_calls_without_the_marker(self):
+        self.stub.omit_marker = True
+        self.assertEqual(self.ask(), self.full_answer)
+        self.assertEqual(self.stub.calls, {'combined': 1, 'main': 1, 'questions': 1})
+
+    def test_stream_holds_back_the_questions(self):
+        events = self.stream_events()
+        tokens = ''.join(payload['text'] for event, payload in events if event == 'token')
+        self.assertEqual(tokens, STUB_ANSWER)
+        self.assertEqual(events[-2], ('questions', {'text': views.format_questions_section(STUB_QUESTIONS)}))
+        self.assertEqual(self.stub.calls, {'combined': 1})
+        self.assertEqual(response_cache.peek('What is a linked list?', 'main'), STUB_ANSWER)
+
+    def test_stream_finds_a_marker_split_across_chunks(self):
+        chunks = ['Answer text\n\n--', '-\n\n<<<QUES', 'TIONS>>>\n1. One?\n2. Two?', '\n3. Three?']
+        def fake_stream(message, headers, models_to_try, response_type, outcome):
+            outcome['complete'] = True
+            yield from chunks
+        outcome = {}
+        with mock.patch.object(views, 'stream_ai_response', fake_stream):
+            tokens = list(views.stream_single_call_response('question', {}, views.AI_MODELS, outcome))
+        self.assertEqual(''.join(tokens), 'Answer text')
+        self.assertEqual(outcome['questions'], '1. One?\n2. Two?\n3. Three?')
+
+    def test_stream_without_the_marker_gets_questions_separately(self):
+        self.stub.omit_marker = True
+        events = self.stream_events()
+        tokens = ''.join(payload['text'] for event, payload in events if event == 'token')
+        self.assertEqual(tokens.strip(), STUB_ANSWER.strip())
+        self.assertEqual(events[-2], ('questions', {'text': views.format_questions_section(STUB_QUESTIONS)}))
+        self.assertEqual(self.stub.calls, {'combined': 1, 'questions': 1})
+        self.assertEqual(response_cache.peek('What is a linked list?', 'main'), STUB_ANSWER.strip())
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.enterContext(self.settings(
+            AI_RATE_LIMIT_ENABLED=True,
+            AI_RATE_LIMIT_CACHE='shared',
+            AI_RATE_LIMITS={'generate': {'capacity': 2, 'per_minute': 6}},
+        ))
+
+    def post(self, **headers):
+        # An empty message is rejected by the view, so nothing reaches the AI
+        return self.client.post(reverse('generate_stream'), {'message': ''}, **headers)
+
+    def test_burst_beyond_capacity_gets_429(self):
+        self.assertEqual(self.post().status_code, 400)
+        self.assertEqual(self.post().status_code, 400)
+        response = self.post()
+        self.assertEqual(response.status_code, 429)
+        # One token every 10 seconds
+        self.assertEqual(response['Retry-After'], '10')
+        self.assertContains(response, 'Please wait 10 seconds', status_code=429)
+
+    def test_json_clients_get_json(self):
+        for _ in range(2):
+            self.post()
+        response = self.post(HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['retry_after'], 10)
+
+    def test_clients_are_limited_separately(self):
+        for _ in range(2):
+            self.post()
+        self.assertEqual(self.post(REMOTE_ADDR='10.0.0.2').status_code, 400)
+
+    def test_disabled(self):
+        with self.settings(AI_RATE_LIMIT_ENABLED=False):
+            for _ in range(3):
+                self.assertEqual(self.post().status_code, 400)
+
+    def test_fails_open_with_a_warning(self):
+        with mock.patch('home.ratelimit.take_token', side_effect=DatabaseError('no such table: learnbuddy_cache')):
+            with self.assertLogs('home.ratelimit', 'WARNING') as logs:
+                for _ in range(3):
+                    self.assertEqual(self.post().status_code, 400)
+        self.assertIn('no such table', logs.output[0])
+
+
+class BulkheadTests(LLMStubTestCase):
+    stub_latency = 1.0
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(mock.patch.multiple(ai_bulkhead, max_concurrent=1, max_queue=1, queue_timeout=0.2, host_slots=None))
+        ai_bulkhead.rejected = 0
+
+    def test_queue_timeout_and_overflow_get_503(self):
+        def post(i):
+            return views._run_ai_task(Client().post, reverse('generate'), {'message': f'Question {i}'})
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            responses = list(executor.map(post, range(3)))
+        self.assertEqual(sorted(response.status_code for response in responses), [200, 503, 503])
+        busy = next(response for response in responses if response.status_code == 503)
+        self.assertEqual(busy['Retry-After'], '5')
+        self.assertEqual(ai_bulkhead.stats()['rejected'], 2)
+        self.assertEqual(ai_bulkhead.stats()['active'], 0)
+
+    def test_streaming_response_holds_its_slot_until_sent(self):
+        self.stub.latency = LatencyModel('fixed', 0.05)
+        response = self.client.post(reverse('generate_stream'), {'message': 'What is a linked list?'})
+        self.assertEqual(ai_bulkhead.stats()['active'], 1)
+        b''.join(response.streaming_content)
+        self.assertEqual(ai_bulkhead.stats()['active'], 0)
+
+    def test_queued_request_gets_a_freed_slot(self):
+        bulkhead = Bulkhead(max_concurrent=1, max_queue=1, queue_timeout=2)
+        token = bulkhead.acquire()
+        threading.Timer(0.1, bulkhead.release, [token]).start()
+        self.assertIsNotNone(bulkhead.acquire())
+        self.assertEqual(bulkhead.stats()['rejected'], 0)
+
+    def test_host_slots_are_skipped_when_the_host_limit_is_off(self):
+        bulkhead = Bulkhead(max_concurrent=2, max_queue=0, queue_timeout=0.1, host_slots=HostSlots(0, self.enterContext(tempfile.TemporaryDirectory())))
+        self.assertFalse(bulkhead.host_slots.enabled)
+        token = bulkhead.acquire()
+        self.assertIsNone(token.slot)
+        bulkhead.release(token)
+        self.assertEqual(bulkhead.stats()['active'], 0)
+
+    def test_host_slots_are_shared_between_bulkheads(self):
+        lock_dir = self.enterContext(tempfile.TemporaryDirectory())
+        first = Bulkhead(max_concurrent=1, max_queue=0, queue_timeout=0.1, host_slots=HostSlots(1, lock_dir))
+        second = Bulkhead(max_concurrent=1, max_queue=0, queue_timeout=0.1, host_slots=HostSlots(1, lock_dir))
+        if not first.host_slots.enabled:
+            self.skipTest('fcntl is unavailable')
+        token = first.acquire()
+        self.assertIsNone(second.acquire())
+        first.release(token)
+        token = second.acquire()
+        self.assertIsNotNone(token)
+        second.release(token)
+
+
+class HedgingTests(LLMStubTestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(self.settings(AI_HEDGING_ENABLED=True, AI_HEDGE_DEFAULT_DELAY=0.05))
+        self.enterContext(mock.patch.multiple(
+            hedge_budget, ratio=0.1, tokens=1.0,
+            _stats={'requests': 0, 'hedges': 0, 'hedge_wins': 0, 'denied': 0}
+        ))
+
+    def ask_model(self, message):
+        return views.get_ai_response(message, views.get_ai_headers(), views.AI_MODELS)
+
+    def test_hedge_beats_a_slow_primary(self):
+        self.stub.latency_by_model = {views.AI_MODELS[0]: LatencyModel('fixed', 1.0)}
+        started = time.monotonic()
+        self.assertEqual(self.ask_model('What is a linked list?'), STUB_ANSWER)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(hedge_budget.stats()['hedge_wins'], 1)
+        self.assertEqual(self.stub.model_calls[views.AI_MODELS[1]], 1)
+
+    def test_async_hedge_beats_a_slow_primary(self):
+        self.stub.latency_by_model = {views.AI_MODELS[0]: LatencyModel('fixed', 1.0)}
+        started = time.monotonic()
+        response = async_to_sync(views.aget_ai_response)('What is a linked list?', views.get_ai_headers(), views.AI_MODELS)
+        self.assertEqual(response, STUB_ANSWER)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(hedge_budget.stats()['hedge_wins'], 1)
+
+    def test_hedges_stay_within_the_budget(self):
+        # Every primary is slower than the hedge delay, so every request wants a hedge
+        self.stub.latency = LatencyModel('fixed', 0.15)
+        for i in range(20):
+            self.assertEqual(self.ask_model(f'Question {i}'), STUB_ANSWER)
+        stats = hedge_budget.stats()
+        # The starting token plus 10% of the requests
+        self.assertLessEqual(stats['hedges'], 3)
+        self.assertGreaterEqual(stats['denied'], 15)
+        self.wait_for(lambda: self.stub.requests == 20 + stats['hedges'])
+
+    def test_hedge_skips_the_model_the_primary_fell_back_to(self):
+        first, second, third = views.AI_MODELS[:3]
+        self.stub.unavailable_models = {first}
+        self.stub.latency_by_model = {second: LatencyModel('fixed', 1.0)}
+        for async_http in (True, False):
+            with self.subTest(async_http=async_http), \
+                    mock.patch.object(views, 'async_http_available', return_value=async_http):
+                model_health.reset()
+                hedge_budget.tokens = 1.0
+                self.stub.model_calls.clear()
+                started = time.monotonic()
+                self.assertEqual(self.ask_model(f'Question {async_http}'), STUB_ANSWER)
+                self.assertLess(time.monotonic() - started, 0.5)
+                self.assertEqual(self.stub.model_calls[second], 1)
+                self.assertEqual(self.stub.model_calls[third], 1)
+
+    def test_sync_hedging_takes_no_pool_threads(self):
+        self.stub.latency_by_model = {views.AI_MODELS[0]: LatencyModel('fixed', 1.0)}
+        with mock.patch.object(views.hedge_executor, 'submit') as submit:
+            self.assertEqual(self.ask_model('What is a linked list?'), STUB_ANSWER)
+        submit.assert_not_called()
+
+    def test_fast_primary_is_not_hedged(self):
+        self.assertEqual(self.ask_model('What is a linked list?'), STUB_ANSWER)
+        self.assertEqual(hedge_budget.stats()['hedges'], 0)
+        self.assertEqual(self.stub.requests, 1)
+
+
+METRIC_LINE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+METRIC_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """{(name, frozenset of label pairs): value} from the exposition format"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        name, labels, value = METRIC_LINE.match(line).groups()
+        samples[(name, frozenset(METRIC_LABEL.findall(labels or '')))] = float(value)
+    return samples
+
+
+class MetricsTests(LLMStubTestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(self.settings(AI_METRICS_TOKEN='scrape'))
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape')
+        self.assertEqual(response.status_code, 200)
+        return parse_metrics(response.content.decode())
+
+    def sample(self, samples, name, **labels):
+        return samples.get((name, frozenset(labels.items())), 0)
+
+    def ask_main(self, message='What is a linked list?'):
+        return views.get_ai_response(message, views.get_ai_headers(), views.AI_MODELS)
+
+    def test_attempts_and_tokens(self):
+        self.assertEqual(self.ask_main(), STUB_ANSWER)
+        samples = self.scrape()
+        model = views.AI_MODELS[0]
+        self.assertEqual(self.sample(samples, 'learnbuddy_ai_requests_total', model=model, response_type='main', status='200'), 1)
+        self.assertGreater(self.sample(samples, 'learnbuddy_ai_tokens_total', model=model, kind='prompt'), 0)
+        self.assertGreater(self.sample(samples, 'learnbuddy_ai_tokens_total', model=model, kind='completion'), 0)
+        self.assertEqual(self.sample(samples, 'learnbuddy_ai_request_duration_seconds_count', model=model, response_type='main'), 1)
+
+    def test_fallback_past_an_unavailable_model(self):
+        self.stub.unavailable_models = {views.AI_MODELS[0]}
+        self.assertEqual(self.ask_main(), STUB_ANSWER)
+        samples = self.scrape()
+        self.assertEqual(self.sample(samples, 'learnbuddy_ai_requests_total', model=views.AI_MODELS[0], response_type='main', status='400'), 1)
+        self.assertEqual(self.sample(samples, 'learnbuddy_ai_fallbacks_total', model=views.AI_MODELS[0], response_type='main'), 1)
+        self.assertEqual(self.sample(samples, 'learnbuddy_ai_requests_total', model=views.AI_MODELS[1], response_type='main', status='200'), 1)
+
+    def test_async_fallback_past_an_unavailable_model(self):
+        self.stub.unavailable_models = {views.AI_MODELS[0]}
+        response = async_to_sync(views.aget_ai_response)('What is a linked list?', views.get_ai_headers(), views.AI_MODELS)
+        self.assertEqual(response, STUB_ANSWER)
+        samples = self.scrape()
+        self.assertEqual(self.sample(samples, 'learnbuddy_ai_requests_total', model=views.AI_MODELS[0], response_type='main', status='400'), 1)
+        self.assertEqual(self.sample(samples, 'learnbuddy_ai_fallbacks_total', model=views.AI_MODELS[0], response_type='main'), 1)
+
+    def test_question_outcomes_are_exported_before_they_happen(self):
+        samples = self.scrape()
+        for outcome in ('ok', 'error', 'timeout', 'skipped', 'bank_hit', 'bank_miss'):
+            self.assertEqual(samples[('learnbuddy_ai_questions_total', frozenset({('outcome', outcome)}))], 0)
+
+    def test_requires_the_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+    def test_requires_staff_without_a_token(self):
+        with self.settings(AI_METRICS_TOKEN=''):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+            self.client.force_login(User.objects.create_user('ops', is_staff=True))
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
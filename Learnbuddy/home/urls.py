@@ -1,13 +1,30 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI the AI pages can run as native async views
+if getattr(settings, 'AI_ASYNC_VIEWS', False):
+    generate_view, it_profiles_view = views.generate_async, views.it_profiles_async
+else:
+    generate_view, it_profiles_view = views.generate, views.it_profiles
+
 urlpatterns = [
     path('', views.home, name='home'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
     path('learning-advisor/', views.learning_advisor, name='learning_advisor'),
     path('learning-advisor/<int:path_id>/', views.learning_path_detail, name='learning_path_detail'),
-    path('generate/', views.generate, name='generate'),
+    path('generate/', generate_view, name='generate'),
+    path('generate/stream/', views.generate_stream, name='generate_stream'),
+    path('generate/jobs/', views.generate_job, name='generate_job'),
     path('hackathons/', views.hackathons, name='hackathons'),
-    path('it-profiles/', views.it_profiles, name='it_profiles'),
+    path('api/hackathons/', views.hackathons_api, name='hackathons_api'),
+    path('search/', views.site_search, name='site_search'),
+    path('it-profiles/', it_profiles_view, name='it_profiles'),
+    path('it-profiles/stream/', views.it_profiles_stream, name='it_profiles_stream'),
+    path('it-profiles/jobs/', views.it_profiles_job, name='it_profiles_job'),
+    path('ai-jobs/<uuid:job_id>/', views.ai_job_status, name='ai_job_status'),
+    path('ai-cache/stats/', views.ai_cache_stats, name='ai_cache_stats'),
+    path('ai-models/health/', views.ai_model_health, name='ai_model_health'),
+    path('metrics', views.metrics, name='metrics'),
 ]
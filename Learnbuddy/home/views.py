@@ -1,17 +1,53 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from .models import Contact, CSKnowledgeArea, CSLearningPath, Hackathon, ITProfile
 from .forms import ContactForm, MessageForm, ITProfileForm
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST, require_GET
+from django.urls import reverse
 import json
 import os
-import requests
+import re
+import time
+import asyncio
+import contextvars
+import threading
+from datetime import date, timedelta
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
 from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q, Window
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from .ai_cache import response_cache, make_cache_key
+from .single_flight import single_flight
+from .ai_jobs import enqueue_job, job_status
+from .ratelimit import rate_limit
+from .bulkhead import bulkhead, ai_bulkhead
+from .models import AIJob
+from .semantic_cache import semantic_cache
+from .model_health import model_health
+from .metrics import ai_metrics
+from .ai_log import ai_request_log, log_endpoint, iter_in_context
+from .question_bank import question_bank
+from .ai_markdown import render_ai_result, split_questions
+from .hackathon_cards import attach_card_versions
+from .search import SOURCES, fts_available, fts_query, matching_ids_sql, search, search_backend, search_terms
+from .hedging import ModelClaims, hedging_enabled, hedge_delay, hedge_budget, hedge_loop
+from .ai_client import (
+    RequestBudget, post_chat_completion, stream_chat_completion, iter_completion_deltas,
+    async_http_available, apost_chat_completion
+)
 
 def home(request):
-    hackathons = Hackathon.objects.all().order_by('-start_date')[:3]
-    return render(request, 'home.html', {'hackathons': hackathons})
+    hackathons = list(Hackathon.objects.all().order_by('-start_date')[:3])
+    context = {'hackathons': hackathons}
+    context.update(attach_card_versions(hackathons))
+    return render(request, 'home.html', context)
 
 def about(request):
     return render(request, 'about.html')
@@ -43,44 +79,250 @@ def learning_path_detail(request, path_id):
         'knowledge_areas': knowledge_areas
     })
 
-def chat_with_ai(message):
-    """Enhanced AI chat function that generates main response + relevant questions"""
+# Shared pool so the main answer and the follow-up questions run side by side
+ai_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'AI_WORKER_THREADS', 8),
+    thread_name_prefix='ai-worker'
+)
+
+# Without httpx, hedged attempts get their own pool so they never wait
+# behind the requests that spawned them in ai_executor
+hedge_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'AI_WORKER_THREADS', 8) * 2,
+    thread_name_prefix='ai-hedge'
+)
+
+def _run_ai_task(func, *args):
+    """Run func in a pool thread and release the thread's DB connection afterwards"""
+    try:
+        return func(*args)
+    finally:
+        connection.close()
+
+def submit_ai_task(executor, func, *args):
+    """Submit func to executor, carrying the caller's context (the request log endpoint) along"""
+    return executor.submit(contextvars.copy_context().run, _run_ai_task, func, *args)
+
+# Try multiple models in case some are unavailable
+AI_MODELS = [
+    "llama-3.1-8b-instant",
+    "mixtral-8x7b-32768",
+    "llama3-8b-8192",
+    "gemma2-9b-it"
+]
+
+QUESTIONS_HEADING = "## 🤔 Test Your Understanding"
+
+# Separates the answer from the follow-up questions in single-call mode
+QUESTIONS_MARKER = "<<<QUESTIONS>>>"
+
+MAX_TOKENS = {"main": 800, "questions": 300, "combined": 1100}
+
+# Error codes saying the model itself is gone, as opposed to a bad request
+MODEL_UNAVAILABLE_CODES = {"model_not_found", "model_decommissioned"}
+
+def get_ai_headers():
     # Using Groq API as free alternative
     api_key = settings.GROQ_API_KEY if hasattr(settings, 'GROQ_API_KEY') else settings.OPENAI_API_KEY
-    
-    # Try multiple models in case some are unavailable
-    models_to_try = [
-        "llama-3.1-8b-instant",
-        "mixtral-8x7b-32768",
-        "llama3-8b-8192",
-        "gemma2-9b-it"
-    ]
-    
-    headers = {
+    return {
         'Authorization': f'Bearer {api_key}',
         'Content-Type': 'application/json'
     }
+
+def format_questions_section(questions_response):
+    return f"\n\n---\n\n{QUESTIONS_HEADING}\n\n{questions_response}"
+
+def has_questions(response):
+    """Whether a response is a full answer, follow-up questions included"""
+    return not response.startswith("Error:") and QUESTIONS_HEADING in response
+
+def remember_semantic_answer(message, response):
+    """
+    Offer a finished answer to the semantic cache. Similar prompts get it
+    back as is, so an answer whose questions timed out or failed is left out.
+    With the question bank on only the answer itself is kept, the questions
+    are attached from the bank each time it is served.
+    """
+    if response.startswith("Error:"):
+        return
+    if getattr(settings, 'AI_QUESTION_BANK_ENABLED', True):
+        semantic_cache.add(message, split_questions(response)[0].rstrip())
+    elif has_questions(response):
+        semantic_cache.add(message, response)
+
+def semantic_answer(message):
+    """The cached answer to a similarly worded prompt, or None"""
+    similar = semantic_cache.lookup(message)
+    if similar is None:
+        return None
+    ai_request_log.record(message, "main", 'semantic', response=similar)
+    if not getattr(settings, 'AI_QUESTION_BANK_ENABLED', True):
+        return similar
+    # Entries cached before the bank was turned on may carry their own questions
+    answer = split_questions(similar)[0]
+    return answer + banked_questions_section(message, get_ai_headers(), list(AI_MODELS))
+
+def chat_with_ai(message, use_semantic_cache=False):
+    """Enhanced AI chat function that generates main response + relevant questions"""
+    # Free-form questions can reuse the answer to an earlier, similarly worded one
+    if use_semantic_cache:
+        similar = semantic_answer(message)
+        if similar is not None:
+            return similar
     
-    # First, get the main response
-    main_response = get_ai_response(message, headers, models_to_try, "main")
+    result = _chat_with_ai(message)
+    if use_semantic_cache:
+        remember_semantic_answer(message, result)
+    return result
+
+def _chat_with_ai(message):
+    models_to_try = list(AI_MODELS)
+    headers = get_ai_headers()
+    
+    if getattr(settings, 'AI_SINGLE_CALL', False):
+        combined_response = get_single_call_response(message, headers, models_to_try)
+        if combined_response is not None:
+            return combined_response
+    
+    if getattr(settings, 'AI_QUESTION_BANK_ENABLED', True):
+        main_response = get_cached_ai_response(message, headers, models_to_try, "main")
+        if main_response.startswith("Error:"):
+            ai_metrics.record_questions('skipped')
+            return main_response
+        return main_response + banked_questions_section(message, headers, models_to_try)
+    
+    # The questions only depend on the user's message, so both run concurrently
+    main_future = submit_ai_task(ai_executor, get_cached_ai_response, message, headers, models_to_try, "main")
+    questions_future = submit_ai_task(ai_executor, get_cached_ai_response, message, headers, models_to_try, "questions")
+    
+    main_response = main_future.result()
     
     if main_response.startswith("Error:"):
+        questions_future.cancel()
+        ai_metrics.record_questions('skipped')
         return main_response
     
-    # Then generate relevant questions
-    questions_response = get_ai_response(message, headers, models_to_try, "questions")
+    # Give the questions a short grace period once the main answer is in.
+    # If they are still pending we answer without them; the call keeps
+    # running in the background and lands in the cache for next time.
+    try:
+        questions_response = questions_future.result(
+            timeout=getattr(settings, 'AI_QUESTIONS_GRACE_SECONDS', 2)
+        )
+    except FutureTimeoutError:
+        ai_metrics.record_questions('timeout')
+        return main_response
     
     # Combine responses
     if not questions_response.startswith("Error:"):
-        combined_response = f"{main_response}\n\n---\n\n## 🤔 Test Your Understanding\n\n{questions_response}"
+        ai_metrics.record_questions('ok')
+        combined_response = main_response + format_questions_section(questions_response)
         return combined_response
     else:
         # If questions generation fails, just return main response
+        ai_metrics.record_questions('error')
         return main_response
 
-def get_ai_response(message, headers, models_to_try, response_type="main"):
-    """Get AI response for either main answer or questions"""
+def banked_questions_section(message, headers, models_to_try):
+    """Questions from the bank, which fills itself in the background on a miss"""
+    questions_response = question_bank.get(
+        message,
+        lambda: get_ai_response(message, headers, models_to_try, "questions")
+    )
+    if questions_response is None:
+        ai_metrics.record_questions('bank_miss')
+        return ""
+    ai_metrics.record_questions('bank_hit')
+    ai_request_log.record(message, "questions", 'hit', response=questions_response)
+    return format_questions_section(questions_response)
+
+def split_combined_response(text):
+    """Split a single-call completion into (answer, questions), or None if it is malformed"""
+    main_part, marker, questions_part = text.partition(QUESTIONS_MARKER)
+    if not marker:
+        return None
+    main_response = main_part.strip().rstrip('-').strip()
+    questions = [
+        line.strip() for line in questions_part.splitlines()
+        if re.match(r'\s*\d+[.)]\s+\S', line)
+    ]
+    if not main_response or len(questions) < 3:
+        return None
+    return main_response, "\n".join(questions)
+
+def _cached_combined_response(message):
+    main_response = response_cache.peek(message, "main")
+    questions_response = response_cache.peek(message, "questions")
+    if main_response is None or questions_response is None:
+        return None
+    return main_response + format_questions_section(questions_response)
+
+def _store_combined_response(message, response):
+    """Cache both halves of a single-call completion; None when it has to fall back"""
+    parts = split_combined_response(response)
+    if parts is None:
+        return None
+    main_response, questions_response = parts
+    response_cache.set(message, "main", main_response)
+    response_cache.set(message, "questions", questions_response)
+    question_bank.add(message, questions_response)
+    return main_response + format_questions_section(questions_response)
+
+def get_single_call_response(message, headers, models_to_try):
+    """
+    Answer and follow-up questions from one completion. Returns None when the
+    two-call path should be used instead: part of the answer is already cached,
+    or the completion could not be split.
+    """
+    if response_cache.peek(message, "main") is not None or response_cache.peek(message, "questions") is not None:
+        return None
     
+    def fetch():
+        response = get_ai_response(message, headers, models_to_try, "combined")
+        if response.startswith("Error:"):
+            return response
+        return _store_combined_response(message, response)
+    
+    return single_flight.do(
+        make_cache_key(message, "combined"),
+        fetch,
+        lookup=lambda: _cached_combined_response(message)
+    )
+
+def get_cached_ai_response(message, headers, models_to_try, response_type="main"):
+    """Serve from the response cache when possible, only successful answers are stored"""
+    cached = response_cache.get(message, response_type)
+    if cached is not None:
+        ai_request_log.record(message, response_type, 'hit', response=cached)
+        return cached
+    
+    led = []
+    def fetch():
+        led.append(True)
+        response = get_ai_response(message, headers, models_to_try, response_type)
+        if not response.startswith("Error:"):
+            response_cache.set(message, response_type, response)
+        return response
+    
+    # Identical prompts in flight at the same time share one upstream call
+    started = time.monotonic()
+    response = single_flight.do(
+        make_cache_key(message, response_type),
+        fetch,
+        lookup=lambda: response_cache.peek(message, response_type)
+    )
+    _log_cache_outcome(message, response_type, response, led, started)
+    return response
+
+def _log_cache_outcome(message, response_type, response, led, started):
+    """Successful upstream calls log themselves; log errors and answers shared by single flight"""
+    if response.startswith("Error:"):
+        ai_request_log.record(message, response_type, 'error', latency=time.monotonic() - started)
+    elif not led:
+        ai_request_log.record(message, response_type, 'shared', latency=time.monotonic() - started, response=response)
+
+def build_ai_request(message, model, response_type="main"):
+    """Chat completion payload for either the main answer or the questions"""
     if response_type == "main":
         system_prompt = (
             "You are a helpful computer science learning assistant. "
@@ -88,6 +330,16 @@ def get_ai_response(message, headers, models_to_try, response_type="main"):
             "Focus on accuracy and educational value. Keep your response informative but concise."
         )
         user_message = message
+    elif response_type == "combined":
+        system_prompt = (
+            "You are a helpful computer science learning assistant. "
+            "Provide clear, concise explanations and examples to help students understand concepts. "
+            "Focus on accuracy and educational value. Keep your response informative but concise. "
+            f"After the explanation, write a line containing only {QUESTIONS_MARKER} and then "
+            "exactly 5-8 relevant follow-up questions as a numbered list, progressively challenging "
+            "from basic recall to application and analysis, with no explanations."
+        )
+        user_message = message
     else:  # questions
         system_prompt = (
             "You are an educational question generator. Based on the topic discussed, "
@@ -98,47 +350,704 @@ def get_ai_response(message, headers, models_to_try, response_type="main"):
         )
         user_message = f"Generate 5-8 relevant follow-up questions for someone learning about: {message}"
     
-    for model in models_to_try:
+    return {
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ],
+        "model": model,
+        "max_tokens": MAX_TOKENS[response_type]
+    }
+
+def model_unavailable(response):
+    """Whether a 4xx answer means the model doesn't exist; context_length_exceeded and the like don't count"""
+    if not 400 <= response.status_code < 500:
+        return False
+    try:
+        code = response.json()['error']['code']
+    except (ValueError, KeyError, TypeError):
+        return False
+    return code in MODEL_UNAVAILABLE_CODES
+
+def record_model_error(model, response, started):
+    """Only upstream faults count against a model; client errors such as a bad key don't"""
+    if response.status_code >= 500 or response.status_code == 429:
+        model_health.record_failure(model, time.monotonic() - started, f"{response.status_code} - {response.text}")
+    else:
+        model_health.release(model)
+
+def get_ai_response(message, headers, models_to_try, response_type="main"):
+    """Get AI response for either main answer or questions"""
+    if hedging_enabled():
+        return get_hedged_ai_response(message, headers, models_to_try, response_type)
+    return _get_ai_response(message, headers, models_to_try, response_type)
+
+def _get_ai_response(message, headers, models_to_try, response_type="main", budget=None, cancelled=None, claims=None):
+    # Every model attempt draws from the same time budget: no attempt starts
+    # after AI_REQUEST_BUDGET_SECONDS and each one's timeouts are clipped to
+    # what is left. The read timeout applies per socket read though, so a
+    # reply that keeps trickling in can still overrun the budget somewhat.
+    budget = budget or RequestBudget()
+    
+    # Models with an open circuit are skipped without a round trip
+    for model in model_health.candidates(models_to_try):
+        if cancelled is not None and cancelled.is_set():
+            return "Error: Request cancelled."
+        if budget.expired():
+            return "Error: The AI service took too long to respond. Please try again later."
+        if claims is not None and not claims.claim(model):
+            continue
+        if not model_health.acquire(model):
+            continue
+        started = time.monotonic()
         try:
-            data = {
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                "model": model,
-                "max_tokens": 800 if response_type == "main" else 300
-            }
-            
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers=headers,
-                json=data
-            )
+            data = build_ai_request(message, model, response_type)
+            response = post_chat_completion(data, headers, budget)
+            latency = time.monotonic() - started
             
             if response.status_code == 200:
-                return response.json()['choices'][0]['message']['content']
-            elif response.status_code == 400 and "model" in response.text.lower():
+                body = response.json()
+                content = body['choices'][0]['message']['content']
+                model_health.record_success(model, latency)
+                ai_metrics.record_call(model, response_type, 200, latency, body.get('usage'))
+                ai_request_log.record(message, response_type, 'miss', model, latency, body.get('usage'), content)
+                return content
+            ai_metrics.record_call(model, response_type, response.status_code, latency)
+            if model_unavailable(response):
                 # Model not available, try next one
+                model_health.record_failure(model, latency, response.text, unavailable=True)
+                ai_metrics.record_fallback(model, response_type)
                 continue
             else:
+                record_model_error(model, response, started)
                 return f"Error: {response.status_code} - {response.text}"
                 
         except Exception as e:
+            model_health.record_failure(model, time.monotonic() - started, str(e))
+            ai_metrics.record_call(model, response_type, 'exception', time.monotonic() - started)
+            ai_metrics.record_fallback(model, response_type)
+            continue
+    
+    return "Error: Unable to connect to any available AI models. Please check your API key or try again later."
+
+def get_hedged_ai_response(message, headers, models_to_try, response_type="main"):
+    """Send the prompt to the primary model and, if it is slower than usual, to the next one too"""
+    if async_http_available():
+        # Both attempts run as tasks on the shared hedging loop, so this
+        # thread just waits and no pool thread is tied up per request
+        return asyncio.run_coroutine_threadsafe(
+            aget_hedged_ai_response(message, headers, models_to_try, response_type), hedge_loop()
+        ).result()
+    
+    candidates = model_health.candidates(models_to_try)
+    hedge_budget.record_request()
+    if len(candidates) < 2:
+        return _get_ai_response(message, headers, candidates, response_type)
+    
+    budget = RequestBudget()
+    claims = ModelClaims()
+    cancel_primary = threading.Event()
+    primary = submit_ai_task(
+        hedge_executor, _get_ai_response, message, headers, candidates, response_type, budget, cancel_primary, claims
+    )
+    try:
+        return primary.result(timeout=hedge_delay(candidates[0]))
+    except FutureTimeoutError:
+        hedge_candidates = claims.unclaimed(candidates)
+        if not hedge_candidates or not hedge_budget.try_spend():
+            return primary.result()
+    
+    # The hedge skips every model the primary has claimed and the primary
+    # skips those the hedge claims, so the two attempts never share one
+    cancel_hedge = threading.Event()
+    hedge = submit_ai_task(
+        hedge_executor, _get_ai_response, message, headers, hedge_candidates, response_type, budget, cancel_hedge, claims
+    )
+    pending = {primary: cancel_primary, hedge: cancel_hedge}
+    result = None
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.pop(future)
+            result = future.result()
+            if not result.startswith("Error:"):
+                # A blocking request can't be interrupted, so the loser is
+                # told to stop before its next model and its answer dropped
+                for loser, cancel in pending.items():
+                    cancel.set()
+                    loser.cancel()
+                if future is hedge:
+                    hedge_budget.record_hedge_win()
+                return result
+    return primary.result() if result is None else result
+
+async def achat_with_ai(message, use_semantic_cache=False):
+    """Async twin of chat_with_ai for the async views, no thread per in-flight call"""
+    if use_semantic_cache:
+        similar = await sync_to_async(semantic_answer)(message)
+        if similar is not None:
+            return similar
+    
+    result = await _achat_with_ai(message)
+    if use_semantic_cache:
+        remember_semantic_answer(message, result)
+    return result
+
+async def _achat_with_ai(message):
+    models_to_try = list(AI_MODELS)
+    headers = get_ai_headers()
+    
+    if getattr(settings, 'AI_SINGLE_CALL', False):
+        combined_response = await aget_single_call_response(message, headers, models_to_try)
+        if combined_response is not None:
+            return combined_response
+    
+    if getattr(settings, 'AI_QUESTION_BANK_ENABLED', True):
+        main_response = await aget_cached_ai_response(message, headers, models_to_try, "main")
+        if main_response.startswith("Error:"):
+            ai_metrics.record_questions('skipped')
+            return main_response
+        return main_response + await sync_to_async(banked_questions_section)(message, headers, models_to_try)
+    
+    main_task = asyncio.ensure_future(aget_cached_ai_response(message, headers, models_to_try, "main"))
+    questions_task = asyncio.ensure_future(aget_cached_ai_response(message, headers, models_to_try, "questions"))
+    
+    main_response = await main_task
+    
+    if main_response.startswith("Error:"):
+        questions_task.cancel()
+        ai_metrics.record_questions('skipped')
+        return main_response
+    
+    try:
+        questions_response = await asyncio.wait_for(
+            asyncio.shield(questions_task),
+            timeout=getattr(settings, 'AI_QUESTIONS_GRACE_SECONDS', 2)
+        )
+    except asyncio.TimeoutError:
+        ai_metrics.record_questions('timeout')
+        return main_response
+    
+    if not questions_response.startswith("Error:"):
+        ai_metrics.record_questions('ok')
+        return main_response + format_questions_section(questions_response)
+    ai_metrics.record_questions('error')
+    return main_response
+
+async def aget_single_call_response(message, headers, models_to_try):
+    """Async twin of get_single_call_response"""
+    main_cached = await sync_to_async(response_cache.peek)(message, "main")
+    questions_cached = await sync_to_async(response_cache.peek)(message, "questions")
+    if main_cached is not None or questions_cached is not None:
+        return None
+    
+    async def fetch():
+        response = await aget_ai_response(message, headers, models_to_try, "combined")
+        if response.startswith("Error:"):
+            return response
+        return await sync_to_async(_store_combined_response)(message, response)
+    
+    return await single_flight.ado(
+        make_cache_key(message, "combined"),
+        fetch,
+        lookup=lambda: _cached_combined_response(message)
+    )
+
+async def aget_cached_ai_response(message, headers, models_to_try, response_type="main"):
+    cached = await sync_to_async(response_cache.get)(message, response_type)
+    if cached is not None:
+        ai_request_log.record(message, response_type, 'hit', response=cached)
+        return cached
+    
+    led = []
+    async def fetch():
+        led.append(True)
+        response = await aget_ai_response(message, headers, models_to_try, response_type)
+        if not response.startswith("Error:"):
+            await sync_to_async(response_cache.set)(message, response_type, response)
+        return response
+    
+    started = time.monotonic()
+    response = await single_flight.ado(
+        make_cache_key(message, response_type),
+        fetch,
+        lookup=lambda: response_cache.peek(message, response_type)
+    )
+    _log_cache_outcome(message, response_type, response, led, started)
+    return response
+
+async def aget_ai_response(message, headers, models_to_try, response_type="main"):
+    """Async twin of get_ai_response using the shared httpx client"""
+    if not async_http_available():
+        return await sync_to_async(get_ai_response, thread_sensitive=False)(
+            message, headers, models_to_try, response_type
+        )
+    if hedging_enabled():
+        return await aget_hedged_ai_response(message, headers, models_to_try, response_type)
+    return await _aget_ai_response(message, headers, models_to_try, response_type)
+
+async def _aget_ai_response(message, headers, models_to_try, response_type="main", budget=None, claims=None):
+    budget = budget or RequestBudget()
+    
+    for model in model_health.candidates(models_to_try):
+        if budget.expired():
+            return "Error: The AI service took too long to respond. Please try again later."
+        if claims is not None and not claims.claim(model):
+            continue
+        if not model_health.acquire(model):
+            continue
+        started = time.monotonic()
+        try:
+            data = build_ai_request(message, model, response_type)
+            response = await apost_chat_completion(data, headers, budget)
+            latency = time.monotonic() - started
+            
+            if response.status_code == 200:
+                body = response.json()
+                content = body['choices'][0]['message']['content']
+                model_health.record_success(model, latency)
+                ai_metrics.record_call(model, response_type, 200, latency, body.get('usage'))
+                ai_request_log.record(message, response_type, 'miss', model, latency, body.get('usage'), content)
+                return content
+            ai_metrics.record_call(model, response_type, response.status_code, latency)
+            if model_unavailable(response):
+                model_health.record_failure(model, latency, response.text, unavailable=True)
+                ai_metrics.record_fallback(model, response_type)
+                continue
+            else:
+                record_model_error(model, response, started)
+                return f"Error: {response.status_code} - {response.text}"
+        
+        except asyncio.CancelledError:
+            # Lost a hedge race, so the attempt says nothing about the model
+            model_health.release(model)
+            raise
+        except Exception as e:
+            model_health.record_failure(model, time.monotonic() - started, str(e) or type(e).__name__)
+            ai_metrics.record_call(model, response_type, 'exception', time.monotonic() - started)
+            ai_metrics.record_fallback(model, response_type)
             continue
     
     return "Error: Unable to connect to any available AI models. Please check your API key or try again later."
 
+async def aget_hedged_ai_response(message, headers, models_to_try, response_type="main"):
+    """Async twin of get_hedged_ai_response, the losing request is cancelled outright"""
+    candidates = model_health.candidates(models_to_try)
+    hedge_budget.record_request()
+    if len(candidates) < 2:
+        return await _aget_ai_response(message, headers, candidates, response_type)
+    
+    budget = RequestBudget()
+    claims = ModelClaims()
+    primary = asyncio.ensure_future(_aget_ai_response(message, headers, candidates, response_type, budget, claims))
+    done, _ = await asyncio.wait({primary}, timeout=hedge_delay(candidates[0]))
+    hedge_candidates = claims.unclaimed(candidates)
+    if done or not hedge_candidates or not hedge_budget.try_spend():
+        return await primary
+    
+    hedge = asyncio.ensure_future(
+        _aget_ai_response(message, headers, hedge_candidates, response_type, budget, claims)
+    )
+    pending = {primary, hedge}
+    result = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if not result.startswith("Error:"):
+                    if task is hedge:
+                        hedge_budget.record_hedge_win()
+                    return result
+    finally:
+        for task in pending:
+            task.cancel()
+    return result
+
+def stream_ai_response(message, headers, models_to_try, response_type="main", outcome=None):
+    """
+    Like get_ai_response, but yields the answer in chunks as the model
+    produces them. outcome['complete'] is set once the whole answer was
+    sent, as opposed to an error or a stream cut off part way.
+    """
+    outcome = {} if outcome is None else outcome
+    cached = response_cache.get(message, response_type)
+    if cached is not None:
+        ai_request_log.record(message, response_type, 'hit', response=cached)
+        outcome['complete'] = True
+        yield cached
+        return
+    
+    led = []
+    def fetch(fetch_outcome):
+        led.append(True)
+        return _stream_ai_response(message, headers, models_to_try, response_type, fetch_outcome)
+    
+    # Identical prompts streaming at the same time share one upstream stream
+    started = time.monotonic()
+    parts = []
+    for chunk in single_flight.stream(
+        make_cache_key(message, response_type),
+        fetch,
+        lookup=lambda: response_cache.peek(message, response_type),
+        outcome=outcome
+    ):
+        parts.append(chunk)
+        yield chunk
+    if not led and outcome.get('complete'):
+        ai_request_log.record(message, response_type, 'shared', latency=time.monotonic() - started, response=''.join(parts))
+
+def _stream_ai_response(message, headers, models_to_try, response_type, outcome):
+    budget = RequestBudget()
+    
+    for model in model_health.candidates(models_to_try):
+        if budget.expired():
+            yield "Error: The AI service took too long to respond. Please try again later."
+            return
+        if not model_health.acquire(model):
+            continue
+        started = time.monotonic()
+        try:
+            data = build_ai_request(message, model, response_type)
+            response = stream_chat_completion(data, headers, budget)
+        except Exception as e:
+            model_health.record_failure(model, time.monotonic() - started, str(e))
+            ai_metrics.record_call(model, response_type, 'exception', time.monotonic() - started)
+            ai_metrics.record_fallback(model, response_type)
+            continue
+        
+        with response:
+            if model_unavailable(response):
+                # Model not available, try next one
+                model_health.record_failure(model, time.monotonic() - started, response.text, unavailable=True)
+                ai_metrics.record_call(model, response_type, response.status_code, time.monotonic() - started)
+                ai_metrics.record_fallback(model, response_type)
+                continue
+            elif response.status_code != 200:
+                ai_metrics.record_call(model, response_type, response.status_code, time.monotonic() - started)
+                record_model_error(model, response, started)
+                yield f"Error: {response.status_code} - {response.text}"
+                return
+            
+            parts = []
+            try:
+                for delta in iter_completion_deltas(response, budget):
+                    parts.append(delta)
+                    yield delta
+            except Exception as e:
+                model_health.record_failure(model, time.monotonic() - started, str(e))
+                ai_metrics.record_call(model, response_type, 'exception', time.monotonic() - started)
+                if not parts:
+                    ai_metrics.record_fallback(model, response_type)
+                    continue
+                # A truncated answer is shown but never cached
+                return
+            model_health.record_success(model, time.monotonic() - started)
+            ai_metrics.record_call(model, response_type, 200, time.monotonic() - started)
+            ai_request_log.record(message, response_type, 'miss', model, time.monotonic() - started, response=''.join(parts))
+        
+        if parts:
+            response_cache.set(message, response_type, ''.join(parts))
+            outcome['complete'] = True
+            return
+    
+    yield "Error: Unable to connect to any available AI models. Please check your API key or try again later."
+
+def stream_single_call_response(message, headers, models_to_try, outcome):
+    """
+    Stream the answer part of a single-call completion. Everything after
+    QUESTIONS_MARKER is held back and, when the completion splits cleanly,
+    handed over in outcome['questions'] instead.
+    """
+    sent = []
+    held = ""
+    questions_part = None
+    stream_outcome = {}
+    for chunk in stream_ai_response(message, headers, models_to_try, "combined", stream_outcome):
+        if questions_part is not None:
+            questions_part += chunk
+            continue
+        if not sent and not held and chunk.startswith("Error:"):
+            yield chunk
+            return
+        held += chunk
+        main_part, marker, rest = held.partition(QUESTIONS_MARKER)
+        if marker:
+            questions_part = rest
+            ready, held = main_part.rstrip().rstrip('-').rstrip(), ""
+        else:
+            # Keep back what could be the start of a marker split across
+            # chunks, and the rule and blank lines that come before it
+            ready = held[:max(0, len(held) - len(QUESTIONS_MARKER) + 1)].rstrip().rstrip('-').rstrip()
+            held = held[len(ready):]
+        if ready:
+            sent.append(ready)
+            yield ready
+    if questions_part is None and held:
+        sent.append(held)
+        yield held
+    if not stream_outcome.get('complete'):
+        return
+    
+    outcome['complete'] = True
+    answer = ''.join(sent)
+    if questions_part is not None and _store_combined_response(message, answer + QUESTIONS_MARKER + questions_part):
+        outcome['questions'] = response_cache.peek(message, "questions")
+    elif answer.strip():
+        # The answer went out already, the questions come the two-call way
+        response_cache.set(message, "main", answer.strip())
+
+def _sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def chat_event_stream(message, use_semantic_cache=False):
+    """Server-sent events for chat_with_ai: token events, then questions, then done"""
+    models_to_try = list(AI_MODELS)
+    headers = get_ai_headers()
+    bank_enabled = getattr(settings, 'AI_QUESTION_BANK_ENABLED', True)
+    single_call = (
+        getattr(settings, 'AI_SINGLE_CALL', False)
+        and response_cache.peek(message, "main") is None
+        and response_cache.peek(message, "questions") is None
+    )
+    
+    questions_future = None
+    if not bank_enabled and not single_call:
+        questions_future = submit_ai_task(ai_executor, get_cached_ai_response, message, headers, models_to_try, "questions")
+    
+    parts = []
+    outcome = {}
+    if single_call:
+        chunks = stream_single_call_response(message, headers, models_to_try, outcome)
+    else:
+        chunks = stream_ai_response(message, headers, models_to_try, "main", outcome)
+    for chunk in chunks:
+        if not parts and chunk.startswith("Error:"):
+            if questions_future is not None:
+                questions_future.cancel()
+            ai_metrics.record_questions('skipped')
+            ai_request_log.record(message, "main", 'error')
+            yield _sse_event('error', {'message': chunk})
+            return
+        parts.append(chunk)
+        yield _sse_event('token', {'text': chunk})
+    
+    if outcome.get('questions'):
+        questions_section = format_questions_section(outcome['questions'])
+    elif bank_enabled:
+        questions_section = banked_questions_section(message, headers, models_to_try)
+    else:
+        if questions_future is None:
+            # The single-call completion had no usable questions
+            questions_future = submit_ai_task(ai_executor, get_cached_ai_response, message, headers, models_to_try, "questions")
+        questions_section = _wait_for_questions_section(questions_future)
+    if questions_section:
+        parts.append(questions_section)
+        yield _sse_event('questions', {'text': questions_section})
+    
+    answer = ''.join(parts)
+    # A truncated answer must not be handed out for similar questions
+    if use_semantic_cache and outcome.get('complete'):
+        remember_semantic_answer(message, answer)
+    
+    yield _sse_event('done', {'html': render_ai_result(answer)})
+
+def _wait_for_questions_section(questions_future):
+    try:
+        questions_response = questions_future.result(
+            timeout=getattr(settings, 'AI_QUESTIONS_GRACE_SECONDS', 2)
+        )
+    except FutureTimeoutError:
+        ai_metrics.record_questions('timeout')
+        return ""
+    
+    if questions_response.startswith("Error:"):
+        ai_metrics.record_questions('error')
+        return ""
+    ai_metrics.record_questions('ok')
+    return format_questions_section(questions_response)
+
+def precomputed_event_stream(text):
+    yield _sse_event('token', {'text': text})
+    yield _sse_event('done', {'html': render_ai_result(text)})
+
+def _ai_streaming_response(prompt, precomputed=None, use_semantic_cache=False):
+    if precomputed is not None:
+        events = precomputed_event_stream(precomputed)
+    else:
+        events = chat_event_stream(prompt, use_semantic_cache)
+    # The body is consumed after the view returns, keep its request log endpoint
+    events = iter_in_context(contextvars.copy_context(), events)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@log_endpoint('generate')
+@rate_limit('generate')
+@bulkhead
 def generate(request):
     result = None
     if request.method == 'POST':
         form = MessageForm(request.POST)
         if form.is_valid():
             message = form.cleaned_data['message']
-            result = chat_with_ai(message)
+            result = chat_with_ai(message, use_semantic_cache=True)
     else:
         form = MessageForm()
-    return render(request, 'generate.html', {'form': form, 'result': result})
+    return render(request, 'generate.html', {'form': form, 'result': result, 'ai_job_mode': settings.AI_JOB_MODE})
+
+@log_endpoint('generate')
+@rate_limit('generate')
+@bulkhead
+async def generate_async(request):
+    result = None
+    if request.method == 'POST':
+        form = MessageForm(request.POST)
+        if form.is_valid():
+            message = form.cleaned_data['message']
+            result = await achat_with_ai(message, use_semantic_cache=True)
+    else:
+        form = MessageForm()
+    # Rendering may touch the session (messages), which is sync-only
+    return await sync_to_async(render)(request, 'generate.html', {'form': form, 'result': result, 'ai_job_mode': settings.AI_JOB_MODE})
+
+@log_endpoint('generate')
+@rate_limit('generate')
+@bulkhead
+@require_POST
+def generate_stream(request):
+    form = MessageForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    message = form.cleaned_data['message']
+    similar = semantic_answer(message)
+    if similar is not None:
+        return _ai_streaming_response(None, precomputed=similar)
+    return _ai_streaming_response(message, use_semantic_cache=True)
+
+IT_PROFILE_NAMES = {
+    'software_developer': 'Software Developer',
+    'data_scientist': 'Data Scientist',
+    'cybersecurity_analyst': 'Cybersecurity Analyst',
+    'cloud_engineer': 'Cloud Engineer',
+    'devops_engineer': 'DevOps Engineer',
+    'network_administrator': 'Network Administrator',
+    'ui_ux_designer': 'UI/UX Designer',
+    'database_administrator': 'Database Administrator',
+    'ai_engineer': 'AI Engineer',
+    'product_manager': 'IT Product Manager'
+}
+
+def build_it_profile_prompt(profile, question=''):
+    profile_name = IT_PROFILE_NAMES.get(profile, profile)
+    
+    if question:
+        return f"Tell me about the {profile_name} role and answer this specific question: {question}"
+    return f"Provide detailed information about the {profile_name} IT career path including: required skills, education, daily responsibilities, career progression, average salary range, job outlook, and recommended resources for learning."
+
+def get_overview_max_age():
+    return timedelta(days=getattr(settings, 'IT_PROFILE_OVERVIEW_MAX_AGE_DAYS', 7))
+
+def find_it_profile_record(profile):
+    """ITProfile row for a form choice, or None; never writes"""
+    return ITProfile.objects.filter(key=profile).first()
+
+def get_it_profile_record(profile):
+    """ITProfile row for a form choice, created for profiles that were never seeded"""
+    record, _ = ITProfile.objects.get_or_create(
+        key=profile,
+        defaults={
+            'name': IT_PROFILE_NAMES.get(profile, profile),
+            'description': '',
+            'skills_required': '',
+            'career_path': '',
+            'average_salary': '',
+            'job_outlook': '',
+        }
+    )
+    return record
+
+def generate_it_profile_overview(profile):
+    """Build the full default overview (answer + questions) for a profile, bypassing the cache"""
+    prompt = build_it_profile_prompt(profile)
+    models_to_try = list(AI_MODELS)
+    headers = get_ai_headers()
+    
+    main_response = get_ai_response(prompt, headers, models_to_try, "main")
+    if main_response.startswith("Error:"):
+        return main_response
+    
+    questions_response = get_ai_response(prompt, headers, models_to_try, "questions")
+    if questions_response.startswith("Error:"):
+        return main_response
+    return main_response + format_questions_section(questions_response)
+
+def save_it_profile_overview(profile, overview):
+    """Store the default overview on the profile's row; profiles without a row are left alone"""
+    updated = ITProfile.objects.filter(key=profile).update(
+        default_overview=overview,
+        overview_generated_at=timezone.now()
+    )
+    return updated > 0
+
+def refresh_it_profile_overview(profile, create=False):
+    """Regenerate and store the default overview, returns whether it was stored"""
+    overview = generate_it_profile_overview(profile)
+    if overview.startswith("Error:"):
+        return False
+    if create:
+        get_it_profile_record(profile)
+    return save_it_profile_overview(profile, overview)
 
+_overview_refreshes = set()
+_overview_refreshes_lock = threading.Lock()
+
+def schedule_overview_refresh(profile):
+    """Refresh a stale overview off the request path, at most once at a time per profile"""
+    with _overview_refreshes_lock:
+        if profile in _overview_refreshes:
+            return
+        _overview_refreshes.add(profile)
+    
+    def refresh():
+        try:
+            refresh_it_profile_overview(profile)
+        finally:
+            connection.close()
+            with _overview_refreshes_lock:
+                _overview_refreshes.discard(profile)
+    
+    threading.Thread(target=refresh, name=f'overview-refresh-{profile}', daemon=True).start()
+
+def get_precomputed_overview(profile):
+    """Stored default overview for a profile, stale ones are served while they refresh"""
+    record = ITProfile.objects.filter(key=profile).exclude(default_overview='').first()
+    if record is None:
+        return None
+    if record.overview_is_stale(get_overview_max_age()):
+        schedule_overview_refresh(profile)
+    ai_request_log.record(build_it_profile_prompt(profile), "main", 'precomputed', response=record.default_overview)
+    return record.default_overview
+
+def it_profile_result(profile, question=''):
+    """Answer for the IT profile page; the default overview comes straight from the DB"""
+    if not question:
+        overview = get_precomputed_overview(profile)
+        if overview is not None:
+            return overview
+    
+    result = chat_with_ai(build_it_profile_prompt(profile, question))
+    # An overview missing its questions (a bank miss, say) would be served
+    # as is until it goes stale, so only a full one is stored
+    if not question and has_questions(result):
+        save_it_profile_overview(profile, result)
+    return result
+
+@log_endpoint('it_profiles')
+@rate_limit('it_profiles')
+@bulkhead
 def it_profiles(request):
     result = None
     if request.method == 'POST':
@@ -147,58 +1056,314 @@ def it_profiles(request):
             profile = form.cleaned_data['profile']
             question = form.cleaned_data.get('question', '')
             
-            profile_info = {
-                'software_developer': 'Software Developer',
-                'data_scientist': 'Data Scientist',
-                'cybersecurity_analyst': 'Cybersecurity Analyst',
-                'cloud_engineer': 'Cloud Engineer',
-                'devops_engineer': 'DevOps Engineer',
-                'network_administrator': 'Network Administrator',
-                'ui_ux_designer': 'UI/UX Designer',
-                'database_administrator': 'Database Administrator',
-                'ai_engineer': 'AI Engineer',
-                'product_manager': 'IT Product Manager'
-            }
-            
-            profile_name = profile_info.get(profile, profile)
-            
-            if question:
-                prompt = f"Tell me about the {profile_name} role and answer this specific question: {question}"
-            else:
-                prompt = f"Provide detailed information about the {profile_name} IT career path including: required skills, education, daily responsibilities, career progression, average salary range, job outlook, and recommended resources for learning."
+            result = it_profile_result(profile, question)
+    else:
+        form = ITProfileForm()
+    
+    return render(request, 'it_profiles.html', {'form': form, 'result': result, 'ai_job_mode': settings.AI_JOB_MODE})
+
+@log_endpoint('it_profiles')
+@rate_limit('it_profiles')
+@bulkhead
+async def it_profiles_async(request):
+    result = None
+    if request.method == 'POST':
+        form = ITProfileForm(request.POST)
+        if form.is_valid():
+            profile = form.cleaned_data['profile']
+            question = form.cleaned_data.get('question', '')
             
-            result = chat_with_ai(prompt)
+            if not question:
+                result = await sync_to_async(get_precomputed_overview)(profile)
+            if result is None:
+                result = await achat_with_ai(build_it_profile_prompt(profile, question))
+                if not question and has_questions(result):
+                    await sync_to_async(save_it_profile_overview)(profile, result)
     else:
         form = ITProfileForm()
+    return await sync_to_async(render)(request, 'it_profiles.html', {'form': form, 'result': result, 'ai_job_mode': settings.AI_JOB_MODE})
+
+@log_endpoint('it_profiles')
+@rate_limit('it_profiles')
+@bulkhead
+@require_POST
+def it_profiles_stream(request):
+    form = ITProfileForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    profile = form.cleaned_data['profile']
+    question = form.cleaned_data.get('question', '')
     
-    return render(request, 'it_profiles.html', {'form': form, 'result': result})
+    if not question:
+        overview = get_precomputed_overview(profile)
+        if overview is not None:
+            return _ai_streaming_response(None, precomputed=overview)
+    return _ai_streaming_response(build_it_profile_prompt(profile, question))
+
+def _job_accepted(job):
+    data = job_status(job)
+    data['status_url'] = reverse('ai_job_status', args=[job.id])
+    return JsonResponse(data, status=202)
+
+@rate_limit('generate')
+@require_POST
+def generate_job(request):
+    form = MessageForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    return _job_accepted(enqueue_job('generate', message=form.cleaned_data['message']))
+
+@rate_limit('it_profiles')
+@require_POST
+def it_profiles_job(request):
+    form = ITProfileForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    job = enqueue_job(
+        'it_profile',
+        profile=form.cleaned_data['profile'],
+        question=form.cleaned_data.get('question', '')
+    )
+    return _job_accepted(job)
+
+@require_GET
+def ai_job_status(request, job_id):
+    job = get_object_or_404(AIJob, id=job_id)
+    return JsonResponse(job_status(job))
+
+def hackathon_search_filter(query):
+    """Q matching hackathons for query, through the full-text index when there is one"""
+    if fts_available():
+        match = fts_query(query)
+        if not match:
+            return Q()
+        # A subquery, so searching doesn't add a round trip
+        return Q(id__in=RawSQL(matching_ids_sql('hackathon'), [match]))
+    condition = Q()
+    for term in search_terms(query):
+        condition &= Q(title__icontains=term) | Q(organizer__icontains=term) | Q(description__icontains=term)
+    return condition
+
+# Fields the hackathons API can return, and the ones it returns by default
+HACKATHON_API_FIELDS = [
+    'id', 'title', 'description', 'organizer', 'start_date', 'end_date', 'registration_url', 'image', 'status',
+]
+HACKATHON_API_DEFAULT_FIELDS = [
+    'id', 'title', 'organizer', 'start_date', 'end_date', 'registration_url', 'image', 'status',
+]
+
+def filtered_hackathons(params):
+    """
+    Hackathons in (start_date, id) order with their status annotated,
+    filtered by ?organizer=, ?search= and ?status= (upcoming, ongoing or
+    past; anything else raises ValueError)
+    """
+    hackathons = Hackathon.objects.with_status().order_by('start_date', 'id')
+    if params.get('status'):
+        hackathons = hackathons.with_status_of(params['status'])
+    if params.get('organizer'):
+        hackathons = hackathons.filter(organizer=params['organizer'])
+    if params.get('search'):
+        hackathons = hackathons.filter(hackathon_search_filter(params['search']))
+    return hackathons
+
+def hackathon_cursor(hackathon):
+    return f'{hackathon.start_date.isoformat()}_{hackathon.id}'
+
+def after_hackathon_cursor(cursor):
+    """
+    Q for the hackathons after cursor in (start_date, id) order. Seeking
+    from the last row seen keeps every page an index range scan, where an
+    OFFSET would read and discard all the earlier rows.
+    """
+    start_date, _, hackathon_id = cursor.partition('_')
+    start_date = date.fromisoformat(start_date)
+    hackathon_id = int(hackathon_id)
+    # Written as a range on start_date so the index also supplies the order
+    return Q(start_date__gte=start_date) & (Q(start_date__gt=start_date) | Q(id__gt=hackathon_id))
 
 def hackathons(request):
-    # Get all hackathons ordered by start date
-    hackathons = Hackathon.objects.all().order_by('start_date')
+    # One grouped query gives the organizer list and the catalog size,
+    # a second one the first page of cards with the filtered total
+    # attached; later pages come from hackathons_api as the user scrolls,
+    # or from ?cursor= links here when scripts are off
+    organizer_counts = list(
+        Hackathon.objects.values('organizer').annotate(count=Count('id')).order_by('organizer')
+    )
     
-    # Add additional context for better user experience
     context = {
-        'hackathons': hackathons,
-        'total_hackathons': hackathons.count(),
-        'organizers': hackathons.values_list('organizer', flat=True).distinct(),
+        'total_hackathons': sum(row['count'] for row in organizer_counts),
+        'organizers': [row['organizer'] for row in organizer_counts],
+        'selected_organizer': request.GET.get('organizer'),
+        'search_query': request.GET.get('search'),
+        'statuses': Hackathon.STATUSES,
     }
     
-    # Add filter functionality if requested
-    organizer_filter = request.GET.get('organizer')
-    search_query = request.GET.get('search')
-    
-    if organizer_filter:
-        hackathons = hackathons.filter(organizer=organizer_filter)
-        context['selected_organizer'] = organizer_filter
+    params = request.GET.copy()
+    if params.get('status') not in Hackathon.STATUSES:
+        params.pop('status', None)
+    cursor = params.get('cursor')
+    params.pop('cursor', None)
+    context['selected_status'] = params.get('status')
+    # The filters the page's scripts send to hackathons_api, without any
+    # value the API would reject
+    context['page_query'] = params.urlencode()
     
-    if search_query:
-        hackathons = hackathons.filter(
-            title__icontains=search_query
-        ).distinct()
-        context['search_query'] = search_query
+    page_size = getattr(settings, 'HACKATHONS_PAGE_SIZE', 24)
+    matching = filtered_hackathons(params)
+    hackathons = matching
+    if cursor:
+        try:
+            hackathons = matching.filter(after_hackathon_cursor(cursor))
+        except ValueError:
+            # A mangled link starts over from the first page
+            cursor = None
+    hackathons = list(hackathons.annotate(filtered_count=Window(Count('id')))[:page_size])
+    remaining = hackathons[0].filtered_count if hackathons else 0
     
+    context.update(attach_card_versions(hackathons))
     context['hackathons'] = hackathons
-    context['filtered_count'] = hackathons.count()
+    # Past the first page the window only counts the rows left, so those
+    # pages pay for one COUNT to say where they are in the list
+    context['filtered_count'] = matching.count() if cursor else remaining
+    context['first_shown'] = context['filtered_count'] - remaining + 1
+    context['last_shown'] = context['first_shown'] + len(hackathons) - 1
+    if cursor:
+        context['first_page_url'] = f'?{params.urlencode()}'
+    if remaining > len(hackathons):
+        context['next_cursor'] = hackathon_cursor(hackathons[-1])
+        next_params = params.copy()
+        next_params['cursor'] = context['next_cursor']
+        context['next_page_url'] = f'?{next_params.urlencode()}'
     
     return render(request, 'hackathons.html', context)
+
+@require_GET
+def hackathons_api(request):
+    """
+    A page of hackathons: ?organizer=, ?search=, ?status=, ?cursor=
+    (next_cursor of the previous page), ?limit=, ?fields=id,title,... to
+    pick the fields, or ?format=html for rendered cards (plus the count
+    of matches on the first page).
+    """
+    try:
+        hackathons = filtered_hackathons(request.GET)
+    except ValueError:
+        return JsonResponse({'error': f"status must be one of: {', '.join(Hackathon.STATUSES)}"}, status=400)
+    
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            hackathons = hackathons.filter(after_hackathon_cursor(cursor))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', getattr(settings, 'HACKATHONS_PAGE_SIZE', 24))), 1), 100)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a number'}, status=400)
+    
+    as_html = request.GET.get('format') == 'html'
+    if as_html:
+        fields = HACKATHON_API_FIELDS
+        if not cursor:
+            # The page's live search shows "Showing N of M" from the first page
+            hackathons = hackathons.annotate(filtered_count=Window(Count('id')))
+    elif request.GET.get('fields'):
+        fields = [field.strip() for field in request.GET['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in HACKATHON_API_FIELDS]
+        if unknown:
+            return JsonResponse({'error': f"Unknown field(s): {', '.join(unknown)}"}, status=400)
+    else:
+        fields = HACKATHON_API_DEFAULT_FIELDS
+    
+    # One extra row tells whether there is a next page without a COUNT
+    rows = list(hackathons.only(*(set(fields) - {'status'}) | {'start_date'})[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    data = {
+        'next_cursor': hackathon_cursor(rows[-1]) if has_more else None,
+        'has_more': has_more,
+    }
+    if as_html:
+        if not cursor:
+            data['count'] = rows[0].filtered_count if rows else 0
+        card_context = attach_card_versions(rows)
+        data['html'] = ''.join(
+            render_to_string('hackathon_card.html', {'hackathon': hackathon, **card_context}, request)
+            for hackathon in rows
+        )
+    else:
+        data['results'] = [{field: getattr(hackathon, field) for field in fields} for hackathon in rows]
+    return JsonResponse(data)
+
+@staff_member_required
+def ai_cache_stats(request):
+    stats = response_cache.stats()
+    stats['semantic'] = semantic_cache.stats()
+    stats['single_flight'] = single_flight.stats()
+    stats['bulkhead'] = ai_bulkhead.stats()
+    stats['question_bank'] = question_bank.stats()
+    return JsonResponse(stats)
+
+@staff_member_required
+def ai_model_health(request):
+    stats = model_health.stats()
+    stats['hedging'] = hedge_budget.stats()
+    return JsonResponse(stats)
+
+def _metrics_gauges():
+    """Point-in-time values from the caches and limiters, read at scrape time"""
+    cache = response_cache.stats()
+    semantic = semantic_cache.stats()
+    flights = single_flight.stats()
+    bulk = ai_bulkhead.stats()
+    hedging = hedge_budget.stats()
+    health = model_health.stats()
+    return [
+        ('learnbuddy_ai_cache_hit_rate', 'Response cache hit rate since start.', ('cache',),
+         {('response',): cache['hit_rate'], ('semantic',): semantic['hit_rate']}),
+        ('learnbuddy_ai_cache_lookups', 'Response cache lookups since start.', ('cache', 'result'),
+         {('response', 'hit'): cache['hits'], ('response', 'miss'): cache['misses'],
+          ('semantic', 'hit'): semantic['hits'], ('semantic', 'miss'): semantic['lookups'] - semantic['hits']}),
+        ('learnbuddy_ai_cache_entries', 'Entries held in memory.', ('cache',),
+         {('response',): cache['memory_entries'], ('semantic',): semantic['entries']}),
+        ('learnbuddy_ai_single_flight_in_flight', 'Upstream calls currently shared by single flight.', (),
+         {(): flights['in_flight']}),
+        ('learnbuddy_ai_bulkhead', 'Bulkhead occupancy and rejections.', ('state',),
+         {('active',): bulk['active'], ('waiting',): bulk['waiting'], ('rejected',): bulk['rejected']}),
+        ('learnbuddy_ai_hedges', 'Hedged requests fired, won and denied by the budget.', ('result',),
+         {('fired',): hedging['hedges'], ('won',): hedging['hedge_wins'], ('denied',): hedging['denied']}),
+        ('learnbuddy_ai_model_circuit_open', 'Whether the circuit breaker for a model is open.', ('model',),
+         {(model,): int(state['state'] == 'open') for model, state in health.items()}),
+    ]
+
+@require_GET
+def metrics(request):
+    """Prometheus scrape endpoint, guarded by AI_METRICS_TOKEN when one is set"""
+    token = getattr(settings, 'AI_METRICS_TOKEN', '')
+    if token:
+        if request.headers.get('Authorization', '') != f'Bearer {token}':
+            return HttpResponse(status=401)
+    elif not request.user.is_staff:
+        return HttpResponse(status=403)
+    return HttpResponse(
+        ai_metrics.render(_metrics_gauges()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+@require_GET
+def site_search(request):
+    """Ranked full-text search, ?q=...&kind=hackathon (repeatable)&limit=20"""
+    query = request.GET.get('q', '').strip()
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in SOURCES] or list(SOURCES)
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    return JsonResponse({
+        'query': query,
+        'backend': search_backend(),
+        'results': search(query, kinds, limit),
+    })
@@ -0,0 +1,140 @@
+// Streaming AI answers for the generate and IT profile pages.
+// The form is POSTed to its data-stream-url and the server-sent events
+// (token / questions / error / done) are handed to the page's handlers.
+// The done event carries the whole answer rendered to HTML by the server.
+// Browsers without fetch streaming fall back to the normal form post.
+// In job mode (data-job-url) the form enqueues a job and polls for it instead,
+// giving up with an error after JOB_POLL_TIMEOUT_MS.
+
+const JOB_POLL_TIMEOUT_MS = 3 * 60 * 1000;
+
+function streamAIResponse(form, handlers) {
+    const url = form.dataset.streamUrl;
+    if (!url || !window.fetch || !window.ReadableStream || !window.TextDecoder) {
+        return false;
+    }
+
+    let receivedAny = false;
+
+    function dispatch(rawEvent) {
+        let event = 'message';
+        let data = '';
+        rawEvent.split('\n').forEach(function(line) {
+            if (line.startsWith('event:')) {
+                event = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                data += line.slice(5).trim();
+            }
+        });
+        const payload = data ? JSON.parse(data) : {};
+
+        if (event === 'token') {
+            if (!receivedAny && handlers.onStart) handlers.onStart();
+            receivedAny = true;
+            handlers.onToken(payload.text);
+        } else if (event === 'questions') {
+            handlers.onQuestions(payload.text);
+        } else if (event === 'error') {
+            receivedAny = true;
+            handlers.onError(payload.message);
+        } else if (event === 'done' && handlers.onDone) {
+            handlers.onDone(payload.html);
+        }
+    }
+
+    fetch(url, {
+        method: 'POST',
+        body: new FormData(form),
+        credentials: 'same-origin',
+        headers: {'X-Requested-With': 'XMLHttpRequest'}
+    }).then(function(response) {
+        if (response.status === 429 || response.status === 503) {
+            receivedAny = true;
+            return response.json().then(function(data) { handlers.onError(data.error); });
+        }
+        if (!response.ok || !response.body) {
+            throw new Error('Streaming unavailable');
+        }
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        function pump() {
+            return reader.read().then(function(result) {
+                if (result.done) return;
+                buffer += decoder.decode(result.value, {stream: true});
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    dispatch(buffer.slice(0, boundary));
+                    buffer = buffer.slice(boundary + 2);
+                }
+                return pump();
+            });
+        }
+        return pump();
+    }).catch(function(error) {
+        if (receivedAny) {
+            handlers.onError('The connection was interrupted. Please try again.');
+        } else {
+            // Nothing arrived yet, so the classic form post is still a clean fallback
+            form.submit();
+        }
+    });
+
+    return true;
+}
+
+function submitAIJob(form, handlers) {
+    const url = form.dataset.jobUrl;
+    if (!url || !window.fetch) {
+        return false;
+    }
+
+    const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+
+    function pollAgain(statusUrl, delay) {
+        if (Date.now() + delay > deadline) {
+            handlers.onError('The answer is taking longer than expected. Please try again later.');
+            return;
+        }
+        setTimeout(function() { poll(statusUrl); }, delay);
+    }
+
+    function poll(statusUrl) {
+        fetch(statusUrl, {credentials: 'same-origin'})
+            .then(function(response) { return response.json(); })
+            .then(function(job) {
+                if (job.status === 'done') {
+                    handlers.onStart();
+                    handlers.onToken(job.result);
+                    handlers.onDone(job.html);
+                } else if (job.status === 'failed') {
+                    handlers.onError(job.error);
+                } else {
+                    pollAgain(statusUrl, 1000);
+                }
+            })
+            .catch(function() {
+                pollAgain(statusUrl, 3000);
+            });
+    }
+
+    fetch(url, {
+        method: 'POST',
+        body: new FormData(form),
+        credentials: 'same-origin',
+        headers: {'X-Requested-With': 'XMLHttpRequest'}
+    }).then(function(response) {
+        if (response.status === 429 || response.status === 503) {
+            return response.json().then(function(data) { handlers.onError(data.error); });
+        }
+        if (response.status !== 202) {
+            throw new Error('Job queue unavailable');
+        }
+        return response.json().then(function(job) { poll(job.status_url); });
+    }).catch(function() {
+        form.submit();
+    });
+
+    return true;
+}